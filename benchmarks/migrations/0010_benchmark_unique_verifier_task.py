@@ -0,0 +1,31 @@
+# Generated by Django 5.2.18 on 2026-10-18 18:30
+
+from django.db import migrations, models
+from django.db.models import F, Window
+from django.db.models.functions import RowNumber
+
+
+def delete_older_duplicates(apps, schema_editor):
+    """Keep only the newest benchmark per verifier and task, so that the constraint can be created"""
+    Benchmark = apps.get_model('benchmarks', 'Benchmark')
+
+    newest_first = Window(RowNumber(), partition_by=[F("verifier"), F("verification_task")], order_by=[F("test_date").desc(), F("id").desc()])
+    older = Benchmark.objects.annotate(position=newest_first).filter(position__gt=1).values("id")
+    Benchmark.objects.filter(id__in=older).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('benchmarks', '0009_alter_benchmark_raw_score'),
+        ('verification_tasks', '0009_verificationtask_subcategories'),
+        ('verifiers', '0002_alter_verifier_options'),
+    ]
+
+    operations = [
+        migrations.RunPython(delete_older_duplicates, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='benchmark',
+            constraint=models.UniqueConstraint(fields=('verifier', 'verification_task'), name='unique_benchmark_per_verifier_and_task'),
+        ),
+    ]
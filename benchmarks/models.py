@@ -41,6 +41,10 @@ class Benchmark(models.Model):
 
     class Meta:
         ordering = ['verifier', "verification_task"]
+        constraints = [
+            # Only the newest result per verifier and task is kept, see setup_sv_comp
+            models.UniqueConstraint(fields=["verifier", "verification_task"], name="unique_benchmark_per_verifier_and_task"),
+        ]
 
     def __str__(self):
         return f"{self.verification_task} - {self.verifier} - {self.test_date.strftime('%d/%m/%Y, %H:%M:%S')}"
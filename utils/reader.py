@@ -11,12 +11,43 @@ urls = [
     "https://sv-comp.sosy-lab.org/2025/results/results-verified/META_SoftwareSystems.table.html#/table",
 ]
 
-def get_file(url: str, output_dir: str) -> str:
-    return os.path.join(output_dir, url.split("/")[-2].replace(".html#", "") + ".json")
+TABLE_FORMATS = ("json", "arrow")
+
+def get_file(url: str, output_dir: str, table_format: str = "json") -> str:
+    return os.path.join(output_dir, url.split("/")[-2].replace(".html#", "") + "." + table_format)
 
 from pydantic import BaseModel, PrivateAttr, computed_field
+from functools import cache, cached_property
 import os
-from typing import List, Optional
+from array import array
+from typing import Iterator, List, NamedTuple, Optional
+import ijson
+import sys
+
+
+class VerifierColumn:
+    """
+    Parsed header of a verifier column, e.g. "CPAchecker 2024-11-28 10:00:00 CET [unreach-call; ...]".
+    Shared by all results of the column, get instances through verifier_column.
+    """
+    __slots__ = ("name", "verifier_name", "test_date", "verification_specs")
+
+    def __init__(self, name: str):
+        idx = name.find("[")
+        prefix = name[:idx]
+        self.name = name
+        self.verification_specs = tuple(name[idx+1:-1].split("; "))
+        self.verifier_name = prefix[:prefix.find("2024")].strip()
+        self.test_date = prefix[prefix.find("2024"):prefix.find("CET ")+3].strip()
+
+    def __repr__(self) -> str:
+        return f"VerifierColumn({self.name!r})"
+
+
+@cache
+def verifier_column(name: str) -> VerifierColumn:
+    """Interned VerifierColumn of a column header, parsed once for all rows of the column."""
+    return VerifierColumn(name)
 
 
 class Verifier(BaseModel):
@@ -27,11 +58,10 @@ class Verifier(BaseModel):
     _verification_specs: list[str] = PrivateAttr(default_factory=list)
 
     def load_data(self) -> str:
-        idx = self.name.find("[")
-        prefix = self.name[:idx]
-        self._verification_specs = self.name[idx+1:-1].split("; ")
-        self._verifier_name = prefix[:prefix.find("2024")].strip()
-        self._test_date = prefix[prefix.find("2024"):prefix.find("CET ")+3].strip()
+        column = verifier_column(self.name)
+        self._verification_specs = list(column.verification_specs)
+        self._verifier_name = column.verifier_name
+        self._test_date = column.test_date
 
     @computed_field
     @property
@@ -110,9 +140,249 @@ class VerificationResults(BaseModel):
         text += indent * "    " + f"Verification Results: {len(self.verification_results)}"
         return text
     
+class ResultRow(NamedTuple):
+    """One cell of a results table, without the pydantic models of VerifierResult."""
+    verification_task: str  # task name
+    verifier: str  # verifier column header, see verifier_column
+    status: str
+    raw_core: Optional[str]
+    cpu: Optional[float]
+    memory: Optional[float]
+
+
+class _DictionaryColumn:
+    """
+    Read-only column over a dictionary encoded Arrow array. The indices stay a numpy view on
+    the Arrow buffer and the Python value of a row is only looked up when it is read.
+    """
+    __slots__ = ("values", "indices")
+
+    def __init__(self, array):
+        # A null index becomes -1 and picks the None appended to the values
+        self.values = array.dictionary.to_pylist() + [None]
+        indices = array.indices.fill_null(-1) if array.null_count else array.indices
+        self.indices = indices.to_numpy()
+
+    def __len__(self) -> int:
+        return len(self.indices)
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            values = self.values
+            return [values[j] for j in self.indices[i].tolist()]
+        return self.values[self.indices[i]]
+
+    def __iter__(self):
+        return iter(self[:])
+
+
+class _FloatColumn:
+    """Read-only column over a nullable float64 Arrow array, see _DictionaryColumn."""
+    __slots__ = ("values", "valid")
+
+    def __init__(self, array):
+        self.values = array.to_numpy(zero_copy_only=False)
+        self.valid = array.is_valid().to_numpy(zero_copy_only=False) if array.null_count else None
+
+    def __len__(self) -> int:
+        return len(self.values)
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            values = self.values[i].tolist()
+            if self.valid is not None:
+                for j in (~self.valid[i]).nonzero()[0].tolist():
+                    values[j] = None
+            return values
+        if self.valid is not None and not self.valid[i]:
+            return None
+        return float(self.values[i])
+
+    def __iter__(self):
+        return iter(self[:])
+
+
+class ResultsTable:
+    """
+    Results table held column-wise: every task name and verifier column is stored once and
+    rows reference them by index, instead of one VerifierResult model with its own Verifier
+    and VerificationTask per row.
+    """
+    __slots__ = ("verification_tasks", "verifiers", "task_index", "verifier_index", "status", "raw_core", "cpu", "memory", "_task_ids", "_verifier_ids")
+    # Rows converted to Python values at once while iterating
+    ITER_BLOCK_ROWS = 1 << 16
+
+    def __init__(self):
+        self.verification_tasks: list[str] = []
+        self.verifiers: list[VerifierColumn] = []
+        self.task_index = array("I")
+        self.verifier_index = array("I")
+        self.status: list[str] = []
+        self.raw_core: list[Optional[str]] = []
+        self.cpu: list[Optional[float]] = []
+        self.memory: list[Optional[float]] = []
+        self._task_ids: dict[str, int] = {}
+        self._verifier_ids: dict[str, int] = {}
+
+    @classmethod
+    def from_rows(cls, rows: Iterator[ResultRow]) -> "ResultsTable":
+        table = cls()
+        for row in rows:
+            table.append(row)
+        return table
+
+    def append(self, row: ResultRow) -> None:
+        task_id = self._task_ids.get(row.verification_task)
+        if task_id is None:
+            task_id = self._task_ids[row.verification_task] = len(self.verification_tasks)
+            self.verification_tasks.append(row.verification_task)
+        verifier_id = self._verifier_ids.get(row.verifier)
+        if verifier_id is None:
+            verifier_id = self._verifier_ids[row.verifier] = len(self.verifiers)
+            self.verifiers.append(verifier_column(row.verifier))
+        self.task_index.append(task_id)
+        self.verifier_index.append(verifier_id)
+        # Only a handful of distinct statuses, keep one string object each
+        self.status.append(sys.intern(row.status))
+        self.raw_core.append(row.raw_core)
+        self.cpu.append(row.cpu)
+        self.memory.append(row.memory)
+
+    def __len__(self) -> int:
+        return len(self.task_index)
+
+    def row(self, i: int) -> ResultRow:
+        return ResultRow(
+            self.verification_tasks[self.task_index[i]],
+            self.verifiers[self.verifier_index[i]].name,
+            self.status[i],
+            self.raw_core[i],
+            self.cpu[i],
+            self.memory[i],
+        )
+
+    def __iter__(self) -> Iterator[ResultRow]:
+        verifier_names = [verifier.name for verifier in self.verifiers]
+        for start in range(0, len(self), self.ITER_BLOCK_ROWS):
+            block = slice(start, start + self.ITER_BLOCK_ROWS)
+            for task_id, verifier_id, status, raw_core, cpu, memory in zip(
+                self.task_index[block].tolist(), self.verifier_index[block].tolist(),
+                self.status[block], self.raw_core[block], self.cpu[block], self.memory[block],
+            ):
+                yield ResultRow(self.verification_tasks[task_id], verifier_names[verifier_id], status, raw_core, cpu, memory)
+
+    def to_arrow(self):
+        """
+        Arrow table of the results: task, verifier, status and raw score are dictionary encoded,
+        cpu and memory are nullable float64.
+        """
+        import pyarrow as pa
+        return pa.table({
+            "verification_task": pa.DictionaryArray.from_arrays(pa.array(self.task_index, pa.int32()), pa.array(self.verification_tasks, pa.string())),
+            "verifier": pa.DictionaryArray.from_arrays(pa.array(self.verifier_index, pa.int32()), pa.array([verifier.name for verifier in self.verifiers], pa.string())),
+            "status": pa.array(list(self.status), pa.string()).dictionary_encode(),
+            "raw_core": pa.array(list(self.raw_core), pa.string()).dictionary_encode(),
+            "cpu": pa.array(list(self.cpu), pa.float64()),
+            "memory": pa.array(list(self.memory), pa.float64()),
+        })
+
+    @classmethod
+    def from_arrow(cls, arrow_table) -> "ResultsTable":
+        """
+        Table of an Arrow table written by to_arrow. All columns stay views on the Arrow buffers,
+        e.g. on a memory-mapped file, so the table is read-only. Python values are only built for
+        the rows that are read.
+        """
+        if any(column.num_chunks != 1 for column in arrow_table.columns):
+            arrow_table = arrow_table.unify_dictionaries()
+        columns = {
+            name: column.chunk(0) if column.num_chunks == 1 else column.combine_chunks()
+            for name, column in zip(arrow_table.column_names, arrow_table.columns)
+        }
+        table = cls()
+        table.verification_tasks = columns["verification_task"].dictionary.to_pylist()
+        table.verifiers = [verifier_column(name) for name in columns["verifier"].dictionary.to_pylist()]
+        table.task_index = columns["verification_task"].indices.to_numpy()
+        table.verifier_index = columns["verifier"].indices.to_numpy()
+        table.status = _DictionaryColumn(columns["status"])
+        table.raw_core = _DictionaryColumn(columns["raw_core"])
+        table.cpu = _FloatColumn(columns["cpu"])
+        table.memory = _FloatColumn(columns["memory"])
+        return table
+
+    def summary(self, indent=0) -> str:
+        text = indent * "    " + f"Verification Tasks: {len(self.verification_tasks)}\n"
+        text += indent * "    " + f"Verifiers: {len(self.verifiers)}\n"
+        text += indent * "    " + f"Verification Results: {len(self)}"
+        return text
+
 from collections import defaultdict
 
 
+def iter_verification_results(url, output_dir="tables") -> Iterator[ResultRow]:
+    """
+    Stream the results of a saved table one row at a time with ijson, so that memory does
+    not grow with the size of the table like with get_verification_results.
+    """
+    file_name = get_file(url, output_dir)
+    if not os.path.exists(file_name):
+        print(f"File {file_name} does not exist.")
+        return
+    with open(file_name, "rb") as f:
+        for result in ijson.items(f, "verification_results.item", use_float=True):
+            yield ResultRow(
+                verification_task=result["verification_task"]["name"],
+                verifier=result["verifier"]["name"],
+                status=result["status"],
+                raw_core=result["raw_core"],
+                cpu=None if result["cpu"] is None else float(result["cpu"]),
+                memory=None if result["memory"] is None else float(result["memory"]),
+            )
+
+
+def write_arrow_table(table: ResultsTable, url, output_dir="tables") -> str:
+    """Write table as an uncompressed Arrow IPC file next to the JSON table, returns its path."""
+    import pyarrow as pa
+    file_name = get_file(url, output_dir, "arrow")
+    arrow_table = table.to_arrow()
+    # Uncompressed and in one record batch, so that reading it back maps the buffers without copies
+    with pa.OSFile(file_name + ".tmp", "wb") as sink:
+        with pa.ipc.new_file(sink, arrow_table.schema) as writer:
+            writer.write_table(arrow_table, max_chunksize=max(len(table), 1))
+    os.replace(file_name + ".tmp", file_name)
+    return file_name
+
+
+def read_arrow_table(url, output_dir="tables") -> ResultsTable:
+    import pyarrow as pa
+    return ResultsTable.from_arrow(pa.ipc.open_file(pa.memory_map(get_file(url, output_dir, "arrow"))).read_all())
+
+
+def arrow_is_current(url, output_dir="tables") -> bool:
+    """
+    Whether the table has an Arrow file at least as new as its JSON file. A JSON file scraped
+    again after the conversion makes the Arrow file stale, it is ignored until converted again.
+    """
+    arrow_file, json_file = get_file(url, output_dir, "arrow"), get_file(url, output_dir)
+    if not os.path.exists(arrow_file):
+        return False
+    if os.path.exists(json_file) and os.stat(arrow_file).st_mtime_ns < os.stat(json_file).st_mtime_ns:
+        print(f"{arrow_file} is older than {json_file} and ignored, convert it again with python manage.py convert_tables.")
+        return False
+    return True
+
+
+def get_results_table(url, output_dir="tables") -> ResultsTable | None:
+    """Results of a saved table, from its Arrow file if it is current, else from its JSON file."""
+    if arrow_is_current(url, output_dir):
+        return read_arrow_table(url, output_dir)
+    file_name = get_file(url, output_dir)
+    if not os.path.exists(file_name):
+        print(f"File {file_name} does not exist.")
+        return None
+    return ResultsTable.from_rows(iter_verification_results(url, output_dir))
+
+
 def get_verification_results(url, output_dir="tables") -> VerificationResults:
     file_name = get_file(url, output_dir)
     if os.path.exists(file_name):
@@ -123,22 +393,33 @@ def get_verification_results(url, output_dir="tables") -> VerificationResults:
         print(f"File {file_name} does not exist.")
         return None
     
+CATEGORY_URLS = {
+    "mem_safety": urls[0],
+    "reach_safety": urls[1],
+    "concurrency_safety": urls[2],
+    "no_overflows": urls[3],
+    "termination": urls[4],
+    "software_systems": urls[5],
+}
+
 class SVCOMP:
-    def __init__(self):
-        self.data: dict[str, VerificationResults] = {
-            "mem_safety": get_verification_results(urls[0]),
-            "reach_safety": get_verification_results(urls[1]),
-            "concurrency_safety": get_verification_results(urls[2]),
-            "no_overflows": get_verification_results(urls[3]),
-            "termination": get_verification_results(urls[4]),
-            "software_systems": get_verification_results(urls[5]),
-        }
+    def results(self, category: str) -> Iterator[ResultRow]:
+        """Results of one category, read from its current Arrow file or streamed from its JSON file."""
+        url = CATEGORY_URLS[category]
+        if arrow_is_current(url):
+            return iter(read_arrow_table(url))
+        return iter_verification_results(url)
+
+    @cached_property
+    def data(self) -> dict[str, ResultsTable]:
+        # All categories in memory, loaded on first access only
+        return {category: get_results_table(url) for category, url in CATEGORY_URLS.items()}
 
     @classmethod
-    def save_all_pages(cls, output_dir: str = "tables", overwrite: bool = False) -> None:
+    def save_all_pages(cls, output_dir: str = "tables", overwrite: bool = False, table_format: str = "json") -> None:
         from .sv_comp_scraper import save_all_pages
         for url in urls:
-            save_all_pages(url, output_dir, overwrite=overwrite)
+            save_all_pages(url, output_dir, overwrite=overwrite, table_format=table_format)
     
     def summary(self) -> str:
         return f"""SV-COMP25:
@@ -156,31 +437,11 @@ SoftwareSystems:
 {self.data["software_systems"].summary(indent=1)}
 """
     
-    def get_training_data(self) -> dict:
+    def get_training_data(self) -> dict[str, list[ResultRow]]:
         grouped_by_verifier = defaultdict(list)
-
-        for result in self.data["mem_safety"].verification_results:
-            key = result.verifier.verifier_name
-            grouped_by_verifier[key].append(result)
-        
-        for result in self.data["reach_safety"].verification_results:
-            key = result.verifier.verifier_name
-            grouped_by_verifier[key].append(result)
-
-        for result in self.data["concurrency_safety"].verification_results:
-            key = result.verifier.verifier_name
-            grouped_by_verifier[key].append(result)
-
-        for result in self.data["no_overflows"].verification_results:
-            key = result.verifier.verifier_name
-            grouped_by_verifier[key].append(result)
-        
-        for result in self.data["termination"].verification_results:
-            key = result.verifier.verifier_name
-            grouped_by_verifier[key].append(result)
-        
-        for result in self.data["software_systems"].verification_results:
-            key = result.verifier.verifier_name
-            grouped_by_verifier[key].append(result)
-
+        for table in self.data.values():
+            # Verifier names resolved once per column instead of once per row
+            verifier_names = {verifier.name: verifier.verifier_name for verifier in table.verifiers}
+            for row in table:
+                grouped_by_verifier[verifier_names[row.verifier]].append(row)
         return dict(grouped_by_verifier)
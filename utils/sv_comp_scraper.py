@@ -8,7 +8,7 @@ from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.chrome.options import Options
 from selenium.webdriver.support import expected_conditions as EC
 import time
-from .reader import VerificationResults, VerifierResult, Verifier, VerificationTask, get_file
+from .reader import TABLE_FORMATS, ResultRow, ResultsTable, VerificationResults, VerifierResult, Verifier, VerificationTask, get_file, write_arrow_table
 import tempfile
 from webdriver_manager.chrome import ChromeDriverManager
 from selenium.webdriver.chrome.service import Service
@@ -67,10 +67,12 @@ def get_table_rows(soup: BeautifulSoup) -> list:
         results.append(row_results)
     return results
 
-def save_all_pages(url: str, output_dir: str = "tables", overwrite:bool=False):
+def save_all_pages(url: str, output_dir: str = "tables", overwrite:bool=False, table_format: str = "json"):
+    if table_format not in TABLE_FORMATS:
+        raise ValueError(f"Unknown table format {table_format}, expected one of {', '.join(TABLE_FORMATS)}")
     os.makedirs(output_dir, exist_ok=True)
     
-    file_name = get_file(url, output_dir)
+    file_name = get_file(url, output_dir, table_format)
     if os.path.exists(file_name) and not overwrite:
         print(f"URL already scraped: {url}")
         return None
@@ -132,5 +134,12 @@ def save_all_pages(url: str, output_dir: str = "tables", overwrite:bool=False):
 
     driver.quit()
     
+    if table_format == "arrow":
+        write_arrow_table(ResultsTable.from_rows(
+            ResultRow(vr.verification_task.name, vr.verifier.name, vr.status, vr.raw_core, vr.cpu, vr.memory)
+            for vr in all_verification_results.verification_results
+        ), url, output_dir)
+        return
+
     with open(file_name, 'w', encoding='utf-8') as f:
         f.write(all_verification_results.model_dump_json(indent=2))
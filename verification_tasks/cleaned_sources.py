@@ -0,0 +1,48 @@
+from pathlib import Path
+import gzip
+import hashlib
+import io
+import os
+import tempfile
+from .cleaning import I_FILE_RULES, SVCOMP_FURTHER_RULES, clean_i_file, rules_digest
+
+CLEANED_SOURCES_PATH = Path("sv-benchmarks/cleaned")
+# Changes with every cleaning rule, entries of other versions are ignored. Bump the prefix
+# when clean_i_file changes outside of the rules.
+CLEANER_VERSION = f"1-{rules_digest(I_FILE_RULES + SVCOMP_FURTHER_RULES)[:16]}"
+
+
+def cleaned_source_path(raw: bytes, cache_path: Path = CLEANED_SOURCES_PATH) -> Path:
+    digest = hashlib.sha256(raw).hexdigest()
+    return cache_path / CLEANER_VERSION / digest[:2] / f"{digest}.gz"
+
+
+def read_cleaned_i_file(i_file_path: Path, cache_path: Path = CLEANED_SOURCES_PATH) -> str:
+    """
+    clean_i_file of the given .i file, cached on disk as gzip compressed text keyed by the
+    sha256 of the raw file and CLEANER_VERSION.
+    """
+    raw = Path(i_file_path).read_bytes()
+    entry_path = cleaned_source_path(raw, cache_path)
+    try:
+        return gzip.decompress(entry_path.read_bytes()).decode("utf-8")
+    except (FileNotFoundError, EOFError, gzip.BadGzipFile):
+        pass
+
+    # Decode exactly like open(path, 'r') does
+    code = clean_i_file(io.TextIOWrapper(io.BytesIO(raw)).read())
+    entry_path.parent.mkdir(parents=True, exist_ok=True)
+    # A temporary file per writer, threads and processes may clean the same source at once
+    with tempfile.NamedTemporaryFile(dir=entry_path.parent, prefix=f"{entry_path.name}.", suffix=".tmp", delete=False) as f:
+        f.write(gzip.compress(code.encode("utf-8"), compresslevel=6))
+    os.replace(f.name, entry_path)
+    return code
+
+
+def warm_cleaned_i_file(i_file_path: str) -> bool:
+    """Make sure the cleaned source of the file is cached. Returns False if the file could not be read."""
+    try:
+        read_cleaned_i_file(Path(i_file_path))
+        return True
+    except (OSError, UnicodeDecodeError):
+        return False
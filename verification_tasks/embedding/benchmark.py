@@ -0,0 +1,44 @@
+import resource
+import time
+import numpy as np
+from .registry import load_embedder
+
+# Registry names of the embedders with a precision option
+BENCHMARK_EMBEDDERS = ("codebert", "codet5p", "qwen", "nvembed")
+
+
+def run_embedder_benchmark(embedder_name: str, precision: str, codes: list[str], batch_size: int = 8) -> dict:
+    """
+    Embed codes with one embedder configuration and measure it. Meant to run in a fresh
+    process per configuration so that the peak RSS belongs to that configuration alone.
+    """
+    start = time.perf_counter()
+    embedder = load_embedder(embedder_name, precision=precision)
+    load_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    embeddings = []
+    for offset in range(0, len(codes), batch_size):
+        embeddings.extend(embedder.embed_batch(codes[offset:offset + batch_size]))
+    seconds = time.perf_counter() - start
+
+    return {
+        "load_seconds": load_seconds,
+        "seconds": seconds,
+        "files_per_second": len(codes) / seconds if seconds > 0 else float("inf"),
+        "peak_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,  # kilobytes on Linux
+        "embeddings": [None if embedding is None else np.ravel(embedding).astype(np.float32) for embedding in embeddings],
+    }
+
+
+def cosine_drift(embeddings: list, reference: list) -> tuple[float, float]:
+    """Mean and max of 1 - cosine similarity between matching embeddings."""
+    drifts = []
+    for embedding, expected in zip(embeddings, reference):
+        if embedding is None or expected is None:
+            continue
+        similarity = np.dot(embedding, expected) / max(np.linalg.norm(embedding) * np.linalg.norm(expected), 1e-12)
+        drifts.append(1.0 - float(similarity))
+    if not drifts:
+        return float("nan"), float("nan")
+    return float(np.mean(drifts)), float(np.max(drifts))
@@ -0,0 +1,106 @@
+from pathlib import Path
+from threading import Lock
+import fcntl
+import hashlib
+import json
+import os
+import re
+import numpy as np
+
+EMBEDDING_CACHE_PATH = Path("./chroma/embedding_cache")
+
+
+def source_hash(code: str) -> str:
+    return hashlib.sha256(code.encode("utf-8")).hexdigest()
+
+
+class EmbeddingCache:
+    """
+    Persistent content addressed cache of embeddings for one embedder configuration.
+
+    Embeddings are keyed by the sha256 of the preprocessed source and stored per cache key
+    (embedder name, model revision and max length) as an append-only float16 matrix that is
+    memory-mapped for reads, next to an index file with one "source hash<TAB>row" line per entry.
+    Appends hold an exclusive file lock, so several processes (e.g. embedding shards) can share a cache.
+    """
+
+    def __init__(self, cache_key: str, path: Path = EMBEDDING_CACHE_PATH):
+        self.directory = Path(path) / re.sub(r"[^\w.@-]+", "_", cache_key)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self._matrix_path = self.directory / "embeddings.f16"
+        self._index_path = self.directory / "index.txt"
+        self._meta_path = self.directory / "meta.json"
+        self._lock = Lock()
+
+        self.dim: int | None = None
+        if self._meta_path.exists():
+            self.dim = json.loads(self._meta_path.read_text())["dim"]
+
+        self._rows: dict[str, int] = {}
+        if self._index_path.exists() and self.dim is not None:
+            # Only trust complete index lines whose row was fully written: a crash between the two
+            # appends of put_many leaves matrix rows without index lines or a torn last line
+            stored_rows = self._stored_rows()
+            with open(self._index_path, "r") as f:
+                for line in f:
+                    key, _, row = line.rstrip("\n").partition("\t")
+                    if line.endswith("\n") and row.isdigit() and int(row) < stored_rows:
+                        self._rows[key] = int(row)
+        self._matrix: np.memmap | None = None
+
+    def _stored_rows(self) -> int:
+        return self._matrix_path.stat().st_size // (2 * self.dim) if self._matrix_path.exists() else 0
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._rows
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    def get(self, key: str) -> list[float] | None:
+        with self._lock:
+            row = self._rows.get(key)
+            if row is None:
+                return None
+            if self._matrix is None or self._matrix.shape[0] <= row:
+                self._matrix = np.memmap(self._matrix_path, dtype=np.float16, mode="r", shape=(self._stored_rows(), self.dim))
+            return self._matrix[row].astype(np.float32).tolist()
+
+    def put_many(self, entries: list[tuple[str, list[float]]]) -> None:
+        with self._lock:
+            new_entries = {}
+            for key, embedding in entries:
+                if key not in self._rows and key not in new_entries:
+                    new_entries[key] = np.ravel(np.asarray(embedding, dtype=np.float16))
+            if not new_entries:
+                return
+
+            # Other processes may have appended since this cache was opened, rows are placed after theirs
+            with open(self.directory / ".lock", "w") as lock_file:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+                if self.dim is None and self._meta_path.exists():
+                    self.dim = json.loads(self._meta_path.read_text())["dim"]
+                if self.dim is None:
+                    self.dim = len(next(iter(new_entries.values())))
+                    self._meta_path.write_text(json.dumps({"dim": self.dim}))
+                first_row = self._stored_rows()
+
+                # Matrix rows first, the index line makes an entry visible
+                with open(self._matrix_path, "ab") as f:
+                    # Drop a partially written row, whole rows without index line only waste space
+                    f.truncate(first_row * 2 * self.dim)
+                    f.write(np.stack(list(new_entries.values())).tobytes())
+                with open(self._index_path, "ab+") as f:
+                    # Drop a torn last line, appending to it would complete it
+                    size = f.seek(0, os.SEEK_END)
+                    f.seek(max(0, size - 4096))
+                    tail = f.read()
+                    if tail and not tail.endswith(b"\n"):
+                        f.truncate(size - len(tail) + tail.rfind(b"\n") + 1)
+                    f.writelines(f"{key}\t{row}\n".encode() for row, key in enumerate(new_entries, start=first_row))
+
+            for row, key in enumerate(new_entries, start=first_row):
+                self._rows[key] = row
+
+    def put(self, key: str, embedding: list[float]) -> None:
+        self.put_many([(key, embedding)])
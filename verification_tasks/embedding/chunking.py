@@ -0,0 +1,123 @@
+import re
+import textwrap
+from typing import List
+from .windowing import special_token_frame, split_windows
+
+
+def extract_c_functions_no_regex(code: str) -> list[str]:
+    functions = []
+    lines = code.splitlines()
+
+    in_func = False
+    brace_level = 0
+    func_lines = []
+
+    # Buffer to hold possible function header lines (in case function header spans multiple lines)
+    header_buffer = []
+
+    for line in lines:
+        stripped = line.strip()
+
+        if not in_func:
+            header_buffer.append(line)
+
+            # Heuristic: function header ends when line contains ')' and next non-empty line contains '{'
+            if ')' in stripped and stripped.endswith(')') or stripped.endswith('){') or stripped.endswith(') {'):
+                # We now expect function body starting on this or next line
+
+                # Join header buffer lines as one header candidate
+                header = "\n".join(header_buffer)
+
+                # We check if '{' is at the end of this line or the next line
+                if stripped.endswith('{') or stripped.endswith('){') or stripped.endswith(') {'):
+                    in_func = True
+                    brace_level = 1
+                    func_lines = header_buffer.copy()
+                    header_buffer = []
+                else:
+                    # Might have '{' in next line(s), wait for it
+                    continue
+            else:
+                # Not a function header end line yet, keep accumulating header
+                if stripped == '':
+                    # empty line resets header buffer
+                    header_buffer = []
+                continue
+
+        else:
+            func_lines.append(line)
+            # Count braces
+            brace_level += line.count('{')
+            brace_level -= line.count('}')
+
+            if brace_level == 0:
+                # Function body ended
+                functions.append("\n".join(func_lines))
+                func_lines = []
+                in_func = False
+                header_buffer = []
+
+    return functions
+
+
+def remove_c_comments(code: str) -> str:
+    # Remove // single-line comments
+    code = re.sub(r'//.*', '', code)
+    # Remove /* multi-line */ comments
+    code = re.sub(r'/\*[\s\S]*?\*/', '', code)
+    return code
+
+
+def normalize_whitespace(code: str) -> str:
+    # Remove extra whitespace, preserve newlines
+    lines = textwrap.dedent(code).splitlines()
+    return "\n".join(line.rstrip() for line in lines if line.strip())
+
+
+def chunk_functions(codes: List[str], tokenizer, max_length: int = 512, overlap: int = 64) -> tuple[List[List[int]], List[int]]:
+    """
+    Input ids of the chunks of all C functions in codes and the index of the code each chunk belongs to.
+    Functions of all codes are tokenized in one call, long functions are split into overlapping
+    windows of token ids of max_length, each wrapped in the special tokens of the tokenizer.
+    """
+    functions, function_owners = [], []
+    for i, code in enumerate(codes):
+        cleaned = remove_c_comments(code)
+        normalized = normalize_whitespace(cleaned)
+        code_functions = extract_c_functions_no_regex(normalized)
+        functions.extend(code_functions)
+        function_owners.extend([i] * len(code_functions))
+
+    prefix, suffix = special_token_frame(tokenizer)
+    function_ids = tokenizer(functions, add_special_tokens=False, truncation=False, verbose=False)["input_ids"] if functions else []
+    input_ids, owners = [], []
+    for owner, ids in zip(function_owners, function_ids):
+        for window in split_windows(ids, max_length - len(prefix) - len(suffix), overlap):
+            input_ids.append(prefix + window + suffix)
+            owners.append(owner)
+    return input_ids, owners
+
+
+def chunk_by_bytes(text: str, max_bytes: int) -> List[str]:
+    """
+    Split text into chunks of at most max_bytes UTF-8 bytes (counting a newline after the last
+    line), cut after the last line that fits. A line longer than max_bytes is cut at the last
+    character boundary that fits. Trailing newlines of a chunk are dropped, empty chunks are skipped.
+    The text is encoded once and each chunk found with one rfind, so this is linear in the text size.
+    """
+    if max_bytes < 4:
+        raise ValueError("max_bytes has to fit any UTF-8 character (4 bytes)")
+    data = text.encode("utf-8") + b"\n"
+    chunks, start = [], 0
+    while start < len(data):
+        end = data.rfind(b"\n", start, start + max_bytes) + 1
+        if end == 0:
+            # No line break within the budget, cut the line without splitting a multi-byte character
+            end = start + max_bytes
+            while end > start and (data[end] & 0xC0) == 0x80:
+                end -= 1
+        chunk = data[start:end].decode("utf-8").rstrip("\n")
+        if chunk:
+            chunks.append(chunk)
+        start = end
+    return chunks
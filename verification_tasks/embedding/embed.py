@@ -1,53 +1,146 @@
 from verification_tasks.models import VerificationTask
 from chromadb import Collection
+from concurrent.futures import ThreadPoolExecutor
+from queue import Queue
+from threading import Event, Thread
 from tqdm import tqdm
+import numpy as np
 from .embedders.base_embedder import Embedder
+from .cache import EmbeddingCache, source_hash
 
+_DONE = None  # sentinel closing a pipeline queue
 
-def embed_verifications_tasks(vts: list[int], embedder: Embedder, collection:Collection):
-    source_entries = collection.get()
-    source_vt_ids = [int(id) for id in source_entries["ids"] if id.isdigit()]
-    vts_to_embed = [vt_id for vt_id in vts if vt_id not in source_vt_ids]
+
+def embed_verifications_tasks(vts: list[int], embedder: Embedder, collection: Collection, num_workers: int = 4, batch_size: int = 32, queue_depth: int = 4, upsert_batch_size: int = 500, cache: EmbeddingCache | None = None):
+    """
+    Embed all verification tasks that are not yet in the collection with a three stage pipeline:
+
+    - num_workers reader threads read and preprocess the source files ahead of the model,
+    - the calling thread embeds them in batches of batch_size with embedder.embed_batch,
+      which splits each batch further into token budgeted model batches (see TokenBudgetScheduler),
+    - a writer thread upserts the embeddings into the collection in batches of upsert_batch_size.
+
+    The queues between the stages hold at most queue_depth batches, so readers block once they
+    are that far ahead of the model and the model blocks if the writer falls behind. If any
+    stage fails, the pipeline winds down and the exception is re-raised here.
+
+    Sources whose embedding is already in the cache (by default the EmbeddingCache of the
+    embedder's cache_key) skip the model.
+    """
+    existing_ids = set(collection.get(include=[])["ids"])
+    vts_to_embed = [vt_id for vt_id in vts if str(vt_id) not in existing_ids]
     print(f"Embedding {len(vts_to_embed)} verification tasks out of {len(vts)} total tasks.")
     print("Skipping already embedded tasks:", len(vts) - len(vts_to_embed))
-    
-    batch_size = 100
-    # Process IDs in batches
-    for i in tqdm(range(0, len(vts_to_embed), batch_size), desc="Insert Entries into Collection"):
-        batch_ids = vts_to_embed[i:i+batch_size]
+    if not vts_to_embed:
+        return
+
+    cache = cache if cache is not None else EmbeddingCache(embedder.cache_key)
+    tasks = VerificationTask.objects.select_related("category").in_bulk(vts_to_embed)
+    source_queue: Queue = Queue(maxsize=queue_depth * batch_size)
+    write_queue: Queue = Queue(maxsize=queue_depth)
+    errors: list[Exception] = []  # of the producer and writer threads
+    failed = Event()
+
+    def read(vt_id: int) -> None:
+        if failed.is_set():
+            return
+        try:
+            source_queue.put(read_verification_task(tasks[vt_id]))
+        except Exception as e:
+            print(f"Error embedding verification task {vt_id}: {e}")
+
+    def produce() -> None:
         try:
-            source_entries = collection.get(
-                ids=[str(b_id) for b_id in batch_ids],
-                include=["embeddings", "documents", "metadatas"]
-            )
-            if len(source_entries["ids"]) != len(batch_ids):
-                for vt_id in batch_ids:
-                    try:
-                        vt = VerificationTask.objects.get(id=vt_id)
-                        embed_verification_task(vt, embedder, collection)
-                    except Exception as e:
-                        print(f"Error embedding verification task {vt_id}: {e}")
+            with ThreadPoolExecutor(max_workers=num_workers) as pool:
+                # readers block on the bounded source queue while the model is busy
+                list(pool.map(read, vts_to_embed))
+        except Exception as e:
+            errors.append(e)
+            failed.set()
+        finally:
+            source_queue.put(_DONE)
 
+    def write() -> None:
+        pending = []
+        try:
+            while (batch := write_queue.get()) is not _DONE:
+                pending.extend(batch)
+                if len(pending) >= upsert_batch_size:
+                    upsert_embeddings(collection, pending)
+                    pending = []
+            if pending:
+                upsert_embeddings(collection, pending)
         except Exception as e:
-            for vt_id in batch_ids:
+            errors.append(e)
+            failed.set()
+            # Keep draining, the model thread must not block on the full queue
+            while write_queue.get() is not _DONE:
+                pass
+
+    producer, writer = Thread(target=produce, daemon=True), Thread(target=write, daemon=True)
+    producer.start()
+    writer.start()
+
+    drained = False
+    try:
+        with tqdm(total=len(vts_to_embed), desc="Embedding verification tasks") as progress:
+            batch = []
+            while (source := source_queue.get()) is not _DONE:
+                if failed.is_set():
+                    continue  # drain the sources the readers already queued
+                batch.append(source)
+                if len(batch) == batch_size:
+                    write_queue.put(_embed_batch(batch, embedder, cache))
+                    progress.update(len(batch))
+                    batch = []
+            drained = True
+            if batch and not failed.is_set():
+                write_queue.put(_embed_batch(batch, embedder, cache))
+                progress.update(len(batch))
+    except BaseException:
+        failed.set()
+        # Unblock the readers, the producer closes the source queue once they are done
+        while not drained and source_queue.get() is not _DONE:
+            pass
+        raise
+    finally:
+        write_queue.put(_DONE)
+        producer.join()
+        writer.join()
+    if errors:
+        raise errors[0]
+
+
+def _embed_batch(batch: list[tuple[VerificationTask, str, str]], embedder: Embedder, cache: EmbeddingCache) -> list[tuple[VerificationTask, str, list[float]]]:
+    keys = [source_hash(code) for _, _, code in batch]
+    embeddings = [cache.get(key) for key in keys]
+    misses = [i for i, embedding in enumerate(embeddings) if embedding is None]
+    if misses:
+        try:
+            computed = embedder.embed_batch([batch[i][2] for i in misses])
+        except Exception as e:
+            # Retry one by one so a single bad source does not drop the whole batch
+            computed = []
+            for i in misses:
                 try:
-                    vt = VerificationTask.objects.get(id=vt_id)
-                    embed_verification_task(vt, embedder, collection)
+                    computed.append(embedder.embed(batch[i][2]))
                 except Exception as e:
-                    print(f"Error embedding verification task {vt_id}: {e}")
+                    print(f"Error embedding verification task {batch[i][0].pk}: {e}")
+                    computed.append(None)
+        for i, embedding in zip(misses, computed):
+            embeddings[i] = embedding
+        cache.put_many([(keys[i], embedding) for i, embedding in zip(misses, computed) if embedding is not None])
 
+    embedded = []
+    for (vt, file_type, _), embedding in zip(batch, embeddings):
+        if embedding is None:
+            print("Problem with embedding, skipping task:", vt.pk)
+            continue
+        embedded.append((vt, file_type, embedding))
+    return embedded
 
-def embed_verification_task(vt: VerificationTask, embedder: Embedder, collection: Collection):
-    try:
-        source_entries = collection.get(
-            ids=[str(vt.pk)],
-            include=["embeddings", "documents", "metadatas"]
-        )
-        if len(source_entries["ids"]) == 1:
-            return 
-    except Exception as e:
-        pass # should rerun embedding
 
+def read_verification_task(vt: VerificationTask) -> tuple[VerificationTask, str, str]:
     if vt.has_c_file():
         file_type = "c"
         code = vt.read_c_file()
@@ -60,20 +153,45 @@ def embed_verification_task(vt: VerificationTask, embedder: Embedder, collection
             raise ValueError("I file is empty or not found!")
     else:
         raise ValueError("No file found!")
-    
-    final_embedding = embedder.embed(code)
-    if final_embedding is None:
-        print("Problem with embedding, skipping task:", vt.pk)
-        return
-    
+    return vt, file_type, code
+
+
+def upsert_embeddings(collection: Collection, embedded: list[tuple[VerificationTask, str, list[float]]]) -> None:
     collection.upsert(
-        embeddings=final_embedding,
+        embeddings=[np.ravel(embedding) for _, _, embedding in embedded],  # some embedders return a (1, dim) vector
         metadatas=[
             {
                 "verification_task": vt.name,
                 "file_type": file_type,
                 "verification_category": vt.category.name
             }
+            for vt, file_type, _ in embedded
         ],
-        ids=[str(vt.pk)]
+        ids=[str(vt.pk) for vt, _, _ in embedded]
     )
+
+
+def embed_verification_task(vt: VerificationTask, embedder: Embedder, collection: Collection, cache: EmbeddingCache | None = None):
+    try:
+        source_entries = collection.get(
+            ids=[str(vt.pk)],
+            include=["embeddings", "documents", "metadatas"]
+        )
+        if len(source_entries["ids"]) == 1:
+            return
+    except Exception as e:
+        pass # should rerun embedding
+
+    vt, file_type, code = read_verification_task(vt)
+
+    cache = cache if cache is not None else EmbeddingCache(embedder.cache_key)
+    key = source_hash(code)
+    final_embedding = cache.get(key)
+    if final_embedding is None:
+        final_embedding = embedder.embed(code)
+        if final_embedding is None:
+            print("Problem with embedding, skipping task:", vt.pk)
+            return
+        cache.put(key, final_embedding)
+
+    upsert_embeddings(collection, [(vt, file_type, final_embedding)])
@@ -6,3 +6,18 @@ class Embedder(ABC):
     @abstractmethod
     def embed(self, code: str) -> List[float]|None:
         pass
+
+    def embed_batch(self, codes: List[str]) -> List[List[float]|None]:
+        """Embed several sources at once. Falls back to one embed call per source."""
+        return [self.embed(code) for code in codes]
+
+    @property
+    def cache_key(self) -> str:
+        """Identifies the model and settings behind the embeddings, see EmbeddingCache."""
+        return type(self).__name__
+
+
+def model_revision(model) -> str:
+    # transformers records the resolved hub commit on the config of downloaded models
+    return getattr(getattr(model, "config", None), "_commit_hash", None) or "local"
+
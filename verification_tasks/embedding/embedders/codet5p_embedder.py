@@ -1,36 +1,52 @@
 from transformers import AutoTokenizer, AutoModel
 import torch
-from .base_embedder import Embedder
+from .base_embedder import Embedder, model_revision
+from .precision import PRECISIONS, apply_precision
+from .torch_setup import select_device
+from ..scheduler import TokenBudgetScheduler
+from ..windowing import POOLINGS, embed_hierarchically
 from typing import List, Optional
-import os
-
-
-if torch.cuda.is_available():
-    print("CUDA is available! Using GPU.")
-    print(f"Number of GPUs: {torch.cuda.device_count()}")
-    print(f"Current CUDA device: {torch.cuda.current_device()}")
-    print(f"Device name: {torch.cuda.get_device_name(0)}")
-elif torch.backends.mps.is_available():
-    print("MPS is available! Using Apple Silicon GPU.")
-else:
-    print("CUDA is not available. Using CPU.")
-    num_threads = int(os.environ.get("SLURM_CPUS_PER_TASK", 1)) # Default to 1 if not in Slurm
-    torch.set_num_threads(num_threads)
-    print(f"PyTorch using {torch.get_num_threads()} CPU threads.")
 
 
 class CodeT5pEmbedder(Embedder):
-    def __init__(self):
-        self.device = torch.device("cuda" if torch.cuda.is_available() else "mps" if torch.backends.mps.is_available() else "cpu")
-        checkpoint = "Salesforce/codet5p-110m-embedding"
-        self.tokenizer = AutoTokenizer.from_pretrained(checkpoint, trust_remote_code=True)
-        self.model = AutoModel.from_pretrained(checkpoint, trust_remote_code=True).to(self.device)
+    def __init__(self, max_tokens: int = 8192, max_batch_size: int = 32, hierarchical: bool = False, window_size: int = 512, pooling: POOLINGS = "mean", max_windows: Optional[int] = None, precision: PRECISIONS = "fp32"):
+        """
+        hierarchical embeds the whole source as windows of window_size tokens pooled with pooling
+        (at most max_windows per source) instead of truncating it to the first 512 tokens.
+        precision selects fp32, bf16 or int8 dynamically quantized (CPU) inference.
+        """
+        self.scheduler = TokenBudgetScheduler(max_tokens=max_tokens, max_batch_size=max_batch_size)
+        self.hierarchical = hierarchical
+        self.window_size = window_size
+        self.pooling = pooling
+        self.max_windows = max_windows
+        self.precision = precision
+        self.device = select_device()
+        self.checkpoint = "Salesforce/codet5p-110m-embedding"
+        self.tokenizer = AutoTokenizer.from_pretrained(self.checkpoint, trust_remote_code=True)
+        self.model = apply_precision(AutoModel.from_pretrained(self.checkpoint, trust_remote_code=True).to(self.device), precision, self.device)
+
+    @property
+    def cache_key(self) -> str:
+        key = f"codet5p/{self.checkpoint}@{model_revision(self.model)}/{self.tokenizer.model_max_length}"
+        if self.hierarchical:
+            key += f"/windows-{self.window_size}-{self.pooling}-{self.max_windows}"
+        if self.precision != "fp32":
+            key += f"/{self.precision}"
+        return key
 
     def embed(self, code: str) -> Optional[List[float]]: # Optional for None return
-        inputs = self.tokenizer.encode(code, return_tensors="pt", truncation=True).to(self.device)
-        # Note: Added truncation=True to prevent issues with overly long code
-        with torch.no_grad():
-            embedding = self.model(inputs)[0] # Assuming [0] is the pooled embedding
-        return embedding.cpu().numpy().tolist()
-        
+        return self.embed_batch([code])[0]
+
+    def embed_batch(self, codes: List[str]) -> List[Optional[List[float]]]:
+        if self.hierarchical:
+            return embed_hierarchically(codes, self.tokenizer, self.window_size, self.scheduler, self._embed_input_ids, self.pooling, self.max_windows)
+        # Note: truncation=True prevents issues with overly long code
+        input_ids = self.tokenizer(codes, truncation=True)["input_ids"]
+        return self.scheduler.map(input_ids, [len(ids) for ids in input_ids], self._embed_input_ids)
 
+    def _embed_input_ids(self, input_ids: List[List[int]]) -> List[List[float]]:
+        inputs = self.tokenizer.pad({"input_ids": input_ids}, padding_side="right", return_tensors="pt").to(self.device)
+        with torch.no_grad():
+            embeddings = self.model(input_ids=inputs["input_ids"], attention_mask=inputs["attention_mask"])  # pooled embedding per sample
+        return embeddings.float().cpu().numpy().tolist()
@@ -1,83 +1,117 @@
 from .base_embedder import Embedder
+from ..chunking import chunk_by_bytes
+from ..rate_limit import AsyncTokenBucket
 from google import genai
+from google.genai import errors, types
 from dotenv import load_dotenv
-from typing import List
-import time
+from typing import List, Optional
+import asyncio
+import random
+import numpy as np
 
 load_dotenv(override=True)
 
+RETRY_STATUS_CODES = {429, 500, 502, 503, 504}
+
 
 class GeminiEmbedder(Embedder):
-    def __init__(self):
-        self.client = genai.Client()
+    def __init__(
+        self,
+        requests_per_minute: float = 60,
+        max_concurrency: int = 4,
+        max_batch_contents: int = 100,
+        max_retries: int = 6,
+        backoff_seconds: float = 1.0,
+        base_url: Optional[str] = None,
+        api_key: Optional[str] = None,
+    ):
+        """
+        Embeds with the Gemini API from an asyncio event loop: sources are packed into
+        batchEmbedContents requests of at most max_batch_contents contents and safe_max_content_bytes,
+        at most max_concurrency requests are in flight and a token bucket keeps them below
+        requests_per_minute. Requests failing with 429 or 5xx are retried with exponential backoff.
+        base_url points the client at another endpoint, e.g. a local stub server in tests.
+        """
+        http_options = types.HttpOptions(base_url=base_url) if base_url else None
+        self.client = genai.Client(api_key=api_key, http_options=http_options)
         self.model_name = "models/text-embedding-004"
         self.api_max_bytes_limit = 4 * 1024 * 1024
         self.safe_max_content_bytes = int(self.api_max_bytes_limit * 0.95) # 95% of the limit
+        self.max_batch_contents = max_batch_contents
+        self.max_concurrency = max_concurrency
+        self.max_retries = max_retries
+        self.backoff_seconds = backoff_seconds
+        self.rate_limiter = AsyncTokenBucket(rate=requests_per_minute / 60, capacity=max_concurrency)
+        # One loop for the lifetime of the embedder, the async client and the bucket stay bound to it
+        self._loop = asyncio.new_event_loop()
 
-
+    @property
+    def cache_key(self) -> str:
+        return f"gemini/{self.model_name}/{self.safe_max_content_bytes}"
 
     def embed(self, code: str) -> List[float]|None:
-        code_bytes = code.encode('utf-8')
-        code_size_bytes = len(code_bytes)
+        return self.embed_batch([code])[0]
+
+    def embed_batch(self, codes: List[str]) -> List[List[float]|None]:
+        return self._loop.run_until_complete(self.aembed_batch(codes))
+
+    async def aembed_batch(self, codes: List[str]) -> List[List[float]|None]:
+        # Sources over the request size limit are embedded as the mean of their chunks, all chunks
+        # of all sources are requested concurrently
+        contents, owners = [], []
+        for i, code in enumerate(codes):
+            chunks = [code] if len(code.encode("utf-8")) <= self.safe_max_content_bytes else chunk_by_bytes(code, self.safe_max_content_bytes)
+            contents.extend(chunks)
+            owners.extend([i] * len(chunks))
+
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+
+        async def embed_request(indices: List[int]) -> None:
+            async with semaphore:
+                embeddings = await self._embed_contents([contents[i] for i in indices])
+            for i, embedding in zip(indices, embeddings):
+                content_embeddings[i] = embedding
 
-        # If code fits within limit, embed directly
-        if code_size_bytes <= self.safe_max_content_bytes:
+        content_embeddings: List[Optional[List[float]]] = [None] * len(contents)
+        await asyncio.gather(*(embed_request(indices) for indices in self._requests(contents)))
+
+        embeddings_per_code: List[List[List[float]]] = [[] for _ in codes]
+        for owner, embedding in zip(owners, content_embeddings):
+            if embedding is not None:
+                embeddings_per_code[owner].append(embedding)
+        return [np.mean(embeddings, axis=0).tolist() if embeddings else None for embeddings in embeddings_per_code]
+
+    def _requests(self, contents: List[str]) -> List[List[int]]:
+        """Indices of contents grouped into requests within the content count and size limits."""
+        requests, request, request_bytes = [], [], 0
+        for i, content in enumerate(contents):
+            size = len(content.encode("utf-8"))
+            if request and (len(request) == self.max_batch_contents or request_bytes + size > self.safe_max_content_bytes):
+                requests.append(request)
+                request, request_bytes = [], 0
+            request.append(i)
+            request_bytes += size
+        if request:
+            requests.append(request)
+        return requests
+
+    async def _embed_contents(self, contents: List[str]) -> List[Optional[List[float]]]:
+        for attempt in range(self.max_retries + 1):
+            await self.rate_limiter.acquire()
             try:
-                response = self.client.models.embed_content(
-                    model=self.model_name, contents=code
-                )
-                if not response.embeddings or not response.embeddings[0].values:
+                response = await self.client.aio.models.embed_content(model=self.model_name, contents=contents)
+                if not response.embeddings or len(response.embeddings) != len(contents):
                     raise ValueError("No embeddings returned from Gemini model.")
-                time.sleep(1)
-                return response.embeddings[0].values
-            except Exception as e:
-                print(f"Error embedding code: {e}")
-                return None
-        
-        # If code is too large, split into chunks and compute mean embedding
-        print(f"Code size ({code_size_bytes} bytes) exceeds limit. Chunking...")
-        
-        # Split code into chunks based on lines to maintain some semantic structure
-        lines = code.split('\n')
-        chunks = []
-        current_chunk = ""
-        
-        for line in lines:
-            test_chunk = current_chunk + line + '\n' if current_chunk else line + '\n'
-            if len(test_chunk.encode('utf-8')) > self.safe_max_content_bytes:
-                if current_chunk:  # Add current chunk if it has content
-                    chunks.append(current_chunk.rstrip('\n'))
-                    current_chunk = line + '\n'
-                else:  # Single line is too large, split by characters
-                    chunks.append(line[:self.safe_max_content_bytes//2])
-                    current_chunk = line[self.safe_max_content_bytes//2:] + '\n'
-            else:
-                current_chunk = test_chunk
-        
-        if current_chunk:  # Add remaining chunk
-            chunks.append(current_chunk.rstrip('\n'))
-        
-        # Get embeddings for each chunk
-        chunk_embeddings = []
-        for i, chunk in enumerate(chunks):
-            try:
-                response = self.client.models.embed_content(
-                    model=self.model_name, contents=chunk
-                )
-                if response.embeddings and response.embeddings[0].values:
-                    chunk_embeddings.append(response.embeddings[0].values)
-                    print(f"Embedded chunk {i+1}/{len(chunks)}")
-                time.sleep(1)
+                return [embedding.values or None for embedding in response.embeddings]
+            except errors.APIError as e:
+                if e.code not in RETRY_STATUS_CODES or attempt == self.max_retries:
+                    print(f"Error embedding {len(contents)} contents: {e}")
+                    return [None] * len(contents)
+                # Exponential backoff with full jitter, so concurrent requests do not retry in lockstep
+                delay = random.uniform(0, self.backoff_seconds * 2 ** attempt)
+                print(f"Gemini API returned {e.code}, retrying in {delay:.1f}s ({attempt + 1}/{self.max_retries}).")
+                await asyncio.sleep(delay)
             except Exception as e:
-                print(f"Error embedding chunk {i+1}: {e}")
-                continue
-        
-        if not chunk_embeddings:
-            print("Failed to embed any chunks")
-            return None
-        
-        # Compute mean embedding
-        import numpy as np
-        mean_embedding = np.mean(chunk_embeddings, axis=0).tolist()
-        print(f"Created mean embedding from {len(chunk_embeddings)} chunks")
-        return mean_embedding
+                print(f"Error embedding {len(contents)} contents: {e}")
+                return [None] * len(contents)
+        return [None] * len(contents)
@@ -0,0 +1,65 @@
+import json
+import os
+from pathlib import Path
+from typing import List, Optional
+import numpy as np
+import onnxruntime as ort
+from transformers import AutoTokenizer
+from .base_embedder import Embedder
+from ..chunking import chunk_functions
+from ..scheduler import TokenBudgetScheduler
+
+
+class OnnxEmbedder(Embedder):
+    def __init__(self, export_dir: str | Path, intra_op_threads: Optional[int] = None, inter_op_threads: int = 1, max_tokens: int = 8192, max_batch_size: int = 32):
+        """
+        Runs a model exported with the export_onnx command on the onnxruntime CPU provider, without torch.
+        intra_op_threads defaults to SLURM_CPUS_PER_TASK (or onnxruntime's own choice outside Slurm).
+        """
+        self.export_dir = Path(export_dir)
+        with open(self.export_dir / "embedder.json") as f:
+            self.config = json.load(f)
+        self.kind = self.config["kind"]
+        self.max_length = self.config["max_length"]
+        self.overlap = self.config["overlap"]
+        self.tokenizer = AutoTokenizer.from_pretrained(self.export_dir)
+        self.scheduler = TokenBudgetScheduler(max_tokens=max_tokens, max_batch_size=max_batch_size)
+
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        intra_op_threads = intra_op_threads or int(os.environ.get("SLURM_CPUS_PER_TASK", 0))
+        if intra_op_threads:
+            options.intra_op_num_threads = intra_op_threads
+        options.inter_op_num_threads = inter_op_threads
+        self.session = ort.InferenceSession(str(self.export_dir / "model.onnx"), options, providers=["CPUExecutionProvider"])
+        print(f"onnxruntime using {options.intra_op_num_threads or 'default'} intra-op and {inter_op_threads} inter-op threads.")
+
+    @property
+    def cache_key(self) -> str:
+        # Embeddings match the PyTorch ones within tolerance only, so they are cached separately
+        key = f"onnx/{self.kind}/{self.config['checkpoint']}@{self.config['revision']}/{self.max_length}"
+        return f"{key}/{self.overlap}" if self.kind == "codebert" else key
+
+    def embed(self, code: str) -> Optional[List[float]]:
+        return self.embed_batch([code])[0]
+
+    def embed_batch(self, codes: List[str]) -> List[Optional[List[float]]]:
+        if self.kind != "codebert":
+            input_ids = self.tokenizer(codes, truncation=True, max_length=self.max_length)["input_ids"]
+            return [embedding.tolist() for embedding in self.scheduler.map(input_ids, [len(ids) for ids in input_ids], self._embed_input_ids)]
+
+        # Same function chunking as TransformerEmbedder, chunks averaged per source
+        input_ids, owners = chunk_functions(codes, self.tokenizer, self.max_length, self.overlap)
+        chunk_embeddings = self.scheduler.map(input_ids, [len(ids) for ids in input_ids], self._embed_input_ids)
+        embeddings_per_code: List[List[np.ndarray]] = [[] for _ in codes]
+        for owner, embedding in zip(owners, chunk_embeddings):
+            embeddings_per_code[owner].append(embedding)
+        return [np.mean(embeddings, axis=0).tolist() if embeddings else None for embeddings in embeddings_per_code]
+
+    def _embed_input_ids(self, input_ids: List[List[int]]) -> List[np.ndarray]:
+        inputs = self.tokenizer.pad({"input_ids": input_ids}, padding_side="right", return_tensors="np")
+        embeddings = self.session.run(["sentence_embedding"], {
+            "input_ids": inputs["input_ids"].astype(np.int64),
+            "attention_mask": inputs["attention_mask"].astype(np.int64),
+        })[0]
+        return list(embeddings.astype(np.float64))
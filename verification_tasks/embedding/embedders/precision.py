@@ -0,0 +1,25 @@
+from typing import Literal
+import torch
+
+PRECISIONS = Literal["fp32", "bf16", "int8"]
+
+
+def apply_precision(model: torch.nn.Module, precision: PRECISIONS, device) -> torch.nn.Module:
+    """
+    Opt-in reduced precision inference:
+    - "int8": dynamic int8 quantization of all Linear layers (CPU only),
+    - "bf16": bfloat16 weights and activations, where the device supports them.
+    """
+    device = torch.device(device)
+    if precision == "int8":
+        if device.type != "cpu":
+            raise ValueError("int8 dynamic quantization is only supported on CPU")
+        return torch.ao.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+    if precision == "bf16":
+        if device.type == "cuda" and not torch.cuda.is_bf16_supported():
+            print("bf16 is not supported on this GPU, using fp32.")
+            return model
+        return model.to(torch.bfloat16)
+    if precision != "fp32":
+        raise ValueError(f"Unknown precision {precision}")
+    return model
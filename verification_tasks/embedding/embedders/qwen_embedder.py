@@ -1,40 +1,68 @@
 from transformers import AutoTokenizer, AutoModel
 import torch
-from .base_embedder import Embedder
+from .base_embedder import Embedder, model_revision
+from .precision import PRECISIONS, apply_precision
+from .torch_setup import select_device
+from ..scheduler import TokenBudgetScheduler
+from ..windowing import POOLINGS, embed_hierarchically
 from typing import List, Optional
 
 
 class QwenEmbedder(Embedder):
-    def __init__(self):
-        if torch.cuda.is_available():
-            print("CUDA is available! Using GPU.")
-            print(f"Number of GPUs: {torch.cuda.device_count()}")
-            print(f"Current CUDA device: {torch.cuda.current_device()}")
-            print(f"Device name: {torch.cuda.get_device_name(0)}")
-        elif torch.backends.mps.is_available():
-            print("MPS is available! Using Apple Silicon GPU.")
-        else:
-            print("CUDA is not available. Using CPU.")
-        
-        self.device = torch.device("cuda" if torch.cuda.is_available() else "mps" if torch.backends.mps.is_available() else "cpu")
-        checkpoint = "Qwen/Qwen3-Embedding-0.6B"
-        self.tokenizer = AutoTokenizer.from_pretrained(checkpoint, trust_remote_code=True)
+    def __init__(self, max_tokens: int = 32768, max_batch_size: int = 16, hierarchical: bool = False, window_size: int = 2048, pooling: POOLINGS = "mean", max_windows: Optional[int] = None, precision: Optional[PRECISIONS] = None):
+        """
+        hierarchical embeds the whole source as windows of window_size tokens pooled with pooling
+        (at most max_windows per source) instead of attending over up to 30000 tokens at once.
+        precision selects fp32, bf16 or int8 dynamically quantized (CPU) inference, by default
+        bf16 on CUDA and fp32 otherwise.
+        """
+        self.scheduler = TokenBudgetScheduler(max_tokens=max_tokens, max_batch_size=max_batch_size)
+        self.hierarchical = hierarchical
+        self.window_size = window_size
+        self.pooling = pooling
+        self.max_windows = max_windows
+        self.device = select_device()
+        self.checkpoint = "Qwen/Qwen3-Embedding-0.6B"
+        self.max_length = 30000
+        self.tokenizer = AutoTokenizer.from_pretrained(self.checkpoint, trust_remote_code=True)
+        self.precision = precision or ("bf16" if torch.cuda.is_available() else "fp32")
         self.model = AutoModel.from_pretrained(
-            checkpoint, 
+            self.checkpoint, 
             trust_remote_code=True,
-            torch_dtype=torch.bfloat16 if torch.cuda.is_available() else torch.float32,
+            torch_dtype=torch.bfloat16 if self.precision == "bf16" else torch.float32,
         ).to(self.device)
+        self.model = apply_precision(self.model, self.precision, self.device)
+
+    @property
+    def cache_key(self) -> str:
+        key = f"qwen/{self.checkpoint}@{model_revision(self.model)}/{self.max_length}"
+        if self.hierarchical:
+            key += f"/windows-{self.window_size}-{self.pooling}-{self.max_windows}"
+        if self.precision != "fp32":
+            key += f"/{self.precision}"
+        return key
 
     def embed(self, code: str) -> Optional[List[float]]:
-        inputs = self.tokenizer.encode(code, return_tensors="pt", truncation=True, max_length=30000).to(self.device)
+        return self.embed_batch([code])[0]
+
+    def embed_batch(self, codes: List[str]) -> List[Optional[List[float]]]:
+        if self.hierarchical:
+            return embed_hierarchically(codes, self.tokenizer, self.window_size, self.scheduler, self._embed_input_ids, self.pooling, self.max_windows)
+        input_ids = self.tokenizer(codes, truncation=True, max_length=self.max_length)["input_ids"]
+        return self.scheduler.map(input_ids, [len(ids) for ids in input_ids], self._embed_input_ids)
+
+    def _embed_input_ids(self, input_ids: List[List[int]]) -> List[List[float]]:
+        # Right padding keeps the positions of the real tokens identical to the unbatched forward pass
+        inputs = self.tokenizer.pad({"input_ids": input_ids}, padding_side="right", return_tensors="pt").to(self.device)
         with torch.no_grad():
-            outputs = self.model(inputs)[0]
-            embedding = outputs.mean(dim=1)
-            result = embedding.squeeze().cpu().numpy().astype(float).tolist()
-        
+            outputs = self.model(**inputs)[0]
+            mask = inputs["attention_mask"].unsqueeze(-1).to(outputs.dtype)
+            embeddings = (outputs * mask).sum(dim=1) / mask.sum(dim=1)  # mean over the real tokens
+            result = embeddings.float().cpu().numpy().astype(float).tolist()
+
         del inputs
         del outputs
-        del embedding
+        del embeddings
         if self.device.type in ['cuda', 'mps']:
             if self.device.type == 'cuda':
                 torch.cuda.empty_cache()
@@ -42,5 +70,3 @@ class QwenEmbedder(Embedder):
                 torch.mps.empty_cache()
 
         return result
-        
-
@@ -0,0 +1,33 @@
+import logging
+import os
+import torch
+
+logger = logging.getLogger(__name__)
+_threads_configured = False
+
+
+def configure_cpu_threads(threads: int | None = None) -> None:
+    """
+    Size torch's CPU thread pool, by default to SLURM_CPUS_PER_TASK (1 outside Slurm).
+    Without threads only the first call has an effect, so loading an embedder does not
+    override the threads a worker process was given (see embed_shard).
+    """
+    global _threads_configured
+    if threads is None and _threads_configured:
+        return
+    torch.set_num_threads(threads or int(os.environ.get("SLURM_CPUS_PER_TASK", 1)))
+    _threads_configured = True
+    logger.info("PyTorch using %d CPU threads.", torch.get_num_threads())
+
+
+def select_device(allow_mps: bool = True) -> torch.device:
+    """CUDA if available, then Apple Silicon (MPS) if allowed, else the CPU with configure_cpu_threads."""
+    if torch.cuda.is_available():
+        logger.info("Using CUDA device %d of %d: %s", torch.cuda.current_device(), torch.cuda.device_count(), torch.cuda.get_device_name(0))
+        return torch.device("cuda")
+    if allow_mps and torch.backends.mps.is_available():
+        logger.info("Using Apple Silicon GPU (MPS).")
+        return torch.device("mps")
+    logger.info("CUDA is not available. Using CPU.")
+    configure_cpu_threads()
+    return torch.device("cpu")
@@ -1,134 +1,48 @@
-import re
-import textwrap
 from transformers import AutoModel, AutoTokenizer
 import torch
-from .base_embedder import Embedder
+from .base_embedder import Embedder, model_revision
+from .precision import PRECISIONS, apply_precision
+from .torch_setup import select_device
+from ..scheduler import TokenBudgetScheduler
+from ..chunking import chunk_functions
 from typing import List
-import os
-
-if torch.cuda.is_available():
-    print("CUDA is available! Using GPU.")
-    print(f"Number of GPUs: {torch.cuda.device_count()}")
-    print(f"Current CUDA device: {torch.cuda.current_device()}")
-    print(f"Device name: {torch.cuda.get_device_name(0)}")
-else:
-    print("CUDA is not available. Using CPU.")
-
-num_threads = int(os.environ.get("SLURM_CPUS_PER_TASK", 1)) # Default to 1 if not in Slurm
-torch.set_num_threads(num_threads)
-print(f"PyTorch using {torch.get_num_threads()} CPU threads.")
 
 
 class TransformerEmbedder(Embedder):
-    def __init__(self, model_name: str = "microsoft/codebert-base"):
+    def __init__(self, model_name: str = "microsoft/codebert-base", max_tokens: int = 8192, max_batch_size: int = 32, max_length: int = 512, overlap: int = 64, precision: PRECISIONS = "fp32"):
+        self.model_name = model_name
+        self.max_length = max_length
+        self.overlap = overlap
+        self.precision = precision
         self.tokenizer = AutoTokenizer.from_pretrained(model_name)
-        self.device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
-        self.model = AutoModel.from_pretrained(model_name).to(self.device)
+        self.device = select_device(allow_mps=False)
+        self.model = apply_precision(AutoModel.from_pretrained(model_name).to(self.device), precision, self.device)
+        self.scheduler = TokenBudgetScheduler(max_tokens=max_tokens, max_batch_size=max_batch_size)
 
+    @property
+    def cache_key(self) -> str:
+        key = f"transformer/{self.model_name}@{model_revision(self.model)}/{self.max_length}/{self.overlap}"
+        return key if self.precision == "fp32" else f"{key}/{self.precision}"
 
     def embed(self, code: str) -> List[float]|None:
-        cleaned = self._remove_c_comments(code)
-        normalized = self._normalize_whitespace(cleaned)
-        functions = self._extract_c_functions_no_regex(normalized)
-        chunks = self._tokenize_and_chunk(functions, self.tokenizer)
-
-        embeddings = []
-        for chunk in chunks:
-            inputs = self.tokenizer(chunk, return_tensors="pt", truncation=True, max_length=512)
-            inputs = {key: value.to(self.device) for key, value in inputs.items()}
-            # inputs.to("mps")
-            with torch.no_grad():
-                output = self.model(**inputs)
-                emb = output.last_hidden_state[:, 0, :]  # CLS token
-                embeddings.append(emb)
-
-        final_embedding = torch.mean(torch.stack(embeddings), dim=0)
-        return final_embedding.cpu().numpy().tolist()
-    
-
-    def _extract_c_functions_no_regex(self, code: str) -> list[str]:
-        functions = []
-        lines = code.splitlines()
-        
-        in_func = False
-        brace_level = 0
-        func_lines = []
-        
-        # Buffer to hold possible function header lines (in case function header spans multiple lines)
-        header_buffer = []
-        
-        for line in lines:
-            stripped = line.strip()
-            
-            if not in_func:
-                header_buffer.append(line)
-                
-                # Heuristic: function header ends when line contains ')' and next non-empty line contains '{'
-                if ')' in stripped and stripped.endswith(')') or stripped.endswith('){') or stripped.endswith(') {'):
-                    # We now expect function body starting on this or next line
-                    
-                    # Join header buffer lines as one header candidate
-                    header = "\n".join(header_buffer)
-                    
-                    # We check if '{' is at the end of this line or the next line
-                    if stripped.endswith('{') or stripped.endswith('){') or stripped.endswith(') {'):
-                        in_func = True
-                        brace_level = 1
-                        func_lines = header_buffer.copy()
-                        header_buffer = []
-                    else:
-                        # Might have '{' in next line(s), wait for it
-                        continue
-                else:
-                    # Not a function header end line yet, keep accumulating header
-                    if stripped == '':
-                        # empty line resets header buffer
-                        header_buffer = []
-                    continue
-                    
-            else:
-                func_lines.append(line)
-                # Count braces
-                brace_level += line.count('{')
-                brace_level -= line.count('}')
-                
-                if brace_level == 0:
-                    # Function body ended
-                    functions.append("\n".join(func_lines))
-                    func_lines = []
-                    in_func = False
-                    header_buffer = []
-                    
-        return functions
-
+        return self.embed_batch([code])[0]
 
-    def _remove_c_comments(self, code: str) -> str:
-        # Remove // single-line comments
-        code = re.sub(r'//.*', '', code)
-        # Remove /* multi-line */ comments
-        code = re.sub(r'/\*[\s\S]*?\*/', '', code)
-        return code
 
+    def embed_batch(self, codes: List[str]) -> List[List[float]|None]:
+        # Chunks of all sources are scheduled together and averaged per source afterwards
+        input_ids, owners = chunk_functions(codes, self.tokenizer, self.max_length, self.overlap)
+        chunk_embeddings = self.scheduler.map(input_ids, [len(ids) for ids in input_ids], self._embed_input_ids)
 
-    def _normalize_whitespace(self, code: str) -> str:
-        # Remove extra whitespace, preserve newlines
-        lines = textwrap.dedent(code).splitlines()
-        return "\n".join(line.rstrip() for line in lines if line.strip())
+        embeddings_per_code: List[List[torch.Tensor]] = [[] for _ in codes]
+        for owner, embedding in zip(owners, chunk_embeddings):
+            embeddings_per_code[owner].append(embedding)
+        return [torch.mean(torch.stack(embeddings), dim=0).tolist() if embeddings else None for embeddings in embeddings_per_code]
 
 
-    def _tokenize_and_chunk(self, functions, tokenizer, max_length=512):
-        chunks = []
-        for fn in functions:
-            tokens = tokenizer(fn, return_tensors="pt", truncation=False)["input_ids"][0]
-            if len(tokens) <= max_length:
-                chunks.append(fn)
-                # if len(chunks) > 10:
-                #     return
-            else:
-                for i in range(0, len(tokens), max_length - 64):  # overlap
-                    chunk = tokenizer.decode(tokens[i:i + max_length])
-                    chunks.append(chunk)
-                    # if len(chunks) > 10:
-                    #     return
-        return chunks
-    
\ No newline at end of file
+    def _embed_input_ids(self, input_ids: List[List[int]]) -> List[torch.Tensor]:
+        inputs = self.tokenizer.pad({"input_ids": input_ids}, padding_side="right", return_tensors="pt")
+        inputs = {key: value.to(self.device) for key, value in inputs.items()}
+        with torch.no_grad():
+            output = self.model(**inputs)
+            emb = output.last_hidden_state[:, 0, :]  # CLS token
+        return list(emb.float().cpu())
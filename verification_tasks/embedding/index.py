@@ -0,0 +1,93 @@
+from typing import Literal
+import copy
+from tqdm import tqdm
+import numpy as np
+
+METRICS = Literal["l2", "cosine"]
+
+
+class EmbeddingIndex:
+    """
+    Exact in-memory kNN index over the embeddings of a Chroma collection.
+
+    The embeddings are held once in a contiguous float32 matrix together with a per category
+    row partition. Distances follow Chroma's conventions: squared L2 for "l2" and
+    1 - cosine similarity for "cosine". Train/test splits are boolean row masks over the
+    shared matrix (see subset), so no embeddings are copied.
+    """
+
+    def __init__(self, ids: np.ndarray, embeddings: np.ndarray, metadatas: list[dict], metric: METRICS = "l2", mask: np.ndarray | None = None):
+        self.ids = np.asarray(ids, dtype=np.int64)
+        self.embeddings = np.ascontiguousarray(embeddings, dtype=np.float32)
+        self.metadatas = metadatas
+        self.metric = metric
+        self.mask = np.ones(len(self.ids), dtype=bool) if mask is None else mask
+
+        self._rows = {int(vt_id): i for i, vt_id in enumerate(self.ids)}
+        self._category_rows: dict[str, np.ndarray] = {}
+        categories = np.array([metadata.get("verification_category") if metadata else None for metadata in metadatas], dtype=object)
+        for category in set(categories):
+            self._category_rows[category] = np.flatnonzero(categories == category)
+
+        if metric == "cosine":
+            norms = np.linalg.norm(self.embeddings, axis=1, keepdims=True)
+            self._vectors = self.embeddings / np.maximum(norms, 1e-12)
+        else:
+            self._vectors = self.embeddings
+        self._squared_norms = np.einsum("ij,ij->i", self._vectors, self._vectors)
+
+    @classmethod
+    def from_collection(cls, collection, metric: METRICS = "l2", batch_size: int = 1000) -> "EmbeddingIndex":
+        ids, embeddings, metadatas = [], [], []
+        for offset in tqdm(range(0, collection.count(), batch_size), desc="Loading embeddings into index"):
+            entries = collection.get(limit=batch_size, offset=offset, include=["embeddings", "metadatas"])
+            entry_ids = [int(entry_id) for entry_id in entries["ids"]]
+            ids.extend(entry_ids)
+            if len(entry_ids) > 0:
+                embeddings.append(np.asarray(entries["embeddings"], dtype=np.float32))
+            metadatas.extend(entries["metadatas"])
+
+        embeddings = np.concatenate(embeddings) if embeddings else np.zeros((0, 0), dtype=np.float32)
+        return cls(np.array(ids, dtype=np.int64), embeddings, metadatas, metric=metric)
+
+    def subset(self, vt_ids: list[int]) -> "EmbeddingIndex":
+        """View of this index restricted to the given verification tasks, sharing the embedding matrix."""
+        view = copy.copy(self)
+        view.mask = np.zeros(len(self.ids), dtype=bool)
+        view.mask[[self._rows[int(vt_id)] for vt_id in vt_ids if int(vt_id) in self._rows]] = True
+        return view
+
+    def count(self) -> int:
+        return int(self.mask.sum())
+
+    def get_embeddings(self, vt_ids: list[int]) -> dict[int, np.ndarray]:
+        rows = {int(vt_id): self._rows.get(int(vt_id), -1) for vt_id in vt_ids}
+        return {vt_id: self.embeddings[row] for vt_id, row in rows.items() if row >= 0 and self.mask[row]}
+
+    def search(self, query_embeddings: np.ndarray, category: str, n_results: int) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Top n_results neighbours within one category for a batch of query embeddings.
+        Returns (ids, distances) of shape (n_queries, min(n_results, candidates)) sorted by distance.
+        """
+        candidates = self._category_rows.get(category, np.zeros(0, dtype=np.int64))
+        candidates = candidates[self.mask[candidates]]
+        queries = np.atleast_2d(np.asarray(query_embeddings, dtype=np.float32))
+        k = min(n_results, len(candidates))
+        if k == 0:
+            return np.zeros((len(queries), 0), dtype=np.int64), np.zeros((len(queries), 0), dtype=np.float32)
+
+        if self.metric == "cosine":
+            queries = queries / np.maximum(np.linalg.norm(queries, axis=1, keepdims=True), 1e-12)
+            distances = 1.0 - queries @ self._vectors[candidates].T
+        else:
+            distances = np.einsum("ij,ij->i", queries, queries)[:, None] - 2.0 * (queries @ self._vectors[candidates].T) + self._squared_norms[candidates]
+            np.maximum(distances, 0.0, out=distances)
+
+        if k < len(candidates):
+            top = np.argpartition(distances, k - 1, axis=1)[:, :k]
+        else:
+            top = np.broadcast_to(np.arange(len(candidates)), (len(queries), len(candidates)))
+        top_distances = np.take_along_axis(distances, top, axis=1)
+        order = np.argsort(top_distances, axis=1, kind="stable")
+        top = np.take_along_axis(top, order, axis=1)
+        return self.ids[candidates[top]], np.take_along_axis(top_distances, order, axis=1)
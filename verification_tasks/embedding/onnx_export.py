@@ -0,0 +1,103 @@
+import json
+from pathlib import Path
+from typing import List, Literal
+import numpy as np
+import torch
+from transformers import AutoModel, AutoTokenizer
+from .embedders.base_embedder import model_revision
+
+ONNX_EXPORTS_PATH = Path("./onnx")
+ONNX_KINDS = Literal["codebert", "codet5p", "qwen"]
+
+# Checkpoint, max input tokens, trust_remote_code per exportable embedder
+ONNX_CHECKPOINTS = {
+    "codebert": ("microsoft/codebert-base", 512, False),
+    "codet5p": ("Salesforce/codet5p-110m-embedding", 512, True),
+    "qwen": ("Qwen/Qwen3-Embedding-0.6B", 30000, True),
+}
+
+
+class PooledEncoder(torch.nn.Module):
+    """Wraps a model so that the exported graph outputs one embedding per input, pooling included."""
+
+    def __init__(self, model, kind: ONNX_KINDS):
+        super().__init__()
+        self.model = model
+        self.kind = kind
+
+    def forward(self, input_ids, attention_mask):
+        if self.kind == "codet5p":
+            return self.model(input_ids=input_ids, attention_mask=attention_mask)  # pooled embedding per sample
+        outputs = self.model(input_ids=input_ids, attention_mask=attention_mask)[0]
+        if self.kind == "codebert":
+            return outputs[:, 0, :]  # CLS token
+        mask = attention_mask.unsqueeze(-1).to(outputs.dtype)
+        return (outputs * mask).sum(dim=1) / mask.sum(dim=1)  # mean over the real tokens
+
+
+def _padded(input_ids: List[List[int]], pad_token_id: int) -> tuple[np.ndarray, np.ndarray]:
+    longest = max(len(ids) for ids in input_ids)
+    ids = np.full((len(input_ids), longest), pad_token_id, dtype=np.int64)
+    mask = np.zeros((len(input_ids), longest), dtype=np.int64)
+    for i, row in enumerate(input_ids):
+        ids[i, :len(row)] = row
+        mask[i, :len(row)] = 1
+    return ids, mask
+
+
+def export_onnx(kind: ONNX_KINDS, output: Path, checkpoint: str | None = None, max_length: int | None = None, overlap: int = 64, opset: int = 18) -> Path:
+    """
+    Export the embedder kind to output/model.onnx with dynamic batch and sequence axes,
+    next to its tokenizer and an embedder.json describing how OnnxEmbedder has to feed it.
+    """
+    default_checkpoint, default_max_length, trust_remote_code = ONNX_CHECKPOINTS[kind]
+    checkpoint = checkpoint or default_checkpoint
+    max_length = max_length or default_max_length
+    tokenizer = AutoTokenizer.from_pretrained(checkpoint, trust_remote_code=trust_remote_code)
+    model = AutoModel.from_pretrained(checkpoint, trust_remote_code=trust_remote_code, torch_dtype=torch.float32).eval()
+    encoder = PooledEncoder(model, kind)
+
+    output.mkdir(parents=True, exist_ok=True)
+    # Padded example inputs so that the traced graph keeps the attention mask path
+    samples = tokenizer(["int main() { return 0; }", "void f(int *p) { if (p) { *p = 1; } }"])["input_ids"]
+    export_encoder(encoder, samples, tokenizer.pad_token_id, output / "model.onnx", max_length, opset)
+    tokenizer.save_pretrained(output)
+    with open(output / "embedder.json", "w") as f:
+        json.dump({"kind": kind, "checkpoint": checkpoint, "revision": model_revision(model), "max_length": max_length, "overlap": overlap}, f, indent=2)
+    return output / "model.onnx"
+
+
+def export_encoder(encoder: PooledEncoder, samples: List[List[int]], pad_token_id: int, model_path: Path, max_length: int, opset: int = 18) -> None:
+    input_ids, attention_mask = (torch.from_numpy(a) for a in _padded(samples, pad_token_id))
+    batch, sequence = torch.export.Dim("batch"), torch.export.Dim("sequence", max=max_length)
+    with torch.no_grad():
+        torch.onnx.export(
+            encoder,
+            (input_ids, attention_mask),
+            str(model_path),
+            input_names=["input_ids", "attention_mask"],
+            output_names=["sentence_embedding"],
+            dynamic_shapes={"input_ids": {0: batch, 1: sequence}, "attention_mask": {0: batch, 1: sequence}},
+            opset_version=opset,
+            dynamo=True,
+            external_data=False,
+        )
+
+
+def max_onnx_difference(kind: ONNX_KINDS, export_dir: Path, input_ids: List[List[int]], checkpoint: str | None = None) -> float:
+    """Largest absolute difference between the PyTorch and the exported embeddings of input_ids."""
+    default_checkpoint, _, trust_remote_code = ONNX_CHECKPOINTS[kind]
+    model = AutoModel.from_pretrained(checkpoint or default_checkpoint, trust_remote_code=trust_remote_code, torch_dtype=torch.float32).eval()
+    pad_token_id = AutoTokenizer.from_pretrained(export_dir).pad_token_id
+    return encoder_onnx_difference(PooledEncoder(model, kind), export_dir / "model.onnx", input_ids, pad_token_id)
+
+
+def encoder_onnx_difference(encoder: PooledEncoder, model_path: Path, input_ids: List[List[int]], pad_token_id: int) -> float:
+    import onnxruntime as ort
+
+    ids, mask = _padded(input_ids, pad_token_id)
+    with torch.no_grad():
+        expected = encoder(torch.from_numpy(ids), torch.from_numpy(mask)).float().numpy()
+    session = ort.InferenceSession(str(model_path), providers=["CPUExecutionProvider"])
+    actual = session.run(["sentence_embedding"], {"input_ids": ids, "attention_mask": mask})[0]
+    return float(np.abs(expected - actual).max())
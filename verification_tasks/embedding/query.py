@@ -1,12 +1,20 @@
 from verification_tasks.models import VerificationTask
 from typing_extensions import TypedDict
 from chromadb import Collection
+from .index import EmbeddingIndex
+from collections import defaultdict
+import numpy as np
 
 class VTQueryResult(TypedDict):
     verification_tasks: list[VerificationTask]
     distances: list[float]
 
 
+class VTBatchQueryResult(TypedDict):
+    neighbour_ids: np.ndarray  # (n_test, k) verification task ids, -1 where fewer than k neighbours were found
+    distances: np.ndarray  # (n_test, k), inf where fewer than k neighbours were found
+
+
 def query_verification_task(vt: VerificationTask, collection:Collection, collection_query: Collection, n_results: int = 5, include_vts: list[VerificationTask]|None=None) -> list[dict]|None:
     vt_query = collection.get(
             ids=[str(vt.pk)],
@@ -35,10 +43,63 @@ def query_verification_task(vt: VerificationTask, collection:Collection, collect
             ids=[str(i_vt.pk) for i_vt in include_vts]
         )
 
+    vts = VerificationTask.objects.in_bulk([int(result_id) for result_id in results["ids"][0]])
     return [
         {
-            "verification_task": VerificationTask.objects.get(id=result_id),
+            "verification_task": vts[int(result_id)],
             "distance": distance
         }
         for result_id, distance in zip(results["ids"][0], results["distances"][0])
     ]
+
+
+def get_embeddings(vt_ids: list[int], collection: Collection | EmbeddingIndex) -> dict[int, np.ndarray]:
+    if isinstance(collection, EmbeddingIndex):
+        return collection.get_embeddings(vt_ids)
+    entries = collection.get(ids=[str(vt_id) for vt_id in vt_ids], include=["embeddings"])
+    if entries["embeddings"] is None:
+        return {}
+    return {int(entry_id): np.asarray(embedding) for entry_id, embedding in zip(entries["ids"], entries["embeddings"])}
+
+
+def query_verification_tasks(vt_ids: list[int], collection: Collection | EmbeddingIndex, collection_query: Collection | EmbeddingIndex, n_results: int = 5) -> VTBatchQueryResult:
+    """
+    Batched version of query_verification_task for a whole list of test tasks.
+    Both collections may also be EmbeddingIndex views, which answers the queries exactly in memory.
+
+    Fetches all test embeddings with one get and runs one multi-embedding query per category.
+    Row i of the returned arrays belongs to vt_ids[i].
+    """
+    neighbour_ids = np.full((len(vt_ids), n_results), -1, dtype=np.int64)
+    distances = np.full((len(vt_ids), n_results), np.inf, dtype=np.float64)
+
+    vt_categories = dict(VerificationTask.objects.filter(id__in=vt_ids).values_list("id", "category__name"))
+    embeddings = get_embeddings(vt_ids, collection)
+
+    rows_by_category = defaultdict(list)
+    for i, vt_id in enumerate(vt_ids):
+        if vt_id in embeddings and vt_id in vt_categories:
+            rows_by_category[vt_categories[vt_id]].append(i)
+
+    for category_name, rows in rows_by_category.items():
+        query_embeddings = [embeddings[vt_ids[i]] for i in rows]
+        if isinstance(collection_query, EmbeddingIndex):
+            result_ids, result_distances = collection_query.search(np.stack(query_embeddings), category_name, n_results)
+        else:
+            results = collection_query.query(
+                query_embeddings=query_embeddings,
+                n_results=n_results,
+                where={
+                    "verification_category": category_name
+                },
+                include=["distances"],
+            )
+            result_ids, result_distances = results["ids"], results["distances"]
+        for i, ids, dists in zip(rows, result_ids, result_distances):
+            neighbour_ids[i, :len(ids)] = [int(result_id) for result_id in ids]
+            distances[i, :len(dists)] = dists
+
+    return {
+        "neighbour_ids": neighbour_ids,
+        "distances": distances,
+    }
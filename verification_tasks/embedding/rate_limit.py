@@ -0,0 +1,33 @@
+import asyncio
+import time
+
+
+class AsyncTokenBucket:
+    """
+    Limits the rate of API requests of the coroutines sharing it.
+
+    The bucket holds at most capacity tokens and refills rate tokens per second. acquire waits
+    until the requested tokens are available, so bursts of up to capacity requests go out
+    immediately and the long-run rate never exceeds rate.
+    """
+
+    def __init__(self, rate: float, capacity: float | None = None):
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else max(1.0, rate)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    async def acquire(self, tokens: float = 1.0) -> None:
+        # The lock queues waiters in order, so a large request is not starved by small ones
+        async with self._lock:
+            self._refill()
+            while self._tokens < tokens:
+                await asyncio.sleep((tokens - self._tokens) / self.rate)
+                self._refill()
+            self._tokens -= tokens
@@ -0,0 +1,28 @@
+from importlib import import_module
+from typing import Literal
+from .embedders.base_embedder import Embedder
+
+EMBEDDER_NAMES = Literal["codebert", "codet5p", "qwen", "nvembed", "gemini", "onnx"]
+
+# name -> (module, class) below verification_tasks.embedding.embedders. The modules import torch,
+# transformers or API clients and print device diagnostics, so they are only imported on first use.
+EMBEDDERS = {
+    "codebert": ("transformer_embedder", "TransformerEmbedder"),
+    "codet5p": ("codet5p_embedder", "CodeT5pEmbedder"),
+    "qwen": ("qwen_embedder", "QwenEmbedder"),
+    "nvembed": ("nvembed_embedder", "NVEmbedEmbedder"),
+    "gemini": ("gemini_embedder", "GeminiEmbedder"),
+    "onnx": ("onnx_embedder", "OnnxEmbedder"),
+}
+
+
+def get_embedder_class(name: EMBEDDER_NAMES) -> type[Embedder]:
+    if name not in EMBEDDERS:
+        raise ValueError(f"Unknown embedder {name}, expected one of {', '.join(sorted(EMBEDDERS))}")
+    module_name, class_name = EMBEDDERS[name]
+    return getattr(import_module(f"verification_tasks.embedding.embedders.{module_name}"), class_name)
+
+
+def load_embedder(name: EMBEDDER_NAMES, **kwargs) -> Embedder:
+    """Import the embedder's module and instantiate it with kwargs."""
+    return get_embedder_class(name)(**kwargs)
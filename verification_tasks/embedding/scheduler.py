@@ -0,0 +1,44 @@
+from typing import Callable, TypeVar
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+
+class TokenBudgetScheduler:
+    """
+    Forms inference batches for inputs of very different token lengths.
+
+    Inputs are sorted into token length buckets of bucket_width and packed greedily so that
+    the padded size of a batch (batch size * longest input) stays within max_tokens.
+    An input that alone exceeds max_tokens is scheduled as a batch of its own.
+    """
+
+    def __init__(self, max_tokens: int = 8192, max_batch_size: int = 64, bucket_width: int = 32):
+        self.max_tokens = max_tokens
+        self.max_batch_size = max_batch_size
+        self.bucket_width = bucket_width
+
+    def batches(self, lengths: list[int]) -> list[list[int]]:
+        """Indices into lengths grouped into batches, shortest inputs first."""
+        order = sorted(range(len(lengths)), key=lambda i: (-(-lengths[i] // self.bucket_width), lengths[i]))
+        batches: list[list[int]] = []
+        batch: list[int] = []
+        longest = 0
+        for i in order:
+            longest_with_i = max(longest, lengths[i])
+            if batch and ((len(batch) + 1) * longest_with_i > self.max_tokens or len(batch) == self.max_batch_size):
+                batches.append(batch)
+                batch, longest_with_i = [], lengths[i]
+            batch.append(i)
+            longest = longest_with_i
+        if batch:
+            batches.append(batch)
+        return batches
+
+    def map(self, items: list[T], lengths: list[int], run_batch: Callable[[list[T]], list[R]]) -> list[R]:
+        """Run run_batch over the scheduled batches and return its results in the original order of items."""
+        results: list = [None] * len(items)
+        for batch in self.batches(lengths):
+            for i, result in zip(batch, run_batch([items[i] for i in batch])):
+                results[i] = result
+        return results
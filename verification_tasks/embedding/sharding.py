@@ -0,0 +1,148 @@
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+from pathlib import Path
+from typing import Callable
+import hashlib
+import os
+import numpy as np
+from .embedders.base_embedder import Embedder
+
+SHARDS_PATH = Path("./chroma/shards")
+# Every worker holds its own copy of the model, several GB for Qwen and NV-Embed
+DEFAULT_NUM_PROCESSES = 2
+
+
+def shard_of(vt_id: int, num_shards: int) -> int:
+    # A stable hash instead of hash(), so every process and rerun assigns a task to the same shard
+    return int.from_bytes(hashlib.sha1(str(vt_id).encode()).digest()[:8], "big") % num_shards
+
+
+def available_cpus() -> int:
+    """CPUs this process may use: the Slurm allocation, else the CPU affinity mask, else all CPUs."""
+    if "SLURM_CPUS_PER_TASK" in os.environ:
+        return int(os.environ["SLURM_CPUS_PER_TASK"])
+    if hasattr(os, "sched_getaffinity"):
+        return len(os.sched_getaffinity(0))
+    return os.cpu_count() or 1
+
+
+def threads_per_worker(num_workers: int, cpus: int | None = None) -> int:
+    """Intra-op threads per worker process so that all workers together use each CPU once."""
+    return max(1, (cpus or available_cpus()) // num_workers)
+
+
+def slurm_array_shard() -> tuple[int, int] | None:
+    """(shard index, number of shards) of the current Slurm array task, None outside of an array job."""
+    if "SLURM_ARRAY_TASK_ID" not in os.environ:
+        return None
+    first = int(os.environ.get("SLURM_ARRAY_TASK_MIN", 0))
+    return int(os.environ["SLURM_ARRAY_TASK_ID"]) - first, int(os.environ["SLURM_ARRAY_TASK_COUNT"])
+
+
+class ShardWriter:
+    """
+    Stands in for the Chroma collection of embed_verifications_tasks in a shard worker.
+
+    Every upsert is written as its own .npz part file below directory, so a crashed or
+    cancelled worker keeps what it has embedded and a rerun skips those tasks.
+    """
+
+    def __init__(self, directory: Path):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self._parts = len(list(self.directory.glob("part-*.npz")))
+
+    def get(self, include=None) -> dict:
+        # Tasks in any part below the shard root count as done, also those of an earlier sharding
+        return {"ids": [str(vt_id) for part in self.directory.parent.glob("*/part-*.npz") for vt_id in np.load(part)["ids"]]}
+
+    def upsert(self, embeddings, metadatas, ids) -> None:
+        path = self.directory / f"part-{self._parts:05d}.npz"
+        tmp_path = path.with_suffix(".tmp")
+        with open(tmp_path, "wb") as f:
+            np.savez(
+                f,
+                ids=np.array([int(vt_id) for vt_id in ids], dtype=np.int64),
+                embeddings=np.stack(embeddings).astype(np.float32),
+                verification_task=np.array([metadata["verification_task"] for metadata in metadatas]),
+                file_type=np.array([metadata["file_type"] for metadata in metadatas]),
+                verification_category=np.array([metadata["verification_category"] for metadata in metadatas]),
+            )
+        os.replace(tmp_path, path)
+        self._parts += 1
+
+
+def shard_directory(shard_root: Path, shard_index: int, num_shards: int) -> Path:
+    return Path(shard_root) / f"shard-{shard_index:04d}-of-{num_shards:04d}"
+
+
+def embed_shard(vts: list[int], shard_index: int, num_shards: int, embedder_factory: Callable[[], Embedder], shard_root: Path = SHARDS_PATH, threads: int | None = None, **pipeline_options) -> Path:
+    """
+    Embed the tasks of vts that fall into shard_index into the shard's part files.
+    Runs as a worker process of embed_verifications_tasks_sharded or as one Slurm array task.
+    """
+    from .embed import embed_verifications_tasks
+    from .embedders.torch_setup import configure_cpu_threads
+
+    configure_cpu_threads(threads or available_cpus())
+    directory = shard_directory(shard_root, shard_index, num_shards)
+    shard_vts = [vt_id for vt_id in vts if shard_of(vt_id, num_shards) == shard_index]
+    embed_verifications_tasks(shard_vts, embedder_factory(), ShardWriter(directory), **pipeline_options)
+    return directory
+
+
+def merge_shards(collection, shard_root: Path = SHARDS_PATH, batch_size: int = 5000, remove: bool = True) -> int:
+    """Bulk-load all part files below shard_root into collection, returns the number of embeddings."""
+    merged = 0
+    parts = sorted(Path(shard_root).glob("*/part-*.npz"))
+    for part in parts:
+        data = np.load(part)
+        for start in range(0, len(data["ids"]), batch_size):
+            end = start + batch_size
+            collection.upsert(
+                embeddings=data["embeddings"][start:end],
+                metadatas=[
+                    {"verification_task": str(name), "file_type": str(file_type), "verification_category": str(category)}
+                    for name, file_type, category in zip(data["verification_task"][start:end], data["file_type"][start:end], data["verification_category"][start:end])
+                ],
+                ids=[str(vt_id) for vt_id in data["ids"][start:end]],
+            )
+        merged += len(data["ids"])
+    if remove:
+        for part in parts:
+            part.unlink()
+    return merged
+
+
+def _init_worker(threads: int) -> None:
+    # Before any model is loaded: the embedders size their torch and onnxruntime thread pools from it
+    os.environ["SLURM_CPUS_PER_TASK"] = str(threads)
+    os.environ["OMP_NUM_THREADS"] = str(threads)
+    os.environ["MKL_NUM_THREADS"] = str(threads)
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "sv_comp.settings")
+    import django
+    django.setup()
+
+
+def embed_verifications_tasks_sharded(vts: list[int], embedder_factory: Callable[[], Embedder], collection, num_processes: int = DEFAULT_NUM_PROCESSES, shard_root: Path = SHARDS_PATH, **pipeline_options) -> int:
+    """
+    Embed vts with num_processes processes (at most one per CPU), each with its own model and an
+    equal share of the node's CPUs as threads, then merge their shards into collection. Size
+    num_processes by the memory of a model copy.
+
+    embedder_factory is called in every worker and has to be picklable (e.g. an embedder class
+    or a functools.partial of one). pipeline_options go to embed_verifications_tasks.
+    """
+    cpus = available_cpus()
+    num_processes = min(num_processes, cpus)
+    threads = threads_per_worker(num_processes, cpus)
+    existing_ids = set(collection.get(include=[])["ids"])
+    vts = [vt_id for vt_id in vts if str(vt_id) not in existing_ids]
+    print(f"Embedding {len(vts)} verification tasks with {num_processes} workers of {threads} threads each.")
+
+    # spawn: every worker starts without the parent's torch thread pools
+    with ProcessPoolExecutor(max_workers=num_processes, mp_context=get_context("spawn"), initializer=_init_worker, initargs=(threads,)) as pool:
+        futures = [pool.submit(embed_shard, vts, shard_index, num_processes, embedder_factory, shard_root, threads, **pipeline_options) for shard_index in range(num_processes)]
+        for future in futures:
+            future.result()
+    return merge_shards(collection, shard_root)
@@ -0,0 +1,67 @@
+from typing import Callable, List, Literal, Optional
+import numpy as np
+from .scheduler import TokenBudgetScheduler
+
+POOLINGS = Literal["mean", "weighted", "max"]
+
+
+def special_token_frame(tokenizer) -> tuple[List[int], List[int]]:
+    """Ids the tokenizer puts before and after a single sequence, e.g. <s> and </s>."""
+    with_special = tokenizer("x")["input_ids"]
+    without_special = tokenizer("x", add_special_tokens=False)["input_ids"]
+    for start in range(len(with_special) - len(without_special) + 1):
+        if with_special[start:start + len(without_special)] == without_special:
+            return with_special[:start], with_special[start + len(without_special):]
+    return [], []
+
+
+def split_windows(ids: List[int], size: int, overlap: int = 0, max_windows: Optional[int] = None) -> List[List[int]]:
+    """
+    Windows of at most size token ids, consecutive windows share overlap ids.
+    With max_windows, that many windows are kept evenly spread over the sequence.
+    """
+    stride = size - overlap
+    starts = list(range(0, max(len(ids) - overlap, 1), stride)) if len(ids) > size else [0]
+    if max_windows is not None and len(starts) > max_windows:
+        starts = [starts[i] for i in np.linspace(0, len(starts) - 1, max_windows).round().astype(int)]
+    return [ids[start:start + size] for start in starts]
+
+
+def pool_windows(vectors: np.ndarray, lengths: np.ndarray, pooling: POOLINGS = "mean") -> np.ndarray:
+    if pooling == "mean":
+        return vectors.mean(axis=0)
+    if pooling == "weighted":
+        # Windows weighted by their number of tokens, the short last window counts less
+        return (vectors * lengths[:, None]).sum(axis=0) / max(lengths.sum(), 1)
+    if pooling == "max":
+        return vectors.max(axis=0)
+    raise ValueError(f"Unknown pooling {pooling}")
+
+
+def embed_hierarchically(
+    codes: List[str],
+    tokenizer,
+    window_size: int,
+    scheduler: TokenBudgetScheduler,
+    run_batch: Callable[[List[List[int]]], List[List[float]]],
+    pooling: POOLINGS = "mean",
+    max_windows: Optional[int] = None,
+) -> List[List[float]]:
+    """
+    Embed sources of any length by splitting their token ids into windows of window_size
+    (special tokens included), embedding the windows of all sources in token budgeted batches
+    and pooling the window vectors per source. Memory is bounded by the window size and the
+    scheduler budget instead of the length of the longest source.
+    """
+    prefix, suffix = special_token_frame(tokenizer)
+    token_ids = tokenizer(codes, add_special_tokens=False, truncation=False, verbose=False)["input_ids"] if codes else []
+    windows, lengths, owners = [], [], []
+    for owner, ids in enumerate(token_ids):
+        for window in split_windows(ids, window_size - len(prefix) - len(suffix), max_windows=max_windows):
+            windows.append(prefix + window + suffix)
+            lengths.append(len(window))
+            owners.append(owner)
+
+    vectors = np.asarray(scheduler.map(windows, [len(window) for window in windows], run_batch), dtype=np.float64)
+    owners, lengths = np.array(owners, dtype=np.int64), np.array(lengths, dtype=np.float64)
+    return [pool_windows(vectors[owners == i], lengths[owners == i], pooling).tolist() for i in range(len(codes))]
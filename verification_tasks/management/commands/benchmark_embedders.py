@@ -0,0 +1,55 @@
+from django.core.management.base import BaseCommand
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+from verification_tasks.models import VerificationTask
+from verification_tasks.embedding.embed import read_verification_task
+from verification_tasks.embedding.benchmark import BENCHMARK_EMBEDDERS, run_embedder_benchmark, cosine_drift
+import random
+import pandas as pd
+
+
+class Command(BaseCommand):
+    help = "Compare throughput, peak memory and embedding drift of embedder precisions on a fixed sample"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--embedder", choices=sorted(BENCHMARK_EMBEDDERS), default="codet5p")
+        parser.add_argument("--precisions", nargs="+", choices=["fp32", "bf16", "int8"], default=["fp32", "bf16", "int8"])
+        parser.add_argument("--sample", type=int, default=50, help="Number of verification tasks to embed")
+        parser.add_argument("--seed", type=int, default=42)
+        parser.add_argument("--batch-size", type=int, default=8)
+
+    def handle(self, *args, **options):
+        vt_ids = sorted(VerificationTask.objects.values_list("id", flat=True))
+        random.Random(options["seed"]).shuffle(vt_ids)
+        tasks = VerificationTask.objects.select_related("category").in_bulk(vt_ids)
+
+        codes = []
+        for vt_id in vt_ids:
+            if len(codes) == options["sample"]:
+                break
+            try:
+                codes.append(read_verification_task(tasks[vt_id])[2])
+            except Exception as e:
+                continue
+        print(f"Benchmarking {options['embedder']} on {len(codes)} verification tasks.")
+
+        # fp32 is always measured as the reference for the drift
+        precisions = ["fp32"] + [precision for precision in options["precisions"] if precision != "fp32"]
+        results = {}
+        for precision in precisions:
+            # A fresh process per precision keeps the peak RSS of the configurations apart
+            with ProcessPoolExecutor(max_workers=1, mp_context=get_context("spawn")) as pool:
+                results[precision] = pool.submit(run_embedder_benchmark, options["embedder"], precision, codes, options["batch_size"]).result()
+
+        rows = []
+        for precision, result in results.items():
+            mean_drift, max_drift = cosine_drift(result["embeddings"], results["fp32"]["embeddings"])
+            rows.append({
+                "precision": precision,
+                "load_s": result["load_seconds"],
+                "files_per_s": result["files_per_second"],
+                "peak_rss_mb": result["peak_rss_mb"],
+                "mean_cosine_drift": mean_drift,
+                "max_cosine_drift": max_drift,
+            })
+        print(pd.DataFrame(rows).set_index("precision"))
@@ -0,0 +1,28 @@
+from django.core.management.base import BaseCommand
+import os
+from utils.reader import ResultsTable, arrow_is_current, get_file, iter_verification_results, read_arrow_table, urls, write_arrow_table
+
+
+class Command(BaseCommand):
+    help = "Convert the scraped JSON result tables to memory-mappable Arrow files, which SVCOMP reads instead"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--tables-dir", default="tables")
+        parser.add_argument("--overwrite", action="store_true", help="Also convert tables whose Arrow file is up to date")
+
+    def handle(self, *args, **options):
+        output_dir = options["tables_dir"]
+        for url in urls:
+            json_file, arrow_file = get_file(url, output_dir), get_file(url, output_dir, "arrow")
+            if not os.path.exists(json_file):
+                print(f"File {json_file} does not exist.")
+                continue
+            if not options["overwrite"] and arrow_is_current(url, output_dir):
+                print(f"Skip {json_file}, {arrow_file} is up to date.")
+                continue
+
+            table = ResultsTable.from_rows(iter_verification_results(url, output_dir))
+            write_arrow_table(table, url, output_dir)
+            if len(read_arrow_table(url, output_dir)) != len(table):
+                raise RuntimeError(f"{arrow_file} does not hold the {len(table)} results of {json_file}.")
+            print(f"{json_file} -> {arrow_file}: {len(table)} results, {os.path.getsize(json_file) / 2**20:.1f} MB -> {os.path.getsize(arrow_file) / 2**20:.1f} MB")
@@ -0,0 +1,52 @@
+from django.core.management.base import BaseCommand, CommandError
+from functools import partial
+from verification_tasks.models import VerificationTask
+from verification_tasks.embedding import config
+from verification_tasks.embedding.benchmark import BENCHMARK_EMBEDDERS
+from verification_tasks.embedding.registry import load_embedder
+from verification_tasks.embedding.sharding import SHARDS_PATH, embed_shard, embed_verifications_tasks_sharded, merge_shards, slurm_array_shard
+
+COLLECTIONS = {
+    "codebert": config.get_collection,
+    "codet5p": config.get_codet5p_embedder_collection,
+    "qwen": config.get_qwen_embedder_collection,
+    "nvembed": config.get_nvembed_collection,
+}
+
+
+class Command(BaseCommand):
+    help = "Embed all verification tasks in shards, with worker processes on this node or as a Slurm array job"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--embedder", choices=sorted(BENCHMARK_EMBEDDERS), default="codet5p")
+        parser.add_argument("--precision", choices=["fp32", "bf16", "int8"], default="fp32")
+        parser.add_argument("--processes", type=int, default=None, help="Worker processes on this node, each loads its own model copy, so size it by memory (required unless --slurm-array or --merge, capped by the CPUs)")
+        parser.add_argument("--slurm-array", action="store_true", help="Only embed the shard of this Slurm array task, merge afterwards with --merge")
+        parser.add_argument("--merge", action="store_true", help="Only load the shard files into the collection")
+        parser.add_argument("--batch-size", type=int, default=32)
+
+    def handle(self, *args, **options):
+        if not (options["merge"] or options["slurm_array"]) and options["processes"] is None:
+            raise CommandError("--processes is required: every worker loads its own model copy, choose it by the memory of the node")
+
+        shard_root = SHARDS_PATH / options["embedder"]
+        collection = COLLECTIONS[options["embedder"]]()
+        if options["merge"]:
+            print(f"Merged {merge_shards(collection, shard_root)} embeddings into the collection.")
+            return
+
+        embedder_factory = partial(load_embedder, options["embedder"], precision=options["precision"])
+        vts = sorted(VerificationTask.objects.values_list("id", flat=True))
+
+        if options["slurm_array"]:
+            array_shard = slurm_array_shard()
+            if array_shard is None:
+                raise CommandError("--slurm-array needs SLURM_ARRAY_TASK_ID, submit with sbatch --array")
+            existing_ids = set(collection.get(include=[])["ids"])
+            vts = [vt_id for vt_id in vts if str(vt_id) not in existing_ids]
+            directory = embed_shard(vts, *array_shard, embedder_factory, shard_root, batch_size=options["batch_size"])
+            print(f"Shard {array_shard[0]} of {array_shard[1]} written to {directory}.")
+            return
+
+        merged = embed_verifications_tasks_sharded(vts, embedder_factory, collection, options["processes"], shard_root, batch_size=options["batch_size"])
+        print(f"Merged {merged} embeddings into the collection.")
@@ -7,10 +7,10 @@ from .strategy.data import get_train_test_data
 import pandas as pd
 from benchmarks.models import Benchmark
 from verification_tasks.embedding.embed import embed_verifications_tasks
-from verification_tasks.embedding.config import get_test_collection, get_train_collection, get_codet5p_embedder_collection
-from verification_tasks.embedding.helpers import delete_entries_in_collection, transfer_entries
+from verification_tasks.embedding.config import get_codet5p_embedder_collection
+from verification_tasks.embedding.index import EmbeddingIndex
 from verification_tasks.models import VerificationTask, VerificationCategory
-from verification_tasks.embedding.embedders.codet5p_embedder import CodeT5pEmbedder
+from verification_tasks.embedding.registry import load_embedder
 from .strategy.embed_and_predict import evaluate_embed_and_predict
 from .strategy.knn_5_distance_vote import evaluate_knn_distance_weighted
 
@@ -27,15 +27,13 @@ class Command(BaseCommand):
             categories=VerificationCategory.objects.filter(id__in=[1,3])
         )
 
-        main_collection, train_collection, test_collection = get_codet5p_embedder_collection(), get_train_collection(in_memory=True), get_test_collection(in_memory=True)
-        # embed_verifications_tasks(vts_train + vts_test, CodeT5pEmbedder(), main_collection)
+        main_collection = get_codet5p_embedder_collection()
+        # embed_verifications_tasks(vts_train + vts_test, load_embedder("codet5p"), main_collection)
         print(len(vts_train), len(vts_test))
 
-        delete_entries_in_collection(train_collection, vts_test)
-        delete_entries_in_collection(test_collection, vts_train)
-        
-        transfer_entries(main_collection, train_collection, vts_train, batch_size=100)
-        transfer_entries(main_collection, test_collection, vts_test, batch_size=100)
+        # Train/test splits are masks over one in-memory index instead of copied collections
+        index = EmbeddingIndex.from_collection(main_collection)
+        train_collection, test_collection = index.subset(vts_train), index.subset(vts_test)
 
         print("Train set size:", train_collection.count())
         print("Test set size:", test_collection.count())
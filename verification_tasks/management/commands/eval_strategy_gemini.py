@@ -3,15 +3,15 @@ from .strategy.category_virtual_verifier import evaluate_category_best_verifier
 from .strategy.best_virtual_verifier import evaluate_virtually_best_verifier
 from .strategy.knn_1_embed import evaluate_knn_1_best_verifier
 from .strategy.knn_5_majority_vote import evaluate_knn_majority_vote_best_verifier
-from .strategy.knn_5_distance_vote import evaluate_knn_5_distance_weighted
+from .strategy.knn_5_distance_vote import evaluate_knn_distance_weighted
 from .strategy.data import get_train_test_data
 import pandas as pd
 from benchmarks.models import Benchmark
 from verification_tasks.embedding.embed import embed_verifications_tasks
-from verification_tasks.embedding.config import get_test_collection, get_train_collection, get_gemini_collection
-from verification_tasks.embedding.helpers import delete_entries_in_collection, transfer_entries
+from verification_tasks.embedding.config import get_gemini_collection
+from verification_tasks.embedding.index import EmbeddingIndex
 from verification_tasks.models import VerificationTask, VerificationCategory
-from verification_tasks.embedding.embedders.gemini_embedder import GeminiEmbedder
+from verification_tasks.embedding.registry import load_embedder
 
 class Command(BaseCommand):
     help = "Closes the specified poll for voting"
@@ -19,15 +19,13 @@ class Command(BaseCommand):
     def handle(self, *args, **options):
         vts_train, vts_test = get_train_test_data(test_size=0.1, random_state=42, shuffle=False, use_c_files_only=False, categories=VerificationCategory.objects.filter(id__in=[1]))
         
-        main_collection, train_collection, test_collection = get_gemini_collection(), get_train_collection(in_memory=True), get_test_collection(in_memory=True)
-        embed_verifications_tasks(vts_train + vts_test, GeminiEmbedder(), main_collection)
+        main_collection = get_gemini_collection()
+        embed_verifications_tasks(vts_train + vts_test, load_embedder("gemini"), main_collection, batch_size=400)
         print(len(vts_train), len(vts_test))
 
-        delete_entries_in_collection(train_collection)
-        delete_entries_in_collection(test_collection)
-        
-        transfer_entries(main_collection, train_collection, vts_train, batch_size=100)
-        transfer_entries(main_collection, test_collection, vts_test, batch_size=100)
+        # Train/test splits are masks over one in-memory index instead of copied collections
+        index = EmbeddingIndex.from_collection(main_collection)
+        train_collection, test_collection = index.subset(vts_train), index.subset(vts_test)
 
         print("Train set size:", train_collection.count())
         print("Test set size:", test_collection.count())
@@ -38,7 +36,7 @@ class Command(BaseCommand):
         knn_5_best_summary = evaluate_knn_majority_vote_best_verifier(vts_test, train_collection, test_collection, knn=5)
         knn_5_best_summary.write_to_csv("strategy_knn_5_verifier.csv")
 
-        knn_5_distance_vote = evaluate_knn_5_distance_weighted(vts_test, train_collection, test_collection, knn=5)
+        knn_5_distance_vote = evaluate_knn_distance_weighted(vts_test, train_collection, test_collection, knn=5)
         
         knn_7_best_summary = evaluate_knn_majority_vote_best_verifier(vts_test, train_collection, test_collection, knn=7)
         knn_7_best_summary.write_to_csv("strategy_knn_7_verifier.csv")
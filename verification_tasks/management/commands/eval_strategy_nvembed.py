@@ -7,10 +7,10 @@ from .strategy.data import get_train_test_data
 import pandas as pd
 from benchmarks.models import Benchmark
 from verification_tasks.embedding.embed import embed_verifications_tasks
-from verification_tasks.embedding.config import get_test_collection, get_train_collection, get_collection
-from verification_tasks.embedding.helpers import delete_entries_in_collection, transfer_entries
+from verification_tasks.embedding.config import get_collection
+from verification_tasks.embedding.index import EmbeddingIndex
 from verification_tasks.models import VerificationTask, VerificationCategory
-from verification_tasks.embedding.embedders.nvembed_embedder import NVEmbedEmbedder
+from verification_tasks.embedding.registry import load_embedder
 
 class Command(BaseCommand):
     help = "Closes the specified poll for voting"
@@ -18,15 +18,13 @@ class Command(BaseCommand):
     def handle(self, *args, **options):
         vts_train, vts_test = get_train_test_data(test_size=0.1, random_state=42, shuffle=False)
         
-        main_collection, train_collection, test_collection = get_collection("code_chunks_nvembed"), get_train_collection(), get_test_collection()
-        embed_verifications_tasks(vts_train + vts_test, NVEmbedEmbedder(), main_collection, num_workers=1)
+        main_collection = get_collection("code_chunks_nvembed")
+        embed_verifications_tasks(vts_train + vts_test, load_embedder("nvembed"), main_collection, num_workers=1)
         print(len(vts_train), len(vts_test))
 
-        delete_entries_in_collection(train_collection)
-        delete_entries_in_collection(test_collection)
-        
-        transfer_entries(main_collection, train_collection, vts_train)
-        transfer_entries(main_collection, test_collection, vts_test)
+        # Train/test splits are masks over one in-memory index instead of copied collections
+        index = EmbeddingIndex.from_collection(main_collection)
+        train_collection, test_collection = index.subset(vts_train), index.subset(vts_test)
 
         print("Train set size:", train_collection.count())
         print("Test set size:", test_collection.count())
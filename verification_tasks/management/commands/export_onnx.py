@@ -0,0 +1,38 @@
+from django.core.management.base import BaseCommand, CommandError
+from pathlib import Path
+from verification_tasks.embedding.onnx_export import ONNX_CHECKPOINTS, ONNX_EXPORTS_PATH, export_onnx, max_onnx_difference
+from verification_tasks.embedding.chunking import chunk_functions
+from transformers import AutoTokenizer
+
+# Multi-line functions, single line ones are not picked up by the codebert function extraction
+SAMPLE_CODES = [
+    "int main() {\n  int x = 0;\n  while (x < 10) {\n    x++;\n  }\n  return x;\n}",
+    "void reach_error() {\n  __assert_fail(\"0\", \"a.c\", 3, \"reach_error\");\n}\nint f(int *p) {\n  if (p) {\n    return *p;\n  }\n  return -1;\n}",
+    "unsigned int fib(unsigned int n) {\n  if (n < 2) {\n    return n;\n  }\n  return fib(n - 1) + fib(n - 2);\n}",
+]
+
+
+class Command(BaseCommand):
+    help = "Export an embedder to ONNX for CPU inference with OnnxEmbedder and check it against PyTorch"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--embedder", choices=sorted(ONNX_CHECKPOINTS), default="codebert")
+        parser.add_argument("--checkpoint", default=None, help="Hub name or local path, defaults to the checkpoint of the embedder")
+        parser.add_argument("--output", type=Path, default=None, help="Export directory (default: ./onnx/<embedder>)")
+        parser.add_argument("--overlap", type=int, default=64, help="Token overlap of codebert function chunks")
+        parser.add_argument("--tolerance", type=float, default=1e-3, help="Largest accepted difference to the PyTorch embeddings")
+
+    def handle(self, *args, **options):
+        output = options["output"] or ONNX_EXPORTS_PATH / options["embedder"]
+        model_path = export_onnx(options["embedder"], output, options["checkpoint"], overlap=options["overlap"])
+        print(f"Exported {options['embedder']} to {model_path}.")
+
+        tokenizer = AutoTokenizer.from_pretrained(output)
+        if options["embedder"] == "codebert":
+            input_ids, _ = chunk_functions(SAMPLE_CODES, tokenizer)
+        else:
+            input_ids = tokenizer(SAMPLE_CODES, truncation=True)["input_ids"]
+        difference = max_onnx_difference(options["embedder"], output, input_ids, options["checkpoint"])
+        if difference > options["tolerance"]:
+            raise CommandError(f"ONNX embeddings differ from PyTorch by up to {difference:.2e} (tolerance {options['tolerance']:.0e})")
+        print(f"ONNX embeddings match PyTorch within {difference:.2e}.")
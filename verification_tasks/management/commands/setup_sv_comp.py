@@ -1,145 +1,135 @@
 from django.core.management.base import BaseCommand, CommandError
 from verification_tasks.models import VerificationCategory, VerificationTask
 from verifiers.models import Verifier
-from django.db.models import Count
+from django.db import transaction
 from benchmarks.models import Benchmark, status_from_string
-from utils.reader import SVCOMP
+from utils.reader import CATEGORY_URLS, SVCOMP, ResultRow, verifier_column
 from dateutil import parser
+from datetime import datetime
+from functools import lru_cache
 from zoneinfo import ZoneInfo
 from tqdm import tqdm
 
 #### ! DO NOT FORGET TO RUN python manage.py subcategories TO ADD SUBCATEGORIES AFTERWARDS ####
 
-def re_add_verification_tasks(tasks, category: VerificationCategory):
+def re_add_verification_tasks(task_names: list[str], category: VerificationCategory):
     VerificationTask.objects.filter(category=category).delete()
     new_tasks = [
         VerificationTask(
-            name=vt.name, 
+            name=name, 
             category=category, 
-            expected_result=VerificationTask.extract_expected_result(vt.name)
+            expected_result=VerificationTask.extract_expected_result(name)
         )
-        for vt in tasks
+        for name in task_names
     ]
     if len(new_tasks) > 0:
         VerificationTask.objects.bulk_create(new_tasks)
 
 def verification_tasks(sv_comp: SVCOMP, categories: dict[str, VerificationCategory]) -> None:
-    for category_name, tasks in sv_comp.data.items():
+    for category_name in CATEGORY_URLS:
         category = categories.get(category_name)
         if not category:
             raise CommandError(f"Category {category_name} not found in categories dictionary.")
-        if VerificationTask.objects.filter(category=category).count() < len(tasks.verification_tasks):
-            re_add_verification_tasks(tasks.verification_tasks, category)
+        # Task names in order of appearance, only the names are kept while the table is streamed
+        task_names = list(dict.fromkeys(row.verification_task for row in sv_comp.results(category_name)))
+        if VerificationTask.objects.filter(category=category).count() < len(task_names):
+            re_add_verification_tasks(task_names, category)
         else:
             print("Skip verification tasks:", category_name)
 
 def verifiers(sv_comp: SVCOMP) -> None:
-    for category_name, tasks in sv_comp.data.items():
-        for verifier in tasks.verifiers:
+    for category_name in CATEGORY_URLS:
+        columns = dict.fromkeys(row.verifier for row in sv_comp.results(category_name))
+        for column in columns:
             Verifier.objects.get_or_create(
-                name=verifier.verifier_name,
+                name=verifier_column(column).verifier_name,
             )
 
-def benchmarks(sv_comp: SVCOMP) -> None:
-    # f"{self.verification_task} - {self.verifier} - {self.test_date.strftime('%d/%m/%Y, %H:%M:%S')}"
-    remove_duplicates()
-    benchmarks = {f"{b[0]} - {b[1]}" : b[2] for b in Benchmark.objects.values_list("verification_task__name", "verifier__name", "test_date")}
-
-    for category_name, tasks in sv_comp.data.items():
-        verification_results = tasks.verification_results
-        task_map = {t.name: t for t in VerificationTask.objects.all()}
-        verifier_map = {v.name: v for v in Verifier.objects.all()}
-        benchmarks_to_insert = []
-        for benchmark in tqdm(verification_results, desc=f"Processing benchmarks for {category_name}"):
-            vt_name = benchmark.verification_task.name
-            verifier_name = benchmark.verifier.verifier_name
-
-            verification_task = task_map.get(vt_name)
-            if verification_task is None:
-                raise ValueError(f"Verification task {vt_name} not found in the database. Please ensure it exists before processing benchmarks.")
-            verifier = verifier_map.get(verifier_name)
-
-            test_date = benchmark.verifier.test_date
-            if isinstance(test_date, str):
-                test_date = parser.parse(test_date)
-                if test_date.tzinfo is None:
-                    test_date = test_date.replace(tzinfo=ZoneInfo("Europe/Berlin"))
-                else:
-                    test_date = test_date.astimezone(ZoneInfo("Europe/Berlin"))
-            
-            if f"{verification_task.name} - {verifier_name}" in benchmarks:
-                if test_date <= benchmarks[f"{verification_task.name} - {verifier_name}"]:
-                    continue
-                else:
-                    Benchmark.objects.filter(verification_task=verification_task, verifier=verifier, test_date=benchmarks[f"{verification_task.name} - {verifier_name}"]).delete()
-                    benchmarks[f"{verification_task.name} - {verifier_name}"] = test_date
-            else:
-                benchmarks[f"{verification_task.name} - {verifier_name}"] = test_date
-            
-            status_display = status_from_string(benchmark.status)
-            
-            try:
-                if benchmark.raw_core is None or benchmark.raw_core == "":
-                    score = -64
-                else:
-                    score = int(benchmark.raw_core)
-            except ValueError:
-                score = -64
-            is_correct = score > 0
-            b = Benchmark(
-                verification_task=verification_task,
-                verifier=verifier,
-                status=benchmark.status,
-                raw_score=score,
-                cpu=benchmark.cpu,
-                memory=benchmark.memory,
-                test_date=test_date,
-                is_correct=is_correct,
-                status_display=status_display,
+@lru_cache(maxsize=None)
+def parse_test_date(test_date: str) -> datetime:
+    # Memoized: every result row repeats the date of its verifier run, of which there are only a few dozen
+    parsed = parser.parse(test_date)
+    if parsed.tzinfo is None:
+        return parsed.replace(tzinfo=ZoneInfo("Europe/Berlin"))
+    return parsed.astimezone(ZoneInfo("Europe/Berlin"))
+
+
+def parse_score(raw_score: str | None) -> int:
+    try:
+        if raw_score is None or raw_score == "":
+            return -64
+        return int(raw_score)
+    except ValueError:
+        return -64
+
+
+def benchmarks(sv_comp: SVCOMP, batch_size: int = 5000) -> None:
+    """
+    Load the newest result per verification task and verifier into Benchmark.
+
+    The results tables are streamed one category at a time. The results of a category are
+    reduced to the newest one per (task, verifier) and compared with the stored benchmark of the
+    pair: newer results are inserted or overwrite the stored one, older or equally old results are
+    skipped. Each category is one bulk upsert on the unique (verifier, task) constraint, all within
+    one transaction, so only one category's reduced results are held in memory at a time.
+    """
+    task_map = dict(VerificationTask.objects.values_list("name", "id"))
+    verifier_map = dict(Verifier.objects.values_list("name", "id"))
+    stored = {(task_id, verifier_id): test_date for task_id, verifier_id, test_date in Benchmark.objects.values_list("verification_task_id", "verifier_id", "test_date")}
+
+    # verifier column of the results table -> (verifier id, test date)
+    columns: dict[str, tuple[int, datetime]] = {}
+    inserted = replaced = skipped = 0
+    with transaction.atomic():
+        for category_name in CATEGORY_URLS:
+            # (task id, verifier id) -> newest result, the first one wins among equally new results
+            newest: dict[tuple[int, int], tuple[datetime, ResultRow]] = {}
+            for result in tqdm(sv_comp.results(category_name), desc=f"Processing benchmarks for {category_name}"):
+                column = columns.get(result.verifier)
+                if column is None:
+                    verifier = verifier_column(result.verifier)
+                    if verifier.verifier_name not in verifier_map:
+                        raise ValueError(f"Verifier {verifier.verifier_name} not found in the database. Please ensure it exists before processing benchmarks.")
+                    column = columns[result.verifier] = (verifier_map[verifier.verifier_name], parse_test_date(verifier.test_date))
+                verifier_id, test_date = column
+
+                task_id = task_map.get(result.verification_task)
+                if task_id is None:
+                    raise ValueError(f"Verification task {result.verification_task} not found in the database. Please ensure it exists before processing benchmarks.")
+                key = (task_id, verifier_id)
+                if key not in newest or test_date > newest[key][0]:
+                    newest[key] = (test_date, result)
+
+            upserts = [key for key, (test_date, _) in newest.items() if key not in stored or test_date > stored[key]]
+            benchmarks_to_upsert = []
+            for (task_id, verifier_id) in upserts:
+                test_date, result = newest[(task_id, verifier_id)]
+                score = parse_score(result.raw_core)
+                benchmarks_to_upsert.append(Benchmark(
+                    verification_task_id=task_id,
+                    verifier_id=verifier_id,
+                    status=result.status,
+                    raw_score=score,
+                    cpu=result.cpu,
+                    memory=result.memory,
+                    test_date=test_date,
+                    is_correct=score > 0,
+                    status_display=status_from_string(result.status),
+                ))
+            Benchmark.objects.bulk_create(
+                benchmarks_to_upsert,
+                batch_size=batch_size,
+                update_conflicts=True,
+                unique_fields=["verifier", "verification_task"],
+                update_fields=["status", "raw_score", "cpu", "memory", "test_date", "is_correct", "status_display"],
             )
-            benchmarks_to_insert.append(b)
-
-            
-        
-        if len(benchmarks_to_insert) > 0:
-            Benchmark.objects.bulk_create(benchmarks_to_insert)
-            print("Inserted benchmarks for category:", category_name, "Count:", len(benchmarks_to_insert))
-        
-        remove_duplicates()
-        
-
-def remove_duplicates() -> None:
-    print("Removing duplicates for benchmarks...")
-    benchmarks_to_delete = []
-
-    duplicates = (
-        Benchmark.objects
-        .values("verifier", "verification_task")
-        .annotate(count=Count("id"))
-        .filter(count__gt=1)
-    )
-    count = 0
-
-    for dup in tqdm(duplicates, desc="Finding duplicates"):
-        to_delete = (
-            Benchmark.objects
-            .filter(verifier=dup["verifier"], verification_task=dup["verification_task"])
-            .order_by("-test_date")
-            .values_list("id", flat=True)[1:]  # Skip the most recent
-        )
-        benchmarks_to_delete.extend(to_delete)
-        if len(benchmarks_to_delete) > 1000:
-            Benchmark.objects.filter(id__in=benchmarks_to_delete).delete()
-            print("Deleted 1000 duplicates, continuing...")
-            benchmarks_to_delete = []
-            count += 1000
-
-    if benchmarks_to_delete:
-        Benchmark.objects.filter(id__in=benchmarks_to_delete).delete()
-        count += len(benchmarks_to_delete)
-
-    print("Deleting duplicates for benchmarks:", count)
-
+            # A pair of a later category only replaces this result if it is newer
+            category_replaced = sum(key in stored for key in upserts)
+            inserted += len(upserts) - category_replaced
+            replaced += category_replaced
+            skipped += len(newest) - len(upserts)
+            stored.update((key, newest[key][0]) for key in upserts)
+    print("Inserted benchmarks:", inserted, "Replaced:", replaced, "Skipped:", skipped)
 
 
 class Command(BaseCommand):
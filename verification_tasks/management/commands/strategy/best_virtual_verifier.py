@@ -1,22 +1,12 @@
-from verification_tasks.models import VerificationTask
-from benchmarks.models import Benchmark
 from .data import EvaluationStrategySummary
-from verification_tasks.utils import get_virtually_best_benchmark
-from tqdm import tqdm
+from .matrix import get_benchmark_matrix
 
 def evaluate_virtually_best_verifier(vts_test: list[int]) -> EvaluationStrategySummary:
     summary = EvaluationStrategySummary()
-    
-    for vt_id in tqdm(vts_test, desc="Processing virtually best"):
-        vt = VerificationTask.objects.get(id=vt_id)
-        best = get_virtually_best_benchmark(Benchmark.objects.filter(verification_task=vt))
-        
-        if best is None:
-            continue
+    matrix = get_benchmark_matrix()
 
-        summary.add_result(
-            verification_task=vt,
-            benchmark=best
-        )
+    # Lexicographic argmax over (score, -cpu, -memory) for all tasks at once
+    rows = matrix.rows(vts_test)
+    summary.extend_matrix_results(matrix, rows, matrix.best_columns(rows))
 
     return summary
@@ -1,38 +1,28 @@
-from verifiers.models import Verifier
-from verification_tasks.models import VerificationCategory, VerificationTask
-from benchmarks.models import Benchmark
-from django.db.models import Sum, Prefetch
+from verification_tasks.models import VerificationCategory
 from .data import EvaluationStrategySummary
+from .matrix import get_benchmark_matrix
 from tqdm import tqdm
-from django.db import connection
 
 
 def evaluate_category_best_verifier(vts_test: list[int]) -> EvaluationStrategySummary:
-    # Pre-calculate the best verifier for each category in a single efficient query
-    category_verifiers = {}
-    
-    for vc in VerificationCategory.objects.all():
-        v = vc.best_verifier()
-        if v is not None:
-            category_verifiers[vc.pk] = v
-        else:
-            category_verifiers[vc.pk] = None
+    matrix = get_benchmark_matrix()
+
+    # Pre-calculate the best verifier column for each category in a single query
+    category_columns = {
+        category_id: matrix.column(v.pk)
+        for category_id, v in VerificationCategory.best_verifiers().items()
+    }
 
     summary = EvaluationStrategySummary()
     
-    for vt_pk, category_id in tqdm(VerificationTask.objects.filter(id__in=vts_test).values_list("pk", "category__id"), desc="Processing Category Best"):
-        v = category_verifiers.get(category_id)
-        b = Benchmark.objects.filter(
-            verification_task__pk=vt_pk,
-            verifier=v
-        ).order_by("-raw_score", "cpu", "memory").first()
+    for vt_id in tqdm(vts_test, desc="Processing Category Best"):
+        row = matrix.row(vt_id)
+        if row < 0:
+            continue
+        col = category_columns.get(int(matrix.category_ids[row]), -1)
         
-        if b is None:
+        if not matrix.has_benchmark(row, col):
             continue
-        vt = VerificationTask.objects.get(pk=vt_pk)
-        summary.add_result(
-            verification_task=vt,
-            benchmark=b
-        )
+        summary.add_matrix_result(matrix, row, col)
 
     return summary
@@ -1,11 +1,16 @@
 from verification_tasks.models import VerificationTask, VerificationCategory, Status
-from sklearn.model_selection import train_test_split
 from typing import Tuple
 from pydantic import BaseModel
 from benchmarks.models import Benchmark
 from django.db import models
+from typing import TYPE_CHECKING
+import math
+import numpy as np
 import csv
 
+if TYPE_CHECKING:
+    from .matrix import BenchmarkMatrix
+
 
 def get_train_test_data(test_size: float|None=0.2, random_state=42, shuffle=True, categories: models.Manager[VerificationCategory] = VerificationCategory.objects.all(), use_c_files_only=True) -> Tuple[list[int], list[int]]:    
     if test_size is None:
@@ -19,6 +24,8 @@ def get_train_test_data(test_size: float|None=0.2, random_state=42, shuffle=True
         else:
             return [], [vt.pk for vt in VerificationTask.objects.all()]
     else: 
+        from sklearn.model_selection import train_test_split  # imported here, sklearn alone takes over a second to import
+
         vts_train, vts_test = [], []
         for vc in categories:
             if use_c_files_only:
@@ -48,6 +55,29 @@ class EvaluationStrategySummary(BaseModel):
         self.benchmarks.append(benchmark.pk)
         self.correct += benchmark.is_correct
 
+    def add_matrix_result(self, matrix: "BenchmarkMatrix", row: int, col: int) -> None:
+        cpu = float(matrix.cpu[row, col])
+        memory = float(matrix.memory[row, col])
+        self.total_score += int(matrix.scores[row, col])
+        self.total_cpu += cpu if not math.isnan(cpu) else 600
+        self.total_memory += memory if not math.isnan(memory) else 600
+        self.verification_tasks.append(int(matrix.task_ids[row]))
+        self.benchmarks.append(int(matrix.benchmark_ids[row, col]))
+        self.correct += bool(matrix.is_correct[row, col])
+
+    def extend_matrix_results(self, matrix: "BenchmarkMatrix", rows: np.ndarray, cols: np.ndarray) -> None:
+        found = (rows >= 0) & (cols >= 0)
+        rows, cols = rows[found], cols[found]
+        found = matrix.present[rows, cols]
+        rows, cols = rows[found], cols[found]
+
+        self.total_score += int(matrix.scores[rows, cols].sum())
+        self.total_cpu += float(np.nan_to_num(matrix.cpu[rows, cols], nan=600).sum())
+        self.total_memory += float(np.nan_to_num(matrix.memory[rows, cols], nan=600).sum())
+        self.verification_tasks.extend(matrix.task_ids[rows].tolist())
+        self.benchmarks.extend(matrix.benchmark_ids[rows, cols].tolist())
+        self.correct += int(matrix.is_correct[rows, cols].sum())
+
     def pretty_print(self) -> None:
         print("Total Score:", self.total_score)
         print("Total CPU:", self.total_cpu)
@@ -60,9 +90,11 @@ class EvaluationStrategySummary(BaseModel):
         with open(filename, "w", newline='') as f:
             writer = csv.writer(f)
             writer.writerow(['verification_task', 'verification_task_id', 'verifier', 'status', 'cpu', 'memory', 'status_display', 'raw_score', "is_correct"])
+            vts = VerificationTask.objects.in_bulk(self.verification_tasks)
+            benchmarks = Benchmark.objects.select_related("verifier").in_bulk(self.benchmarks)
             for vt_id, benchmark_id in zip(self.verification_tasks, self.benchmarks):
-                vt = VerificationTask.objects.get(id=vt_id)
-                benchmark = Benchmark.objects.get(id=benchmark_id)
+                vt = vts[vt_id]
+                benchmark = benchmarks[benchmark_id]
                 writer.writerow([
                     vt.name,
                     vt.pk,
@@ -1,31 +1,14 @@
 from verification_tasks.models import VerificationTask, VerificationCategory
 from verifiers.models import Verifier
 from .data import EvaluationStrategySummary
-from benchmarks.models import Benchmark
+from .matrix import get_benchmark_matrix
 from tqdm import tqdm
 from chromadb import Collection
-import torch
-import torch.nn as nn
+from verification_tasks.embedding.index import EmbeddingIndex
+from verification_tasks.embedding.query import get_embeddings
 import numpy as np
 
 
-class VerifierRegressor(nn.Module):
-    def __init__(self, input_dim, hidden_dim=64, output_dim=3):
-        super().__init__()
-        self.net = nn.Sequential(
-            nn.Linear(input_dim, hidden_dim),
-            nn.LayerNorm(hidden_dim),
-            nn.ReLU(),
-            # nn.Linear(hidden_dim, hidden_dim),
-            # nn.LayerNorm(hidden_dim),
-            # nn.ReLU(),
-            nn.Linear(hidden_dim, output_dim),
-        )
-
-    def forward(self, x):
-        return self.net(x)
-
-
 def round_and_sanitize_outputs(outputs: np.ndarray) -> np.ndarray:
     outputs = np.atleast_2d(outputs)
     # Vectorized rounding and clipping for the score (first column)
@@ -36,7 +19,11 @@ def round_and_sanitize_outputs(outputs: np.ndarray) -> np.ndarray:
     sanitized[:, 0] = scores
     return sanitized
 
-def evaluate_embed_and_predict(vts_test: list[int], test_collection: Collection) -> EvaluationStrategySummary:
+def evaluate_embed_and_predict(vts_test: list[int], test_collection: Collection | EmbeddingIndex) -> EvaluationStrategySummary:
+    # torch is only imported once the strategy runs, not when the eval commands are loaded
+    import torch
+    from .verifier_regressor import VerifierRegressor
+
     model = VerifierRegressor(input_dim=296, hidden_dim=64, output_dim=1)
     # model.load_state_dict(torch.load("verifier_regressor_model.pth", map_location="cpu"))
     model.load_state_dict(torch.load("verifier_score_model.pth", map_location="cpu"))
@@ -50,53 +37,41 @@ def evaluate_embed_and_predict(vts_test: list[int], test_collection: Collection)
     print("Total number of dimensions:", 228 + num_categories + num_verifiers)
 
     summary = EvaluationStrategySummary()
+    matrix = get_benchmark_matrix()
+    verifiers = list(Verifier.objects.all())
+    verifier_one_hot = torch.nn.functional.one_hot(
+        torch.tensor([verifier.pk-1 for verifier in verifiers]),
+        num_classes=num_verifiers
+    ).float()
+    embeddings = get_embeddings(vts_test, test_collection)
     vts = VerificationTask.objects.filter(id__in=vts_test)
     for vt in tqdm(vts, desc="Processing Embed&Predict"):
-        entry = test_collection.get(str(vt.pk), include=["embeddings"])
-        try:
-            embedding = entry["embeddings"][0] if "embeddings" in entry else None
-        except Exception as e:
-            print(f"Error retrieving embedding for VerificationTask {vt.pk}: {e}")
+        embedding = embeddings.get(vt.pk)
+        if embedding is None:
+            print(f"Error retrieving embedding for VerificationTask {vt.pk}")
             continue
         
-        verifier_results = []
-        for verifier in Verifier.objects.all():
-            verifier_one_hot = torch.nn.functional.one_hot(
-                torch.tensor(verifier.pk-1),
-                num_classes=num_verifiers
-            ).float()
-            category_one_hot = torch.nn.functional.one_hot(
-                torch.tensor(vt.category.pk-1),
-                num_classes=num_categories
-            ).float()
-            embedding_tensor = torch.tensor(embedding, dtype=torch.float32)
-            full_embedding = torch.cat([embedding_tensor, category_one_hot, verifier_one_hot])
-            full_embedding.to("cpu")
-            with torch.no_grad():
-                outputs = model(full_embedding).cpu().numpy()
-            # outputs = round_and_sanitize_outputs(outputs)
-            score = outputs[0]
-            # cpu = outputs[0][1]
-            # memory = outputs[0][2]
-            verifier_results.append({
-                "verifier": verifier,
-                "score": score,
-                # "cpu": cpu,
-                # "memory": memory,
-            })
+        # Score every verifier for this task in a single forward pass
+        category_one_hot = torch.nn.functional.one_hot(
+            torch.tensor(vt.category_id-1),
+            num_classes=num_categories
+        ).float()
+        embedding_tensor = torch.tensor(embedding, dtype=torch.float32)
+        full_embedding = torch.cat([
+            torch.cat([embedding_tensor, category_one_hot]).expand(len(verifiers), -1),
+            verifier_one_hot,
+        ], dim=1)
+        with torch.no_grad():
+            outputs = model(full_embedding).cpu().numpy()
+        # outputs = round_and_sanitize_outputs(outputs)
+        scores = outputs[:, 0]
+        # cpu = outputs[:, 1]
+        # memory = outputs[:, 2]
 
-        verifier_results.sort(key=lambda x: (-x["score"]))
-        best = verifier_results[0]
-        best_predicted_verifier = best["verifier"]
-        benchmark = Benchmark.objects.filter(
-            verification_task=vt,
-            verifier=best_predicted_verifier
-        ).order_by("-raw_score", "cpu", "memory").first()
-        if benchmark is None:
+        best_predicted_verifier = verifiers[int(np.argmax(scores))]
+        row, col = matrix.row(vt.pk), matrix.column(best_predicted_verifier.pk)
+        if not matrix.has_benchmark(row, col):
             continue
-        summary.add_result(
-            verification_task=vt,
-            benchmark=benchmark
-        )
+        summary.add_matrix_result(matrix, row, col)
 
     return summary
@@ -1,52 +1,34 @@
-from collections import Counter
-from verification_tasks.models import VerificationTask
 from .data import EvaluationStrategySummary
-from verification_tasks.embedding.query import query_verification_task
-from verification_tasks.utils import get_virtually_best_benchmark
-from benchmarks.models import Benchmark
+from .matrix import get_benchmark_matrix
+from verification_tasks.embedding.query import query_verification_tasks
 from tqdm import tqdm
-from django.db.models import Count, Avg, Sum, Q
-from django.db import models
+import numpy as np
 
 
 def evaluate_knn_distance_weighted(vts_test: list[int], train_collection, test_collection, knn: int=5) -> EvaluationStrategySummary:
     summary = EvaluationStrategySummary()
+    matrix = get_benchmark_matrix()
+    # Get the knn closest verification tasks of all test tasks at once
+    neighbours = query_verification_tasks(vts_test, collection=test_collection, collection_query=train_collection, n_results=knn)
     
-    for vt_id in tqdm(vts_test, desc=f"Processing KNN-{str(knn)} Distance-Weighted"):
-        # Get 5 closest verification tasks
-        vt = VerificationTask.objects.get(id=vt_id)
-        vt_closest = query_verification_task(vt, n_results=knn, collection=test_collection, collection_query=train_collection)
-        if vt_closest is None:
-            continue
-        
-        verifier_scores = {}
-        for vt_c in vt_closest:
-            vt_c_obj = vt_c["verification_task"]
-            distance = vt_c["distance"] + 1e-10
-            weight = 1.0 / distance
-            benchmarks = Benchmark.objects.filter(verification_task=vt_c_obj)
-            for bm in benchmarks:
-                verifier = bm.verifier
-                weighted_score = bm.raw_score * weight
-                verifier_scores[verifier] = verifier_scores.get(verifier, 0) + weighted_score
-        
-        if not verifier_scores:
+    for vt_id, vt_closest, distances in zip(tqdm(vts_test, desc=f"Processing KNN-{str(knn)} Distance-Weighted"), neighbours["neighbour_ids"], neighbours["distances"]):
+        rows = matrix.rows(vt_closest)
+        weights = 1.0 / (distances + 1e-10)
+        known = (vt_closest >= 0) & (rows >= 0)
+        weights, rows = weights[known], rows[known]
+        present = matrix.present[rows]
+        if not present.any():
             continue
         
         # Find verifier with highest weight score
-        chosen_verifier = max(verifier_scores.items(), key=lambda x: x[1])[0]
+        verifier_scores = (np.where(present, matrix.scores[rows], 0.0) * weights[:, None]).sum(axis=0)
+        chosen_verifier = int(np.where(present.any(axis=0), verifier_scores, -np.inf).argmax())
         
         # Get benchmark for the chosen verifier
-        benchmark = Benchmark.objects.filter(
-            verification_task=vt, 
-            verifier=chosen_verifier
-        ).order_by("-raw_score", "cpu", "memory").first()
-        if benchmark is None:
+        row = matrix.row(vt_id)
+        if not matrix.has_benchmark(row, chosen_verifier):
             continue
 
-        summary.add_result(
-            verification_task=vt,
-            benchmark=benchmark
-        )
+        summary.add_matrix_result(matrix, row, chosen_verifier)
 
     return summary
@@ -0,0 +1,140 @@
+from functools import cache
+from benchmarks.models import Benchmark
+import numpy as np
+
+
+def _null_first(values: np.ndarray) -> np.ndarray:
+    # SQLite sorts NULL before any value in ascending order, mirror that for cpu/memory
+    return np.where(np.isnan(values), -np.inf, values)
+
+
+def lexicographic_argbest(scores: np.ndarray, cpu: np.ndarray, memory: np.ndarray, valid: np.ndarray) -> np.ndarray:
+    """
+    Index of the best entry along the last axis, ordered like
+    ``order_by("-raw_score", "cpu", "memory")``. Returns -1 where no entry is valid.
+    """
+    scores = np.where(valid, scores, -np.inf)
+    candidates = valid & (scores == scores.max(axis=-1, keepdims=True))
+    cpu_key = np.where(candidates, _null_first(cpu), np.inf)
+    candidates &= cpu_key == cpu_key.min(axis=-1, keepdims=True)
+    memory_key = np.where(candidates, _null_first(memory), np.inf)
+    candidates &= memory_key == memory_key.min(axis=-1, keepdims=True)
+    return np.where(valid.any(axis=-1), candidates.argmax(axis=-1), -1)
+
+
+class BenchmarkMatrix:
+    """
+    Dense verification task x verifier view of the Benchmark table.
+
+    Every cell holds the benchmark that
+    ``Benchmark.objects.filter(verification_task=vt, verifier=v).order_by("-raw_score", "cpu", "memory").first()``
+    returns. Missing cells have ``benchmark_ids == -1``, NULL cpu/memory are stored as NaN.
+    """
+
+    def __init__(self, task_ids: np.ndarray, category_ids: np.ndarray, verifier_ids: np.ndarray, benchmark_ids: np.ndarray, scores: np.ndarray, cpu: np.ndarray, memory: np.ndarray, is_correct: np.ndarray):
+        self.task_ids = task_ids
+        self.category_ids = category_ids
+        self.verifier_ids = verifier_ids
+        self.benchmark_ids = benchmark_ids
+        self.scores = scores
+        self.cpu = cpu
+        self.memory = memory
+        self.is_correct = is_correct
+        self.present = benchmark_ids >= 0
+
+        self._task_rows = {int(vt_id): i for i, vt_id in enumerate(task_ids)}
+        self._verifier_columns = {int(v_id): i for i, v_id in enumerate(verifier_ids)}
+
+    @classmethod
+    def load(cls) -> "BenchmarkMatrix":
+        benchmarks = Benchmark.objects.order_by().values_list(
+            "id", "verification_task_id", "verification_task__category_id", "verifier_id", "raw_score", "cpu", "memory", "is_correct"
+        )
+        columns = list(zip(*benchmarks))
+        if not columns:
+            columns = [()] * 8
+
+        b_ids = np.array(columns[0], dtype=np.int64)
+        vt_ids = np.array(columns[1], dtype=np.int64)
+        category_ids = np.array(columns[2], dtype=np.int64)
+        v_ids = np.array(columns[3], dtype=np.int64)
+        scores = np.array(columns[4], dtype=np.float64)
+        cpu = np.array(columns[5], dtype=np.float64)  # None -> NaN
+        memory = np.array(columns[6], dtype=np.float64)
+        is_correct = np.array(columns[7], dtype=bool)
+
+        task_ids, rows = np.unique(vt_ids, return_inverse=True)
+        verifier_ids, cols = np.unique(v_ids, return_inverse=True)
+        task_categories = np.zeros(len(task_ids), dtype=np.int64)
+        task_categories[rows] = category_ids
+
+        # Keep only the best benchmark per (task, verifier) in case duplicates survived ingest
+        order = np.lexsort((_null_first(memory), _null_first(cpu), -scores, cols, rows))
+        cells = rows[order] * len(verifier_ids) + cols[order]
+        first = np.ones(len(order), dtype=bool)
+        first[1:] = cells[1:] != cells[:-1]
+        order = order[first]
+        rows, cols = rows[order], cols[order]
+
+        shape = (len(task_ids), len(verifier_ids))
+        matrix_b_ids = np.full(shape, -1, dtype=np.int64)
+        matrix_scores = np.zeros(shape, dtype=np.float64)
+        matrix_cpu = np.full(shape, np.nan, dtype=np.float64)
+        matrix_memory = np.full(shape, np.nan, dtype=np.float64)
+        matrix_is_correct = np.zeros(shape, dtype=bool)
+
+        matrix_b_ids[rows, cols] = b_ids[order]
+        matrix_scores[rows, cols] = scores[order]
+        matrix_cpu[rows, cols] = cpu[order]
+        matrix_memory[rows, cols] = memory[order]
+        matrix_is_correct[rows, cols] = is_correct[order]
+
+        return cls(task_ids, task_categories, verifier_ids, matrix_b_ids, matrix_scores, matrix_cpu, matrix_memory, matrix_is_correct)
+
+    def row(self, vt_id: int) -> int:
+        return self._task_rows.get(int(vt_id), -1)
+
+    def rows(self, vt_ids) -> np.ndarray:
+        return np.array([self._task_rows.get(int(vt_id), -1) for vt_id in vt_ids], dtype=np.int64)
+
+    def column(self, verifier_id: int) -> int:
+        return self._verifier_columns.get(int(verifier_id), -1)
+
+    def has_benchmark(self, row: int, col: int) -> bool:
+        return row >= 0 and col >= 0 and bool(self.present[row, col])
+
+    def best_columns(self, rows: np.ndarray) -> np.ndarray:
+        """Column of the virtually best verifier for every given task row, -1 for rows without benchmarks."""
+        rows = np.asarray(rows, dtype=np.int64)
+        known = rows >= 0
+        cols = np.full(len(rows), -1, dtype=np.int64)
+        cols[known] = lexicographic_argbest(self.scores[rows[known]], self.cpu[rows[known]], self.memory[rows[known]], self.present[rows[known]])
+        return cols
+
+    def rank_verifiers(self, rows: np.ndarray) -> int:
+        """
+        Column of the verifier with the best average over the given task rows, ordered by
+        ``-avg_score, avg_cpu, avg_memory`` like the grouped ``annotate`` the kNN strategies used.
+        Returns -1 if none of the rows has a benchmark.
+        """
+        rows = rows[rows >= 0]
+        present = self.present[rows]
+        counts = present.sum(axis=0)
+        if not counts.any():
+            return -1
+
+        avg_score = np.where(present, self.scores[rows], 0.0).sum(axis=0) / np.maximum(counts, 1)
+        return int(lexicographic_argbest(avg_score, self._nan_avg(self.cpu[rows], present), self._nan_avg(self.memory[rows], present), counts > 0))
+
+    @staticmethod
+    def _nan_avg(values: np.ndarray, present: np.ndarray) -> np.ndarray:
+        # SQL AVG skips NULLs and yields NULL if all values are NULL
+        known = present & ~np.isnan(values)
+        counts = known.sum(axis=0)
+        avg = np.where(known, values, 0.0).sum(axis=0) / np.maximum(counts, 1)
+        return np.where(counts > 0, avg, np.nan)
+
+
+@cache
+def get_benchmark_matrix() -> BenchmarkMatrix:
+    return BenchmarkMatrix.load()
@@ -1,37 +1,50 @@
 from django.core.management.base import BaseCommand
+from django.db import models
 from .strategy.best_virtual_verifier import evaluate_virtually_best_verifier
+from .strategy.matrix import get_benchmark_matrix
+import numpy as np
 import pandas as pd
-from benchmarks.models import Benchmark
 from verification_tasks.models import VerificationTask, VerificationCategory
+from collections import defaultdict
 
 
 class Command(BaseCommand):
     help = "Closes the specified poll for voting"
 
     def handle(self, *args, **options):
-        vts = [i[0] for i in VerificationTask.objects.all().values_list("id")]
+        vts = list(VerificationTask.objects.values_list("id", flat=True))
 
         category_summary = evaluate_virtually_best_verifier(vts)
-        benchmarks = [Benchmark.objects.get(id=i) for i in category_summary.benchmarks]
-        verification_tasks = [VerificationTask.objects.get(id=i) for i in category_summary.verification_tasks]
 
-        group : dict[VerificationCategory, list[Benchmark]]= {}
-        for vt, b in zip(verification_tasks, benchmarks):
-            if vt.category not in group:
-                group[vt.category] = []
-            group[vt.category].append(b)
+        # Look the chosen benchmarks up in the matrix cells instead of fetching them from the database
+        matrix = get_benchmark_matrix()
+        rows = matrix.rows(category_summary.verification_tasks)
+        cols = np.argmax(matrix.benchmark_ids[rows] == np.array(category_summary.benchmarks, dtype=np.int64)[:, None], axis=1)
+
+        group: dict[int, list[tuple]] = defaultdict(list)
+        for category_id, is_correct, cpu, memory in zip(matrix.category_ids[rows], matrix.is_correct[rows, cols], matrix.cpu[rows, cols], matrix.memory[rows, cols]):
+            group[int(category_id)].append((
+                bool(is_correct),
+                None if np.isnan(cpu) else float(cpu),
+                None if np.isnan(memory) else float(memory),
+            ))
+
+        categories = VerificationCategory.objects.in_bulk(list(group))
+        vt_counts = dict(VerificationTask.objects.values('category').annotate(
+            count=models.Count('id')
+        ).values_list('category', 'count'))
 
         # Create a summary for each category
         category_summaries = []
-        for category, benchmarks in group.items():
+        for category_id, benchmarks in group.items():
             data = {
-                "category_name": category.name,
-                "correct_count": sum([b.is_correct for b in benchmarks]),
+                "category_name": categories[category_id].name,
+                "correct_count": sum(1 for is_correct, _, _ in benchmarks if is_correct),
                 "number_benchmarks": len(benchmarks),
-                "number_of_vts": VerificationTask.objects.filter(category=category).count(),
+                "number_of_vts": vt_counts.get(category_id, 0),
                 # "total_score": sum([b.raw_score for b in benchmarks]),
-                "total_cpu": sum([b.cpu if b.cpu is not None else 600 for b in benchmarks]),
-                "total_memory": sum([b.memory if b.memory is not None else 600 for b in benchmarks]),                
+                "total_cpu": sum(cpu if cpu is not None else 600 for _, cpu, _ in benchmarks),
+                "total_memory": sum(memory if memory is not None else 600 for _, _, memory in benchmarks),
             }
             category_summaries.append(data)
 
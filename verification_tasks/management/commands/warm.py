@@ -0,0 +1,29 @@
+from django.core.management.base import BaseCommand
+from concurrent.futures import ProcessPoolExecutor
+from verification_tasks.models import VerificationTask
+from verification_tasks.cleaned_sources import warm_cleaned_i_file
+from tqdm import tqdm
+
+
+class Command(BaseCommand):
+    help = "Populate the cache of cleaned .i sources in parallel"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--workers", type=int, default=None, help="Number of worker processes (default: all CPUs)")
+        parser.add_argument("--all", action="store_true", help="Also clean .i files of tasks that are embedded from their .c file")
+
+    def handle(self, *args, **options):
+        i_file_paths = set()
+        for vt in tqdm(VerificationTask.objects.all(), desc="Collecting .i files"):
+            try:
+                if vt.has_i_file() and (options["all"] or not vt.has_c_file()):
+                    i_file_paths.add(str(vt.get_i_file_path()))
+            except Exception as e:
+                print(f"Error resolving source of verification task {vt.pk}: {e}")
+
+        print(f"Cleaning {len(i_file_paths)} .i files.")
+        failed = 0
+        with ProcessPoolExecutor(max_workers=options["workers"]) as pool:
+            for ok in tqdm(pool.map(warm_cleaned_i_file, sorted(i_file_paths), chunksize=8), total=len(i_file_paths), desc="Warming cleaned sources"):
+                failed += not ok
+        print(f"Done, {failed} files could not be read.")
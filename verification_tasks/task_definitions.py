@@ -0,0 +1,134 @@
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from threading import Lock
+from typing import Any, Optional, TypedDict
+import json
+import os
+import tempfile
+import yaml
+
+SV_BENCHMARKS_PATH = Path("sv-benchmarks/c")
+TASK_INDEX_PATH = Path("sv-benchmarks/task_definitions.json")
+TASK_INDEX_VERSION = 1
+
+# libyaml is an order of magnitude faster than the pure python loader
+YamlLoader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+
+
+class TaskDefinition(TypedDict):
+    yml_mtime_ns: int
+    dir_mtime_ns: int  # changes when files are added to or removed from the directory of the task
+    input_files: Any
+    properties: list[str]
+    data_model: Optional[str]
+    has_c_file: bool
+    has_i_file: bool
+
+
+def parse_task_definition(yml_file: str, yml_mtime_ns: int, dir_mtime_ns: int) -> Optional[TaskDefinition]:
+    try:
+        with open(yml_file, 'r') as file:
+            config = yaml.load(file, Loader=YamlLoader)
+    except (OSError, yaml.YAMLError):
+        return None
+    if not isinstance(config, dict):
+        return None
+
+    input_files = config.get("input_files")
+    has_c_file = has_i_file = False
+    if isinstance(input_files, str):
+        input_file = Path(yml_file).parent / input_files
+        has_c_file = input_file.with_suffix(".c").exists()
+        has_i_file = input_file.with_suffix(".i").exists()
+
+    return TaskDefinition(
+        yml_mtime_ns=yml_mtime_ns,
+        dir_mtime_ns=dir_mtime_ns,
+        input_files=input_files,
+        properties=[prop.get("property_file") for prop in config.get("properties") or [] if isinstance(prop, dict)],
+        data_model=(config.get("options") or {}).get("data_model"),
+        has_c_file=has_c_file,
+        has_i_file=has_i_file,
+    )
+
+
+def _parse_task_definition(args: tuple[str, int, int]) -> tuple[str, Optional[TaskDefinition]]:
+    return args[0], parse_task_definition(*args)
+
+
+def _scan_task_files(root: Path) -> dict[str, tuple[int, int]]:
+    """Every .yml below root with its own mtime and the mtime of its directory."""
+    found = {}
+    stack = [(str(root), os.stat(root).st_mtime_ns)]
+    while stack:
+        directory, dir_mtime_ns = stack.pop()
+        with os.scandir(directory) as entries:
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    stack.append((entry.path, entry.stat().st_mtime_ns))
+                elif entry.name.endswith(".yml"):
+                    found[entry.path] = (entry.stat().st_mtime_ns, dir_mtime_ns)
+    return found
+
+
+def build_task_index(root: Path = SV_BENCHMARKS_PATH, index_path: Path = TASK_INDEX_PATH, num_workers: Optional[int] = None) -> dict[str, TaskDefinition]:
+    """
+    Index of all task definitions below root, keyed by the path of their .yml file.
+
+    Definitions are reused from the index persisted at index_path as long as the mtimes of
+    the .yml file and its directory are unchanged. Changed and new files are parsed in a
+    process pool and the updated index is written back.
+    """
+    if not root.is_dir():
+        return {}
+
+    previous: dict[str, TaskDefinition] = {}
+    if index_path.exists():
+        try:
+            stored = json.loads(index_path.read_text())
+            if stored.get("version") == TASK_INDEX_VERSION:
+                previous = stored["tasks"]
+        except (OSError, ValueError, KeyError):
+            pass
+
+    found = _scan_task_files(root)
+    index = {}
+    stale = []
+    for yml_file, (yml_mtime_ns, dir_mtime_ns) in found.items():
+        definition = previous.get(yml_file)
+        if definition is not None and definition["yml_mtime_ns"] == yml_mtime_ns and definition["dir_mtime_ns"] == dir_mtime_ns:
+            index[yml_file] = definition
+        else:
+            stale.append((yml_file, yml_mtime_ns, dir_mtime_ns))
+
+    if len(stale) > 256:
+        with ProcessPoolExecutor(max_workers=num_workers) as pool:
+            parsed = list(pool.map(_parse_task_definition, stale, chunksize=256))
+    else:
+        parsed = [_parse_task_definition(args) for args in stale]
+    index.update((yml_file, definition) for yml_file, definition in parsed if definition is not None)
+
+    if stale or len(index) != len(previous):
+        # A temporary file of its own, so that concurrent builds never write to the same file
+        with tempfile.NamedTemporaryFile("w", dir=index_path.parent, suffix=".tmp", delete=False) as f:
+            json.dump({"version": TASK_INDEX_VERSION, "tasks": index}, f)
+        os.replace(f.name, index_path)
+    return index
+
+
+_task_index: Optional[dict[str, TaskDefinition]] = None
+_task_index_lock = Lock()
+
+
+def get_task_index() -> dict[str, TaskDefinition]:
+    """The task definition index, built or validated once per process, also with several reader threads."""
+    global _task_index
+    if _task_index is None:
+        with _task_index_lock:
+            if _task_index is None:
+                _task_index = build_task_index()
+    return _task_index
+
+
+def get_task_definition(yml_file_path: Path) -> Optional[TaskDefinition]:
+    return get_task_index().get(str(yml_file_path))
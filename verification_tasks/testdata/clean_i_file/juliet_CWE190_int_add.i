@@ -0,0 +1,224 @@
+/* Generated by Frama-C */
+// This file is part of the SV-Benchmarks collection of verification tasks:
+// https://gitlab.com/sosy-lab/benchmarking/sv-benchmarks
+//
+// SPDX-FileCopyrightText: 2012-2021 The SV-Benchmarks Community
+// SPDX-License-Identifier: CC0-1.0
+
+typedef unsigned long size_t;
+typedef int wchar_t;
+typedef long __int64_t;
+typedef __int64_t int64_t;
+typedef unsigned int wint_t;
+struct _twoIntsStruct {
+   int intOne ;
+   int intTwo ;
+};
+typedef struct _twoIntsStruct twoIntsStruct;
+typedef long __off_t;
+typedef long __off64_t;
+typedef long __time_t;
+typedef __time_t time_t;
+struct _IO_FILE;
+struct _IO_marker;
+struct _IO_codecvt;
+struct _IO_wide_data;
+typedef void _IO_lock_t;
+struct _IO_FILE {
+   int _flags ;
+   char *_IO_read_ptr ;
+   char *_IO_read_end ;
+   struct _IO_marker *_markers ;
+   struct _IO_FILE *_chain ;
+   int _fileno ;
+   __off_t _old_offset ;
+   _IO_lock_t *_lock ;
+   __off64_t _offset ;
+   struct _IO_codecvt *_codecvt ;
+   struct _IO_wide_data *_wide_data ;
+};
+typedef struct _IO_FILE _IO_FILE;
+typedef unsigned long pthread_t;
+union __anonunion_pthread_mutexattr_t_4 {
+   char __size[4] ;
+   int __align ;
+};
+typedef union __anonunion_pthread_mutexattr_t_4 pthread_mutexattr_t;
+union pthread_attr_t {
+   char __size[56] ;
+   long __align ;
+};
+typedef union pthread_attr_t pthread_attr_t;
+struct __pthread_internal_list {
+   struct __pthread_internal_list *__prev ;
+   struct __pthread_internal_list *__next ;
+};
+typedef struct __pthread_internal_list __pthread_list_t;
+struct __pthread_mutex_s {
+   int __lock ;
+   unsigned int __count ;
+   __pthread_list_t __list ;
+};
+union __anonunion_pthread_mutex_t_11 {
+   struct __pthread_mutex_s __data ;
+   char __size[40] ;
+   long __align ;
+};
+typedef union __anonunion_pthread_mutex_t_11 pthread_mutex_t;
+struct _stdThread {
+   pthread_t handle ;
+   void (*start)(void *args) ;
+   void *args ;
+};
+typedef struct _stdThread *stdThread;
+struct _stdThreadLock {
+   pthread_mutex_t mutex ;
+};
+typedef struct _stdThreadLock *stdThreadLock;
+extern int printf(char const * __restrict __format , ...);
+extern int puts(char const *__s);
+extern struct _IO_FILE *stdin;
+extern char *fgets(char * __restrict __s, int __n, FILE * __restrict __stream);
+extern int atoi(char const *__nptr) __attribute__((__pure__));
+extern void srand(unsigned int __seed);
+extern int rand(void);
+extern time_t time(time_t *__timer);
+extern void *malloc(size_t __size) __attribute__((__malloc__));
+extern void free(void *__ptr);
+extern void __assert_fail(char const *__assertion, char const *__file,
+                          unsigned int __line, char const *__function);
+void printLine(char const *line);
+void printIntLine(int intNumber);
+void printHexCharLine(char charHex);
+size_t decodeHexChars(unsigned char *bytes, size_t numBytes, char const *hex);
+int globalReturnsTrue(void);
+int globalReturnsFalse(void);
+int globalReturnsTrueOrFalse(void);
+extern int const GLOBAL_CONST_TRUE;
+extern int const GLOBAL_CONST_FALSE;
+extern int const GLOBAL_CONST_FIVE;
+extern int globalTrue;
+extern int globalFalse;
+extern int globalFive;
+void good1(void);
+int stdThreadCreate(void (*start)(void *), void *args, stdThread *thread);
+int stdThreadJoin(stdThread thread);
+int stdThreadLockCreate(stdThreadLock *lock);
+void stdThreadLockAcquire(stdThreadLock lock);
+void stdThreadLockRelease(stdThreadLock lock);
+void stdThreadLockDestroy(stdThreadLock lock);
+extern int __VERIFIER_nondet_int(void);
+void reach_error(void)
+{
+  __assert_fail("0","CWE190_Integer_Overflow__int_add_01.c",3,"reach_error");
+}
+
+void printLine(char const *line)
+{
+  if (line != (char const *)0) printf("%s\n",line);
+  return;
+}
+
+void printIntLine(int intNumber)
+{
+  printf("%d\n",intNumber);
+  return;
+}
+
+size_t decodeHexChars(unsigned char *bytes, size_t numBytes, char const *hex)
+{
+  size_t numWritten = (size_t)0;
+  while (numWritten < numBytes) {
+    int byte;
+    sscanf(hex + 2U * numWritten,"%02x",& byte);
+    *(bytes + numWritten) = (unsigned char)byte;
+    numWritten ++;
+  }
+  return numWritten;
+}
+
+int globalReturnsTrue(void)
+{
+  int __retres;
+  __retres = 1;
+  return __retres;
+}
+
+int const GLOBAL_CONST_TRUE = 1;
+int const GLOBAL_CONST_FALSE = 0;
+int const GLOBAL_CONST_FIVE = 5;
+int globalTrue = 1;
+int globalFalse = 0;
+int globalFive = 5;
+int globalArgc = 0;
+char **globalArgv = (char **)0;
+void good1(void)
+{
+  return;
+}
+
+void bad1(void) { }
+
+static void *internal_start(void *args)
+{
+  stdThread thread = (stdThread)args;
+  (*(thread->start))(thread->args);
+  pthread_exit((void *)0);
+  return (void *)0;
+}
+
+int stdThreadCreate(void (*start)(void *), void *args, stdThread *thread)
+{
+  int __retres;
+  pthread_t handle;
+  stdThread my_thread;
+  my_thread = (stdThread)malloc(sizeof(*my_thread));
+  if (my_thread == (stdThread)0) {
+    __retres = 0;
+    goto return_label;
+  }
+  __retres = 1;
+  return_label: return __retres;
+}
+
+void stdThreadLockAcquire(stdThreadLock lock)
+{
+  pthread_mutex_lock(& lock->mutex);
+  return;
+}
+
+void CWE190_Integer_Overflow__int_add_01_bad(void)
+{
+  int data;
+  data = 0;
+  data = __VERIFIER_nondet_int();
+  {
+    int result = data + 1;
+    printIntLine(result);
+  }
+  return;
+}
+
+static void goodG2B(void)
+{
+  int data;
+  data = 0;
+  data = 2;
+  {
+    int result = data + 1;
+    if (result < data) reach_error();
+    printIntLine(result);
+  }
+  return;
+}
+
+int main(int argc, char **argv)
+{
+  int __retres;
+  srand((unsigned int)time((time_t *)0));
+  printLine("Calling good()...");
+  goodG2B();
+  printLine("Finished good()");
+  __retres = 0;
+  return __retres;
+}
@@ -0,0 +1,153 @@
+/* Generated by CIL v. 1.5.1 */
+/* print_CIL_Input is false */
+
+typedef signed char __s8;
+typedef unsigned char __u8;
+typedef short __s16;
+typedef unsigned short __u16;
+typedef int __s32;
+typedef unsigned int __u32;
+typedef long long __s64;
+typedef unsigned long long __u64;
+typedef unsigned char u8;
+typedef unsigned short u16;
+typedef unsigned int u32;
+typedef long __kernel_long_t;
+typedef unsigned long __kernel_ulong_t;
+typedef int __kernel_pid_t;
+typedef __kernel_long_t __kernel_ssize_t;
+typedef _Bool bool;
+typedef unsigned int gfp_t;
+struct device;
+struct usb_device {
+   int devnum ;
+   char devpath[16U] ;
+   struct device *dev ;
+};
+struct usb_interface {
+   int minor ;
+   struct usb_device *usb_dev ;
+};
+struct usb_misc {
+   struct usb_device *udev ;
+   unsigned char *buf ;
+   int open_count ;
+};
+typedef struct __pthread_internal_list __pthread_list_t;
+extern int printk(char const * , ...) ;
+extern void *kmalloc(size_t size , gfp_t flags ) ;
+extern void kfree(void const * ) ;
+extern void *memset(void * , int , size_t ) ;
+extern void *memcpy(void * , void const * , size_t ) ;
+extern void __VERIFIER_error(void) ;
+extern int __VERIFIER_nondet_int(void) ;
+extern unsigned long __VERIFIER_nondet_ulong(void) ;
+void ldv_check_final_state(void) ;
+void ldv_initialize(void) ;
+extern void ldv_pre_probe(void) ;
+int ldv_post_probe(int probe_ret_val ) ;
+unsigned long ldv_undef_ulong(void) ;
+void *ldv_malloc(size_t size ) ;
+int ldv_state_variable_0  ;
+int ldv_state_variable_1  ;
+int ref_cnt  ;
+struct usb_interface *usb_misc_driver_group1  ;
+void ldv_error(void)
+{
+  {
+  ERROR:
+  __VERIFIER_error();
+  }
+}
+void *ldv_malloc(size_t size )
+{
+  void *p ;
+  void *tmp ;
+  int tmp___0 ;
+  {
+  tmp___0 = __VERIFIER_nondet_int();
+  if (tmp___0 != 0) {
+    return ((void *)0);
+  } else {
+    tmp = malloc(size);
+    p = tmp;
+    return (p);
+  }
+}
+}
+int ldv_undef_int(void)
+{
+  int tmp ;
+  {
+  tmp = __VERIFIER_nondet_int();
+  return (tmp);
+}
+}
+int __VERIFIER_nondet_int(void)
+{
+  int val ;
+  return val;
+}
+static int usb_misc_open(struct usb_misc *dev )
+{
+  int retval ;
+  {
+  retval = 0;
+  if (dev->open_count != 0) {
+    retval = -16;
+    goto exit;
+  } else {
+  }
+  dev->open_count = dev->open_count + 1;
+  exit: ;
+  return (retval);
+}
+}
+static int usb_misc_probe(struct usb_interface *interface )
+{
+  struct usb_misc *dev ;
+  void *tmp ;
+  {
+  tmp = kmalloc(24UL, 208U);
+  dev = (struct usb_misc *)tmp;
+  if ((unsigned long)dev == (unsigned long)((struct usb_misc *)0)) {
+    printk("\016usb_misc: out of memory\n");
+    return (-12);
+  } else {
+  }
+  memset((void *)dev, 0, 24UL);
+  dev->udev = interface->usb_dev;
+  ldv_12345: ;
+  return (0);
+}
+}
+int main(void)
+{
+  int tmp ;
+  int tmp___0 ;
+  {
+  ldv_initialize();
+  ldv_state_variable_1 = 0;
+  ref_cnt = 0;
+  ldv_state_variable_0 = 1;
+  ldv_31201: ;
+  tmp = __VERIFIER_nondet_int();
+  switch (tmp) {
+  case 0: ;
+  if (ldv_state_variable_1 != 0) {
+    tmp___0 = usb_misc_probe(usb_misc_driver_group1);
+    ldv_state_variable_1 = 2;
+    ref_cnt = ref_cnt + 1;
+  } else {
+  }
+  goto ldv_31197;
+  default: ;
+  goto ldv_31197;
+  }
+  ldv_31197: ;
+  goto ldv_31201;
+  ldv_final: ;
+  ldv_check_final_state();
+  return 0;
+}
+}
@@ -0,0 +1,80 @@
+typedef unsigned long int pthread_t;
+union pthread_attr_t
+{
+  char __size[56];
+  long int __align;
+};
+typedef union pthread_attr_t pthread_attr_t;
+typedef struct __pthread_internal_list
+{
+  struct __pthread_internal_list *__prev;
+  struct __pthread_internal_list *__next;
+} __pthread_list_t;
+struct __pthread_mutex_s
+{
+  int __lock;
+  unsigned int __count;
+  int __owner;
+};
+typedef union
+{
+  struct __pthread_mutex_s __data;
+  char __size[40];
+  long int __align;
+} pthread_mutex_t;
+extern void abort(void) __attribute__ ((__nothrow__ , __leaf__)) __attribute__ ((__noreturn__));
+extern void __assert_fail (const char *__assertion, const char *__file,
+      unsigned int __line, const char *__function)
+     __attribute__ ((__nothrow__ , __leaf__)) __attribute__ ((__noreturn__));
+void reach_error() { __assert_fail("0", "stateful01-1.c", 3, "reach_error"); }
+extern int pthread_create (pthread_t *__restrict __newthread,
+      const pthread_attr_t *__restrict __attr,
+      void *(*__start_routine) (void *),
+      void *__restrict __arg) __attribute__ ((__nothrow__)) __attribute__ ((__nonnull__ (1, 3)));
+extern int pthread_join (pthread_t __th, void **__thread_return);
+extern int pthread_mutex_init (pthread_mutex_t *__mutex,
+          const pthread_mutexattr_t *__mutexattr)
+     __attribute__ ((__nothrow__ , __leaf__)) __attribute__ ((__nonnull__ (1)));
+extern int pthread_mutex_lock (pthread_mutex_t *__mutex)
+     __attribute__ ((__nothrow__)) __attribute__ ((__nonnull__ (1)));
+extern int pthread_mutex_unlock (pthread_mutex_t *__mutex)
+     __attribute__ ((__nothrow__)) __attribute__ ((__nonnull__ (1)));
+pthread_mutex_t ma, mb;
+int data1, data2;
+void * thread1(void * arg)
+{
+  pthread_mutex_lock(&ma);
+  data1++;
+  pthread_mutex_unlock(&ma);
+  pthread_mutex_lock(&mb);
+  data2++;
+  pthread_mutex_unlock(&mb);
+  return 0;
+}
+void * thread2(void * arg)
+{
+  pthread_mutex_lock(&ma);
+  data1+=5;
+  pthread_mutex_unlock(&ma);
+  pthread_mutex_lock(&mb);
+  data2-=6;
+  pthread_mutex_unlock(&mb);
+  return 0;
+}
+int main()
+{
+  pthread_t t1, t2;
+  pthread_mutex_init(&ma, 0);
+  pthread_mutex_init(&mb, 0);
+  data1 = 10;
+  data2 = 10;
+  pthread_create(&t1, 0, thread1, 0);
+  pthread_create(&t2, 0, thread2, 0);
+  pthread_join(t1, 0);
+  pthread_join(t2, 0);
+  if (data1!=16 && data2!=5)
+  {
+    ERROR: {reach_error();abort();}
+  }
+  return 0;
+}
@@ -1,3 +1,918 @@
-from django.test import TestCase
+from contextlib import redirect_stdout
+from django.core.management import call_command
+from django.test import SimpleTestCase, TestCase, TransactionTestCase
+from django.db import connection
+from django.db.migrations.executor import MigrationExecutor
+from django.db.models import Avg, Count, Sum
+from django.utils import timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from importlib.util import find_spec
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from threading import Thread
+from unittest import mock, skipUnless
+import io
+import json
+import numpy as np
+import os
+import subprocess
+import sys
+import time
+import warnings
+from .cleaned_sources import CLEANER_VERSION
+from .cleaning import clean_i_file, I_FILE_RULES, SVCOMP_FURTHER_RULES, RuleGroup, rule, rules_digest
+from .embedding.cache import EmbeddingCache
+from .embedding.chunking import chunk_by_bytes, chunk_functions
+from .embedding.embedders.base_embedder import Embedder
+from .embedding.index import EmbeddingIndex
+from .embedding.scheduler import TokenBudgetScheduler
+from .embedding.windowing import embed_hierarchically, split_windows
+from .embedding.sharding import ShardWriter, merge_shards, shard_directory, shard_of
+from .management.commands import setup_sv_comp
+from .management.commands.strategy.matrix import BenchmarkMatrix, lexicographic_argbest
+from .models import VerificationCategory, VerificationTask
+from benchmarks.models import Benchmark
+from verifiers.models import Verifier
+from . import task_definitions
+from .task_definitions import SV_BENCHMARKS_PATH, build_task_index
+from utils.reader import ResultRow, ResultsTable, VerificationResults, get_file, get_results_table, get_verification_results, iter_verification_results, read_arrow_table, urls, verifier_column, write_arrow_table
 
-# Create your tests here.
+TESTDATA_PATH = Path(__file__).parent / "testdata"
+MANAGE_PY_PATH = Path(__file__).parent.parent / "manage.py"
+
+# Commands that do not embed anything, or only when asked to, and the modules they must not import at startup
+LIGHT_COMMANDS = [
+    "check", "warm", "setup_sv_comp", "convert_tables", "subcategories", "outliers", "categorical_best_analysis", "virtually_best_analysis",
+    "eval_strategy", "eval_strategy_codet5p", "eval_strategy_qwen", "eval_strategy_nvembed", "eval_strategy_gemini",
+]
+HEAVY_MODULES = {"torch", "transformers", "sentence_transformers", "sklearn", "google.genai", "onnxruntime"}
+# Opt-in, timings depend on the machine: e.g. IMPORT_TIME_BUDGET_SECONDS=2.5
+IMPORT_TIME_BUDGET_SECONDS = float(os.environ.get("IMPORT_TIME_BUDGET_SECONDS", 0)) or None
+
+
+def clean_i_file_sequentially(code):
+    # Reference: every substitution applied in order, without skipping any rule
+    def apply_all(rules, code):
+        for cleaning_rule in rules:
+            for single_rule in (cleaning_rule.rules if isinstance(cleaning_rule, RuleGroup) else [cleaning_rule]):
+                code = single_rule.pattern.sub(single_rule.repl, code)
+        return code
+
+    code = apply_all(I_FILE_RULES, code)
+    code = "\n".join([line for line in code.splitlines() if line.strip()])
+    return apply_all(SVCOMP_FURTHER_RULES, code).strip()
+
+
+class LexicographicArgbestTest(SimpleTestCase):
+    def test_ties_break_on_cpu_then_memory_then_position(self):
+        nan = np.nan
+        scores = np.array([[2, 2, 2, 1], [2, 2, 2, 2], [1, 1, 1, 1], [0, 0, 0, 0]], dtype=float)
+        cpu = np.array([[5, 3, 3, 1], [4, 4, 4, 4], [nan, 1, nan, 0], [1, 1, 1, 1]], dtype=float)
+        memory = np.array([[1, 9, 8, 1], [7, 7, 7, 7], [5, 1, 3, 1], [1, 1, 1, 1]], dtype=float)
+        valid = np.array([[1, 1, 1, 1], [1, 1, 1, 1], [1, 1, 1, 1], [0, 0, 0, 0]], dtype=bool)
+        # higher score, then lower cpu, then lower memory, then the first column; NULL cpu sorts first like in SQLite
+        self.assertEqual(lexicographic_argbest(scores, cpu, memory, valid).tolist(), [2, 0, 2, -1])
+
+    def test_invalid_entries_never_win(self):
+        best = lexicographic_argbest(np.array([5.0, 1.0]), np.array([0.0, 9.0]), np.array([0.0, 9.0]), np.array([False, True]))
+        self.assertEqual(int(best), 1)
+
+
+class BenchmarkMatrixTest(TestCase):
+    def setUp(self):
+        category = VerificationCategory.objects.create(name="ReachSafety")
+        self.tasks = [VerificationTask.objects.create(name=f"t{i}.yml", category=category) for i in range(3)]
+        self.verifiers = [Verifier.objects.create(name=f"v{i}") for i in range(3)]
+        cells = {
+            (0, 0): (2, 5.0, 1.0), (0, 1): (2, 3.0, 9.0), (0, 2): (2, 3.0, 8.0),
+            (1, 0): (1, None, 4.0), (1, 2): (1, 2.0, 1.0),
+            (2, 1): (-64, None, None),
+        }
+        for (task, verifier), (score, cpu, memory) in cells.items():
+            Benchmark.objects.create(
+                verification_task=self.tasks[task], verifier=self.verifiers[verifier], test_date=timezone.now(),
+                status="true", raw_score=score, cpu=cpu, memory=memory, is_correct=score > 0,
+            )
+
+    def test_best_columns_match_the_orm_ordering(self):
+        matrix = BenchmarkMatrix.load()
+        best = matrix.best_columns(matrix.rows([vt.id for vt in self.tasks]))
+        for vt, col in zip(self.tasks, best):
+            expected = Benchmark.objects.filter(verification_task=vt).order_by("-raw_score", "cpu", "memory").first()
+            self.assertEqual(matrix.verifier_ids[col], expected.verifier_id)
+            self.assertEqual(matrix.benchmark_ids[matrix.row(vt.id), col], expected.id)
+
+    def test_missing_cells_and_unknown_tasks(self):
+        matrix = BenchmarkMatrix.load()
+        self.assertFalse(matrix.has_benchmark(matrix.row(self.tasks[1].id), matrix.column(self.verifiers[1].id)))
+        self.assertTrue(np.isnan(matrix.cpu[matrix.row(self.tasks[1].id), matrix.column(self.verifiers[0].id)]))
+        self.assertEqual(matrix.best_columns(np.array([-1])).tolist(), [-1])
+
+
+class ConstantEmbedder(Embedder):
+    def embed(self, code):
+        return [float(len(code)), 1.0]
+
+
+class FailingEmbedder(Embedder):
+    def __init__(self, error):
+        self.error = error
+        self.calls = 0
+
+    def embed(self, code):
+        self.calls += 1
+        raise self.error
+
+
+class RecordingUpserts:
+    def __init__(self):
+        self.ids = []
+
+    def get(self, include=None):
+        return {"ids": []}
+
+    def upsert(self, embeddings, metadatas, ids):
+        self.ids.extend(ids)
+
+
+class FailingCollection:
+    def __init__(self):
+        self.upserts = 0
+
+    def get(self, include=None):
+        return {"ids": []}
+
+    def upsert(self, embeddings, metadatas, ids):
+        self.upserts += 1
+        raise RuntimeError("collection unavailable")
+
+
+class EmbedPipelineTest(TransactionTestCase):
+    def run_pipeline(self, embedder, collection, num_tasks=40):
+        from .embedding.embed import embed_verifications_tasks
+        category = VerificationCategory.objects.create(name="ReachSafety")
+        vts = [VerificationTask.objects.create(name=f"t{i}.yml", category=category).id for i in range(num_tasks)]
+        errors = []
+
+        def run():
+            try:
+                with TemporaryDirectory() as cache_dir, mock.patch("verification_tasks.embedding.embed.read_verification_task", lambda vt: (vt, "c", f"int main{vt.pk}() {{}}")):
+                    embed_verifications_tasks(vts, embedder, collection, num_workers=2, batch_size=1, queue_depth=1, upsert_batch_size=1, cache=EmbeddingCache("test", cache_dir))
+            except BaseException as e:
+                errors.append(e)
+
+        # In a thread, so that a hanging pipeline fails the test instead of blocking it
+        thread = Thread(target=run, daemon=True)
+        thread.start()
+        thread.join(timeout=30)
+        self.assertFalse(thread.is_alive(), "pipeline hangs")
+        return errors
+
+    def test_writer_error_is_raised_instead_of_hanging(self):
+        collection = FailingCollection()
+        errors = self.run_pipeline(ConstantEmbedder(), collection)
+        self.assertEqual([str(e) for e in errors], ["collection unavailable"])
+        self.assertEqual(collection.upserts, 1)
+
+    def test_failing_embed_skips_the_tasks(self):
+        collection = RecordingUpserts()
+        embedder = FailingEmbedder(RuntimeError("out of memory"))
+        self.assertEqual(self.run_pipeline(embedder, collection, num_tasks=10), [])
+        self.assertEqual(embedder.calls, 20)  # the batch call and the one by one retry
+        self.assertEqual(collection.ids, [])
+
+    def test_model_error_is_raised_instead_of_hanging(self):
+        # An interrupt is not caught by the one by one retry and escapes the model loop
+        collection = RecordingUpserts()
+        embedder = FailingEmbedder(KeyboardInterrupt())
+        errors = self.run_pipeline(embedder, collection)
+        self.assertEqual([type(e) for e in errors], [KeyboardInterrupt])
+        self.assertEqual(embedder.calls, 1)
+        self.assertEqual(collection.ids, [])
+
+
+class EmbeddingCacheTest(SimpleTestCase):
+    def test_round_trip_and_reopen(self):
+        with TemporaryDirectory() as cache_dir:
+            cache = EmbeddingCache("model/v1", cache_dir)
+            cache.put_many([("a", [1.0, 2.0]), ("b", [0.5, -1.0])])
+            cache.put("a", [9.0, 9.0])  # first write wins
+            self.assertEqual(cache.get("a"), [1.0, 2.0])
+            self.assertIsNone(cache.get("c"))
+
+            reopened = EmbeddingCache("model/v1", cache_dir)
+            self.assertEqual(len(reopened), 2)
+            self.assertEqual(reopened.get("b"), [0.5, -1.0])
+            reopened.put("c", [3.0, 4.0])
+            self.assertEqual(EmbeddingCache("model/v1", cache_dir).get("c"), [3.0, 4.0])
+            self.assertEqual(len(EmbeddingCache("model/v2", cache_dir)), 0)
+
+    def test_partial_write_does_not_shift_rows(self):
+        with TemporaryDirectory() as cache_dir:
+            cache = EmbeddingCache("model", cache_dir)
+            cache.put("a", [1.0, 2.0])
+            # A crash in put_many: one whole and one torn matrix row, a torn index line
+            with open(cache.directory / "embeddings.f16", "ab") as f:
+                f.write(np.array([7.0, 7.0, 8.0], dtype=np.float16).tobytes())
+            with open(cache.directory / "index.txt", "a") as f:
+                f.write("x\t1")
+
+            reopened = EmbeddingCache("model", cache_dir)
+            self.assertEqual(len(reopened), 1)
+            reopened.put_many([("b", [3.0, 4.0]), ("c", [5.0, 6.0])])
+
+            for cache in (reopened, EmbeddingCache("model", cache_dir)):
+                self.assertEqual([cache.get(key) for key in "abc"], [[1.0, 2.0], [3.0, 4.0], [5.0, 6.0]])
+                self.assertIsNone(cache.get("x"))
+
+
+class TaskIndexTest(SimpleTestCase):
+    def write_tree(self, root: Path) -> None:
+        (root / "loops").mkdir(parents=True)
+        (root / "loops" / "a.yml").write_text("format_version: '2.0'\ninput_files: 'a.i'\nproperties:\n  - property_file: ../properties/unreach-call.prp\n    expected_verdict: true\noptions:\n  language: C\n  data_model: ILP32\n")
+        (root / "loops" / "a.i").write_text("int main() {}")
+        (root / "loops" / "b.yml").write_text("input_files: 'b.c'\n")
+        (root / "loops" / "broken.yml").write_text("input_files: [\n")
+
+    def test_build_and_reuse(self):
+        with TemporaryDirectory() as tmp:
+            root, index_path = Path(tmp) / "c", Path(tmp) / "task_definitions.json"
+            self.write_tree(root)
+            index = build_task_index(root, index_path)
+            a, b = index[str(root / "loops" / "a.yml")], index[str(root / "loops" / "b.yml")]
+            self.assertEqual(len(index), 2)
+            self.assertEqual((a["input_files"], a["properties"], a["data_model"], a["has_c_file"], a["has_i_file"]), ("a.i", ["../properties/unreach-call.prp"], "ILP32", False, True))
+            self.assertEqual((b["has_c_file"], b["has_i_file"]), (False, False))
+
+            # Unchanged files come from the persisted index, only the unparsable one is tried again
+            with mock.patch.object(task_definitions, "parse_task_definition", wraps=task_definitions.parse_task_definition) as parse:
+                self.assertEqual(build_task_index(root, index_path), index)
+            self.assertEqual([Path(call.args[0]).name for call in parse.call_args_list], ["broken.yml"])
+
+            # A file added to the directory changes its mtime, the definitions of the directory are parsed again
+            (root / "loops" / "b.c").write_text("int main() {}")
+            os.utime(root / "loops", ns=(time.time_ns(), time.time_ns() + 10**9))
+            self.assertTrue(build_task_index(root, index_path)[str(root / "loops" / "b.yml")]["has_c_file"])
+            self.assertEqual([path.name for path in Path(tmp).iterdir() if path.suffix == ".tmp"], [])
+
+    def test_index_is_built_once_across_threads(self):
+        def slow_build():
+            time.sleep(0.2)
+            return {}
+
+        with mock.patch.object(task_definitions, "_task_index", None), mock.patch.object(task_definitions, "build_task_index", side_effect=slow_build) as build:
+            threads = [Thread(target=task_definitions.get_task_index) for _ in range(8)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            self.assertEqual(build.call_count, 1)
+
+
+class RecordingCollection:
+    def __init__(self):
+        self.upserts = []
+
+    def upsert(self, embeddings, metadatas, ids):
+        self.upserts.append((np.asarray(embeddings), metadatas, ids))
+
+
+class ShardTest(SimpleTestCase):
+    def upsert(self, writer, vt_ids):
+        writer.upsert(
+            embeddings=[np.full(3, vt_id, dtype=np.float32) for vt_id in vt_ids],
+            metadatas=[{"verification_task": f"t{vt_id}.yml", "file_type": "c", "verification_category": "ReachSafety"} for vt_id in vt_ids],
+            ids=[str(vt_id) for vt_id in vt_ids],
+        )
+
+    def test_shards_are_stable_and_cover_all_tasks(self):
+        shards = [shard_of(vt_id, 4) for vt_id in range(1000)]
+        self.assertEqual(shards, [shard_of(vt_id, 4) for vt_id in range(1000)])
+        self.assertEqual(set(shards), {0, 1, 2, 3})
+
+    def test_writer_parts_and_merge(self):
+        with TemporaryDirectory() as tmp:
+            root = Path(tmp)
+            first, second = ShardWriter(shard_directory(root, 0, 2)), ShardWriter(shard_directory(root, 1, 2))
+            self.upsert(first, [1, 2, 3])
+            self.upsert(first, [4])
+            self.upsert(second, [5, 6])
+            # done tasks of all shards are visible to every writer, also after a restart
+            self.assertEqual(sorted(ShardWriter(shard_directory(root, 0, 2)).get(include=[])["ids"]), ["1", "2", "3", "4", "5", "6"])
+            self.assertEqual(len(list(shard_directory(root, 0, 2).glob("part-*.npz"))), 2)
+
+            collection = RecordingCollection()
+            self.assertEqual(merge_shards(collection, root, batch_size=2), 6)
+            self.assertEqual([ids for _, _, ids in collection.upserts], [["1", "2"], ["3"], ["4"], ["5", "6"]])
+            embeddings, metadatas, ids = collection.upserts[0]
+            self.assertEqual(embeddings.tolist(), [[1.0] * 3, [2.0] * 3])
+            self.assertEqual(metadatas[1], {"verification_task": "t2.yml", "file_type": "c", "verification_category": "ReachSafety"})
+            self.assertEqual(list(root.glob("*/part-*.npz")), [])
+
+
+def per_verifier_ranking(category):
+    """The ranking as verifier_ranking computed it with one aggregation per verifier."""
+    results = []
+    for v in Verifier.objects.all():
+        if not Benchmark.objects.filter(verification_task__category=category, verifier=v).exists():
+            continue
+        verifier_task_summary = category.verifier_task_summary(v.name)
+        aggregated_summary = verifier_task_summary.aggregate(
+            total_benchmarks=Sum('count'),
+            sum_of_avg_scores=Sum('avg_score'),
+            total_sum_score=Sum('sum_score'),
+            avg_cpu_across_tasks=Avg('avg_cpu'),
+            avg_memory_across_tasks=Avg('avg_memory'),
+            total_correct_count=Sum('correct_count'),
+            task_count=Count('verification_task__id'),
+        )
+        aggregated_summary['verifier__name'] = v.name
+        aggregated_summary["vts_covered"] = verifier_task_summary.count()
+        aggregated_summary["correct_accuracy"] = aggregated_summary['total_correct_count'] / aggregated_summary['total_benchmarks']
+        aggregated_summary["avg_score_per_benchmark"] = aggregated_summary['sum_of_avg_scores'] / aggregated_summary['vts_covered']
+        results.append(aggregated_summary)
+    return sorted(results, key=lambda x: x['sum_of_avg_scores'], reverse=True)
+
+
+class VerifierRankingsTest(TestCase):
+    def setUp(self):
+        self.categories = [VerificationCategory.objects.create(name=name) for name in ("ReachSafety", "MemSafety")]
+        verifiers = [Verifier.objects.create(name=name) for name in ("c", "a", "b", "d")]
+        scores = {  # (category, task) -> score per verifier, None for no benchmark
+            (0, 0): [2, 2, -16, None], (0, 1): [1, 0, 2, None], (0, 2): [-64, 1, 1, None],
+            (1, 0): [2, None, 2, 1], (1, 1): [None, None, 0, 2],
+        }
+        for (category, task), verifier_scores in scores.items():
+            vt = VerificationTask.objects.create(name=f"c{category}/t{task}.yml", category=self.categories[category])
+            for v, (verifier, score) in enumerate(zip(verifiers, verifier_scores)):
+                if score is not None:
+                    Benchmark.objects.create(
+                        verification_task=vt, verifier=verifier, test_date=timezone.now(), status="true", raw_score=score,
+                        cpu=None if v == task else float(v + task), memory=float(10 * v), is_correct=score > 0,
+                    )
+
+    def test_matches_per_verifier_aggregation(self):
+        rankings = VerificationCategory.verifier_rankings()
+        for category in self.categories:
+            expected = per_verifier_ranking(category)
+            self.assertEqual([ranking['verifier__name'] for ranking in rankings[category.pk]], [ranking['verifier__name'] for ranking in expected])
+            for ranking, expected_ranking in zip(rankings[category.pk], expected):
+                for key in ("sum_of_avg_scores", "vts_covered", "correct_accuracy", "total_benchmarks", "total_correct_count", "avg_score_per_benchmark"):
+                    self.assertEqual(ranking[key], expected_ranking[key], key)
+                for key in ("avg_cpu_across_tasks", "avg_memory_across_tasks"):
+                    self.assertAlmostEqual(ranking[key], expected_ranking[key], msg=key)
+            self.assertEqual(category.verifier_ranking(), rankings[category.pk])
+            self.assertEqual(category.best_verifier().name, expected[0]['verifier__name'])
+
+
+class EmbeddingIndexTest(SimpleTestCase):
+    def setUp(self):
+        rng = np.random.default_rng(0)
+        self.ids = np.arange(100, 160)
+        self.embeddings = rng.normal(size=(60, 8)).astype(np.float32)
+        self.categories = np.array(["ReachSafety", "MemSafety", "Termination"])[rng.integers(0, 3, size=60)]
+        self.queries = rng.normal(size=(5, 8)).astype(np.float32)
+        self.index = EmbeddingIndex(self.ids, self.embeddings, [{"verification_category": category} for category in self.categories])
+
+    def brute_force(self, rows, k, metric="l2"):
+        if metric == "cosine":
+            normalise = lambda x: x / np.linalg.norm(x, axis=1, keepdims=True)
+            distances = 1.0 - normalise(self.queries) @ normalise(self.embeddings[rows]).T
+        else:
+            distances = ((self.queries[:, None, :] - self.embeddings[rows][None, :, :]) ** 2).sum(axis=2)
+        order = np.argsort(distances, axis=1)[:, :k]
+        return self.ids[rows][order], np.take_along_axis(distances, order, axis=1)
+
+    def test_search_matches_brute_force(self):
+        for metric in ("l2", "cosine"):
+            index = EmbeddingIndex(self.ids, self.embeddings, self.index.metadatas, metric=metric)
+            for category in ("ReachSafety", "MemSafety"):
+                for k in (1, 5, 100):
+                    ids, distances = index.search(self.queries, category, k)
+                    expected_ids, expected_distances = self.brute_force(np.flatnonzero(self.categories == category), k, metric)
+                    np.testing.assert_array_equal(ids, expected_ids)
+                    np.testing.assert_allclose(distances, expected_distances, rtol=1e-4, atol=1e-4)
+
+    def test_subset_never_returns_ids_outside_it(self):
+        subset_ids = self.ids[::3]
+        view = self.index.subset(subset_ids.tolist() + [999])  # unknown ids are ignored
+        self.assertEqual(view.count(), len(subset_ids))
+        self.assertEqual(self.index.count(), len(self.ids))  # the parent index keeps its full mask
+        for category in ("ReachSafety", "MemSafety", "Termination"):
+            ids, distances = view.search(self.queries, category, 100)
+            self.assertTrue(np.isin(ids, subset_ids).all())
+            rows = np.flatnonzero((self.categories == category) & np.isin(self.ids, subset_ids))
+            expected_ids, _ = self.brute_force(rows, 100)
+            np.testing.assert_array_equal(ids, expected_ids)
+        self.assertEqual(set(view.get_embeddings(self.ids.tolist())), set(subset_ids.tolist()))
+
+    def test_empty_category(self):
+        ids, distances = self.index.subset([]).search(self.queries, "ReachSafety", 5)
+        self.assertEqual(ids.shape, (5, 0))
+        ids, distances = self.index.search(self.queries, "NoDataRace", 5)
+        self.assertEqual(distances.shape, (5, 0))
+
+
+class QueryVerificationTasksTest(TestCase):
+    def test_neighbours_within_category_from_index(self):
+        from .embedding.query import query_verification_tasks
+        categories = [VerificationCategory.objects.create(name=name) for name in ("ReachSafety", "MemSafety")]
+        vts = [VerificationTask.objects.create(name=f"t{i}.yml", category=categories[i % 2]) for i in range(8)]
+        embeddings = np.array([[i, i % 3] for i in range(8)], dtype=np.float32)
+        index = EmbeddingIndex(
+            np.array([vt.id for vt in vts]), embeddings,
+            [{"verification_category": vt.category.name} for vt in vts],
+        )
+        train, test = index.subset([vt.id for vt in vts[:6]]), index.subset([vt.id for vt in vts[6:]])
+        queried = [vts[6].id, vts[7].id, vts[0].id]  # vts[0] is not in the test view
+
+        with self.assertNumQueries(1):
+            neighbours = query_verification_tasks(queried, collection=test, collection_query=train, n_results=4)
+        self.assertEqual(set(neighbours), {"neighbour_ids", "distances"})
+        # t6 (6, 0) among t0, t2, t4 of ReachSafety: distances 36+0, 16+4, 4+1
+        self.assertEqual(neighbours["neighbour_ids"][0].tolist(), [vts[4].id, vts[2].id, vts[0].id, -1])
+        self.assertEqual(neighbours["distances"][0].tolist(), [5.0, 20.0, 36.0, np.inf])
+        self.assertEqual(neighbours["neighbour_ids"][1].tolist(), [vts[5].id, vts[3].id, vts[1].id, -1])
+        self.assertEqual(neighbours["neighbour_ids"][2].tolist(), [-1] * 4)
+
+
+class TableSVCOMP:
+    """Stands in for SVCOMP with the results of each category given as rows."""
+
+    def __init__(self, results: dict[str, list[ResultRow]]):
+        self._results = results
+
+    def results(self, category):
+        return iter(self._results.get(category, []))
+
+
+def cpachecker(day):
+    # Headers like the SV-COMP 2025 tables, which VerifierColumn expects
+    return f"CPAchecker 2024-{day} 10:00:00 CET [unreach-call; x]"
+
+
+class BenchmarkIngestTest(TestCase):
+    def setUp(self):
+        category = VerificationCategory.objects.create(name="ReachSafety")
+        for name in ("a.yml", "b.yml"):
+            VerificationTask.objects.create(name=name, category=category)
+        Verifier.objects.create(name="CPAchecker")
+
+    def ingest(self, results):
+        with redirect_stdout(io.StringIO()) as output, mock.patch.object(setup_sv_comp, "tqdm", lambda rows, **kwargs: rows), warnings.catch_warnings():
+            warnings.simplefilter("ignore")  # dateutil does not know the CET of the headers
+            setup_sv_comp.benchmarks(TableSVCOMP(results))
+        return output.getvalue().strip()
+
+    def stored(self):
+        return sorted(Benchmark.objects.values_list("verification_task__name", "status", "raw_score", "cpu", "memory", "is_correct"))
+
+    def test_newest_column_of_a_table_wins(self):
+        old, new = cpachecker("11-28"), cpachecker("12-05")
+        output = self.ingest({
+            "reach_safety": [
+                ResultRow("a.yml", old, "false", "-32", 5.0, 10.0),
+                ResultRow("a.yml", new, "true", "2", 1.0, 2.0),
+                ResultRow("b.yml", new, "TIMEOUT", None, None, None),
+                ResultRow("b.yml", old, "true", "2", 3.0, 4.0),
+            ],
+            "mem_safety": [ResultRow("a.yml", old, "unknown", "0", 7.0, 8.0)],  # same pair, ingested first
+        })
+        self.assertEqual(output, "Inserted benchmarks: 2 Replaced: 1 Skipped: 0")
+        self.assertEqual(self.stored(), [("a.yml", "true", 2, 1.0, 2.0, True), ("b.yml", "TIMEOUT", -64, None, None, False)])
+        self.assertEqual(set(Benchmark.objects.values_list("test_date", flat=True)), {setup_sv_comp.parse_test_date("2024-12-05 10:00:00 CET")})
+
+    def test_reingest_keeps_one_row_with_the_newest_values(self):
+        first = {"reach_safety": [ResultRow("a.yml", cpachecker("12-05"), "true", "2", 1.0, 2.0), ResultRow("b.yml", cpachecker("12-05"), "false", "-32", 3.0, 4.0)]}
+        self.assertEqual(self.ingest(first), "Inserted benchmarks: 2 Replaced: 0 Skipped: 0")
+        newest = self.stored()
+
+        older = {"reach_safety": [ResultRow("a.yml", cpachecker("11-28"), "unknown", "0", 9.0, 9.0), ResultRow("b.yml", cpachecker("11-28"), "true", "2", 9.0, 9.0)]}
+        self.assertEqual(self.ingest(older), "Inserted benchmarks: 0 Replaced: 0 Skipped: 2")
+        self.assertEqual(self.ingest(first), "Inserted benchmarks: 0 Replaced: 0 Skipped: 2")
+        self.assertEqual(self.stored(), newest)
+
+        newer = {"reach_safety": [ResultRow("b.yml", cpachecker("12-12"), "true", "2", 0.5, 1.5)]}
+        self.assertEqual(self.ingest(newer), "Inserted benchmarks: 0 Replaced: 1 Skipped: 0")
+        self.assertEqual(self.stored(), [newest[0], ("b.yml", "true", 2, 0.5, 1.5, True)])
+        self.assertEqual(Benchmark.objects.count(), 2)
+
+    def test_unknown_tasks_and_verifiers_are_rejected(self):
+        with self.assertRaisesMessage(ValueError, "Verification task c.yml not found"):
+            self.ingest({"reach_safety": [ResultRow("c.yml", cpachecker("11-28"), "true", "2", 1.0, 2.0)]})
+        with self.assertRaisesMessage(ValueError, "Verifier ESBMC not found"):
+            self.ingest({"reach_safety": [ResultRow("a.yml", "ESBMC 2024-11-28 10:00:00 CET [unreach-call]", "true", "2", 1.0, 2.0)]})
+        self.assertEqual(Benchmark.objects.count(), 0)
+
+
+class UniqueBenchmarkMigrationTest(TransactionTestCase):
+    apps_state = [("verification_tasks", "0009_verificationtask_subcategories"), ("verifiers", "0002_alter_verifier_options")]
+    before = [("benchmarks", "0009_alter_benchmark_raw_score")] + apps_state
+    after = [("benchmarks", "0010_benchmark_unique_verifier_task")] + apps_state
+
+    def migrate(self, targets):
+        executor = MigrationExecutor(connection)
+        executor.migrate(targets)
+        return executor.loader.project_state(targets).apps
+
+    def tearDown(self):
+        executor = MigrationExecutor(connection)
+        executor.migrate(executor.loader.graph.leaf_nodes())
+
+    def test_keeps_the_newest_benchmark_per_pair(self):
+        apps = self.migrate(self.before)
+        category = apps.get_model("verification_tasks", "VerificationCategory").objects.create(name="ReachSafety")
+        task, other_task = (apps.get_model("verification_tasks", "VerificationTask").objects.create(name=name, category=category) for name in ("a.yml", "b.yml"))
+        verifier = apps.get_model("verifiers", "Verifier").objects.create(name="CPAchecker")
+        OldBenchmark = apps.get_model("benchmarks", "Benchmark")
+        newer, older = timezone.now(), timezone.now() - timezone.timedelta(days=7)
+        rows = [(task, older, "old"), (task, newer, "new"), (task, older, "old"), (other_task, older, "only"), (other_task, older, "tie"), (other_task, older, "tie, larger id")]
+        for vt, test_date, status in rows:
+            OldBenchmark.objects.create(verification_task=vt, verifier=verifier, test_date=test_date, status=status, raw_score=1)
+
+        apps = self.migrate(self.after)
+        remaining = apps.get_model("benchmarks", "Benchmark").objects.order_by("verification_task__name")
+        self.assertEqual(list(remaining.values_list("verification_task__name", "status")), [("a.yml", "new"), ("b.yml", "tie, larger id")])
+
+
+class CleanIFileTest(SimpleTestCase):
+    def test_golden_outputs(self):
+        """Outputs recorded with the original one re.sub per pattern implementation."""
+        samples = sorted((TESTDATA_PATH / "clean_i_file").glob("*.i"))
+        self.assertTrue(samples)
+        for sample in samples:
+            with self.subTest(sample=sample.name):
+                self.assertEqual(clean_i_file(sample.read_text()), sample.with_suffix(".golden").read_text())
+
+    @skipUnless(SV_BENCHMARKS_PATH.is_dir(), "sv-benchmarks not checked out")
+    def test_sv_benchmarks_sample(self):
+        samples = sorted(SV_BENCHMARKS_PATH.rglob("*.i"))[::50][:40]
+        for sample in samples:
+            code = sample.read_text(errors="replace")
+            with self.subTest(sample=str(sample)):
+                self.assertEqual(clean_i_file(code), clean_i_file_sequentially(code))
+
+    def test_rules_digest_tracks_patterns_and_replacements(self):
+        rules = I_FILE_RULES + SVCOMP_FURTHER_RULES
+        self.assertEqual(rules_digest(rules), rules_digest(list(rules)))
+        changed = [rule(r'\n\n+', "\n\n", repl='\n\n')] + rules[1:]
+        self.assertNotEqual(rules_digest(changed), rules_digest(rules))
+        self.assertNotEqual(rules_digest(rules[:-1]), rules_digest(rules))
+        # only the literals, which never change the output
+        relaxed = [rule(rules[0].pattern.pattern, flags=rules[0].pattern.flags, repl=rules[0].repl)] + rules[1:]
+        self.assertEqual(rules_digest(relaxed), rules_digest(rules))
+        self.assertIn(rules_digest(rules)[:16], CLEANER_VERSION)
+
+
+class CharTokenizer:
+    """One id per character, a single sequence framed by <s>=0 and </s>=2 like RoBERTa's."""
+
+    def __call__(self, text, add_special_tokens=True, **kwargs):
+        texts = [text] if isinstance(text, str) else text
+        input_ids = [([0] if add_special_tokens else []) + [ord(c) for c in t] + ([2] if add_special_tokens else []) for t in texts]
+        return {"input_ids": input_ids[0] if isinstance(text, str) else input_ids}
+
+
+def decode(ids):
+    return "".join(chr(i) for i in ids)
+
+
+class ChunkFunctionsTest(SimpleTestCase):
+    def test_windows_of_token_ids(self):
+        codes = ["int f() {\n  return 1;\n}\n", "// none\nint x;\n", "void g(int a) {\n  a++; /* c */\n}\n"]
+        input_ids, owners = chunk_functions(codes, CharTokenizer(), max_length=12, overlap=3)
+        self.assertEqual(owners, [0, 0, 0, 2, 2, 2])
+        self.assertTrue(all(ids[0] == 0 and ids[-1] == 2 and len(ids) <= 12 for ids in input_ids))
+        windows = [decode(ids[1:-1]) for ids in input_ids]
+        self.assertEqual(windows[:3], ["int f() {\n", " {\n  retur", "turn 1;\n}"])
+        # consecutive windows share 3 ids and together cover the whole function, comments removed
+        for owner, function in ((0, "int f() {\n  return 1;\n}"), (2, "void g(int a) {\n  a++;\n}")):
+            parts = [window for window, window_owner in zip(windows, owners) if window_owner == owner]
+            self.assertEqual(parts[0] + "".join(part[3:] for part in parts[1:]), function)
+
+    def test_short_function_is_one_window(self):
+        input_ids, owners = chunk_functions(["int main() {\n}\n"], CharTokenizer(), max_length=512)
+        self.assertEqual([decode(ids[1:-1]) for ids in input_ids], ["int main() {\n}"])
+        self.assertEqual(owners, [0])
+        self.assertEqual(chunk_functions(["int x;"], CharTokenizer()), ([], []))
+
+
+class WindowingTest(SimpleTestCase):
+    def test_split_windows_covers_the_tail(self):
+        self.assertEqual(split_windows(list(range(10)), 4, overlap=1), [[0, 1, 2, 3], [3, 4, 5, 6], [6, 7, 8, 9]])
+        self.assertEqual(split_windows(list(range(11)), 4, overlap=1)[-1], [9, 10])
+        self.assertEqual(split_windows([1, 2], 4), [[1, 2]])
+        self.assertEqual(split_windows([], 4), [[]])
+        for length in range(1, 40):
+            for size, overlap in ((5, 0), (5, 2), (8, 7)):
+                windows = split_windows(list(range(length)), size, overlap)
+                self.assertEqual(windows[-1][-1], length - 1)
+                self.assertTrue(all(len(window) <= size for window in windows))
+                self.assertTrue(all(a[len(a) - overlap:] == b[:overlap] for a, b in zip(windows, windows[1:]) if len(a) == size))
+
+    def test_max_windows_spreads_over_the_sequence(self):
+        windows = split_windows(list(range(100)), 10, max_windows=3)
+        self.assertEqual([window[0] for window in windows], [0, 40, 90])
+        self.assertEqual(windows[-1][-1], 99)
+        self.assertEqual(len(split_windows(list(range(100)), 10, max_windows=20)), 10)
+
+    def test_token_weighted_pooling(self):
+        seen = []
+
+        def run_batch(windows):
+            seen.extend(windows)
+            # the first real token of every window, after <s>
+            return [[float(window[1]), 1.0] for window in windows]
+
+        scheduler = TokenBudgetScheduler(max_tokens=12, max_batch_size=2)
+        codes = ["aaaabb", "c"]
+        pooled = {
+            pooling: embed_hierarchically(codes, CharTokenizer(), 6, scheduler, run_batch, pooling=pooling)
+            for pooling in ("mean", "weighted", "max")
+        }
+        # windows of 4 ids plus <s> and </s>: "aaaa" (4 tokens) and "bb" (2 tokens)
+        self.assertEqual(pooled["mean"], [[97.5, 1.0], [99.0, 1.0]])
+        self.assertEqual(pooled["weighted"], [[(4 * 97 + 2 * 98) / 6, 1.0], [99.0, 1.0]])
+        self.assertEqual(pooled["max"], [[98.0, 1.0], [99.0, 1.0]])
+        self.assertTrue(all(len(window) <= 6 and window[0] == 0 and window[-1] == 2 for window in seen))
+
+        seen.clear()
+        self.assertEqual(len(embed_hierarchically(["a" * 40], CharTokenizer(), 6, scheduler, run_batch, max_windows=3)), 1)
+        self.assertEqual(len(seen), 3)
+        self.assertEqual(embed_hierarchically([], CharTokenizer(), 6, scheduler, run_batch), [])
+
+
+class CosineDriftTest(SimpleTestCase):
+    def test_drift(self):
+        from .embedding.benchmark import cosine_drift
+        reference = [np.array([1.0, 0.0]), np.array([0.0, 2.0]), None]
+        self.assertEqual(cosine_drift([np.array([3.0, 0.0]), np.array([0.0, 1.0]), np.ones(2)], reference), (0.0, 0.0))
+        mean, largest = cosine_drift([np.array([0.0, 1.0]), np.array([0.0, 1.0]), None], reference)
+        self.assertAlmostEqual(mean, 0.5)
+        self.assertAlmostEqual(largest, 1.0)
+        self.assertTrue(np.isnan(cosine_drift([None], reference)[0]))
+
+
+@skipUnless(find_spec("torch"), "torch not installed")
+class PrecisionTest(SimpleTestCase):
+    def setUp(self):
+        import torch
+        torch.manual_seed(0)
+        self.model = torch.nn.Sequential(torch.nn.Linear(32, 64), torch.nn.ReLU(), torch.nn.Linear(64, 16)).eval()
+        self.inputs = torch.randn(8, 32)
+
+    def test_int8_stays_close_to_fp32(self):
+        import copy
+        import torch
+        from .embedding.benchmark import cosine_drift
+        from .embedding.embedders.precision import apply_precision
+        with torch.no_grad():
+            expected = self.model(self.inputs).numpy()
+            quantized = apply_precision(copy.deepcopy(self.model), "int8", "cpu")
+            actual = quantized(self.inputs).numpy()
+        self.assertNotIn(torch.nn.Linear, {type(module) for module in quantized.modules()})
+        self.assertLess(cosine_drift(list(actual), list(expected))[1], 1e-3)
+
+    def test_bf16_and_fp32(self):
+        import torch
+        from .embedding.embedders.precision import apply_precision
+        self.assertIs(apply_precision(self.model, "fp32", "cpu"), self.model)
+        self.assertEqual({parameter.dtype for parameter in apply_precision(self.model, "bf16", "cpu").parameters()}, {torch.bfloat16})
+
+    def test_invalid_configurations(self):
+        from .embedding.embedders.precision import apply_precision
+        with self.assertRaises(ValueError):
+            apply_precision(self.model, "int8", "cuda")
+        with self.assertRaises(ValueError):
+            apply_precision(self.model, "fp16", "cpu")
+
+
+@skipUnless(find_spec("onnxruntime") and find_spec("onnxscript") and find_spec("transformers"), "onnxruntime, onnxscript or transformers not installed")
+class OnnxParityTest(SimpleTestCase):
+    def test_exported_encoder_matches_pytorch(self):
+        import torch
+        from transformers import BertConfig, BertModel
+        from .embedding.onnx_export import PooledEncoder, encoder_onnx_difference, export_encoder
+        torch.manual_seed(0)
+        config = BertConfig(vocab_size=100, hidden_size=32, num_hidden_layers=2, num_attention_heads=2, intermediate_size=64, max_position_embeddings=64)
+        model = BertModel(config).eval()
+        # Padded batches of other shapes than the export samples
+        input_ids = [[1, 5, 7, 2], [1, 9, 2], [1] + list(range(10, 40)) + [2]]
+        with TemporaryDirectory() as output:
+            for kind in ("codebert", "qwen"):  # CLS and masked mean pooling
+                with self.subTest(kind=kind):
+                    model_path = Path(output) / f"{kind}.onnx"
+                    with redirect_stdout(io.StringIO()):
+                        export_encoder(PooledEncoder(model, kind), [[1, 4, 2], [1, 4, 5, 6, 2]], 0, model_path, max_length=64)
+                    self.assertLess(encoder_onnx_difference(PooledEncoder(model, kind), model_path, input_ids, 0), 1e-4)
+
+
+class ChunkByBytesTest(SimpleTestCase):
+    def test_cuts_after_lines_within_budget(self):
+        self.assertEqual(chunk_by_bytes("ab\ncd\nef", 6), ["ab\ncd", "ef"])
+        self.assertEqual(chunk_by_bytes("ab\ncd", 100), ["ab\ncd"])
+
+    def test_long_lines_keep_characters_whole(self):
+        text = "€€€€\nx"  # 3 bytes per €
+        chunks = chunk_by_bytes(text, 7)
+        self.assertEqual(chunks, ["€€", "€€", "x"])
+        self.assertTrue(all(len(chunk.encode("utf-8")) <= 7 for chunk in chunks))
+
+    def test_boundaries(self):
+        # a line plus its newline exactly at the budget still fits, one byte more does not
+        self.assertEqual(chunk_by_bytes("abc\ndef", 4), ["abc", "def"])
+        self.assertEqual(chunk_by_bytes("abc\ndef", 8), ["abc\ndef"])
+        self.assertEqual(chunk_by_bytes("abc\ndef", 7), ["abc", "def"])
+        self.assertEqual(chunk_by_bytes("abcd", 4), ["abcd"])
+        self.assertEqual(chunk_by_bytes("abcde", 4), ["abcd", "e"])
+        self.assertEqual(chunk_by_bytes("a\n\n\nb\n", 4), ["a", "b"])
+        self.assertEqual(chunk_by_bytes("", 4), [])
+        self.assertEqual(chunk_by_bytes("€€", 4), ["€", "€"])
+        with self.assertRaises(ValueError):
+            chunk_by_bytes("abc", 3)
+
+
+class StreamingReaderTest(SimpleTestCase):
+    def test_rows_match_pydantic_models(self):
+        table = {"verification_results": [
+            {"verification_task": {"name": "a.yml"}, "verifier": {"name": "CPAchecker 2024-11-28 10:00:00 CET [unreach-call; x]"}, "status": "true", "raw_core": "2", "cpu": 1, "memory": 2.5},
+            {"verification_task": {"name": "b.yml"}, "verifier": {"name": "CPAchecker 2024-11-28 10:00:00 CET [unreach-call; x]"}, "status": "TIMEOUT", "raw_core": None, "cpu": None, "memory": None},
+        ]}
+        with TemporaryDirectory() as output_dir:
+            Path(get_file(urls[0], output_dir)).write_text(VerificationResults.model_validate(table).model_dump_json(indent=2))
+            expected = [
+                (r.verification_task.name, r.verifier.name, r.status, r.raw_core, r.cpu, r.memory)
+                for r in get_verification_results(urls[0], output_dir).verification_results
+            ]
+            self.assertEqual(list(iter_verification_results(urls[0], output_dir)), expected)
+            self.assertEqual(list(iter_verification_results(urls[1], output_dir)), [])
+
+            table = ResultsTable.from_rows(iter_verification_results(urls[0], output_dir))
+            self.assertEqual(list(table), expected)
+            self.assertEqual(table.verification_tasks, ["a.yml", "b.yml"])
+            self.assertEqual(len(table.verifiers), 1)
+
+    def test_verifier_columns_are_interned(self):
+        name = "CPAchecker 2024-11-28 10:00:00 CET [unreach-call; no-overflow]"
+        column = verifier_column(name)
+        self.assertIs(verifier_column(name), column)
+        self.assertEqual((column.verifier_name, column.test_date, column.verification_specs), ("CPAchecker", "2024-11-28 10:00:00 CET", ("unreach-call", "no-overflow")))
+
+
+@skipUnless(find_spec("pyarrow"), "pyarrow not installed")
+class ArrowTableTest(SimpleTestCase):
+    def test_round_trip(self):
+        verifier = "CPAchecker 2024-11-28 10:00:00 CET [unreach-call; x]"
+        for rows in ([], [
+            ResultRow("a.yml", verifier, "true", "2", 1.5, None),
+            ResultRow("b.yml", verifier, "TIMEOUT", None, None, 3.0),
+            ResultRow("a.yml", "Other 2024-11-28 10:00:00 CET [unreach-call]", "true", "", 2.0, 4.0),
+        ]):
+            with self.subTest(rows=len(rows)), TemporaryDirectory() as output_dir:
+                write_arrow_table(ResultsTable.from_rows(rows), urls[0], output_dir)
+                table = read_arrow_table(urls[0], output_dir)
+                self.assertEqual(list(table), rows)
+                self.assertEqual(table.verification_tasks, list(dict.fromkeys(row.verification_task for row in rows)))
+
+    def test_columns_stay_lazy(self):
+        verifier = "CPAchecker 2024-11-28 10:00:00 CET [unreach-call; x]"
+        statuses, scores = ["true", "false(unreach-call)", "TIMEOUT", "true"], ["2", "-16", None, ""]
+        rows = [ResultRow(f"t{i}.yml", verifier, statuses[i % 4], scores[i % 4], None if i % 3 == 0 else i / 2, None if i % 5 == 0 else float(i)) for i in range(11)]
+        with TemporaryDirectory() as output_dir:
+            write_arrow_table(ResultsTable.from_rows(rows), urls[0], output_dir)
+            table = read_arrow_table(urls[0], output_dir)
+            for name in ("status", "raw_core", "cpu", "memory"):
+                self.assertNotIsInstance(getattr(table, name), list)
+            self.assertEqual([table.row(i) for i in range(len(table))], rows)
+            self.assertTrue(all(type(table.row(i).cpu) is float for i in range(1, len(table)) if i % 3))
+            with mock.patch.object(ResultsTable, "ITER_BLOCK_ROWS", 4):  # blocks end within the table
+                self.assertEqual(list(table), rows)
+            self.assertEqual(table.cpu[3:7], [row.cpu for row in rows[3:7]])
+            self.assertEqual(table.raw_core[::-1], [row.raw_core for row in rows[::-1]])
+            # and back to Arrow
+            write_arrow_table(table, urls[1], output_dir)
+            self.assertEqual(list(read_arrow_table(urls[1], output_dir)), rows)
+
+    def test_stale_arrow_file_is_ignored(self):
+        verifier = "CPAchecker 2024-11-28 10:00:00 CET [unreach-call; x]"
+        old, new = [ResultRow("a.yml", verifier, "true", "2", 1.0, 1.0)], [ResultRow("a.yml", verifier, "false(unreach-call)", "-16", 2.0, 2.0)]
+        with TemporaryDirectory() as output_dir:
+            write_arrow_table(ResultsTable.from_rows(old), urls[0], output_dir)
+            # The table is scraped again as JSON after the conversion
+            Path(get_file(urls[0], output_dir)).write_text(VerificationResults.model_validate({"verification_results": [
+                {"verification_task": {"name": row.verification_task}, "verifier": {"name": row.verifier}, "status": row.status, "raw_core": row.raw_core, "cpu": row.cpu, "memory": row.memory}
+                for row in new
+            ]}).model_dump_json())
+            arrow_file = get_file(urls[0], output_dir, "arrow")
+            os.utime(arrow_file, ns=(os.stat(arrow_file).st_atime_ns, os.stat(get_file(urls[0], output_dir)).st_mtime_ns - 10**9))
+            with redirect_stdout(io.StringIO()):
+                self.assertEqual(list(get_results_table(urls[0], output_dir)), new)
+                call_command("convert_tables", tables_dir=output_dir)
+            self.assertEqual(list(read_arrow_table(urls[0], output_dir)), new)
+            self.assertEqual(list(get_results_table(urls[0], output_dir)), new)
+
+
+@skipUnless(find_spec("torch") and find_spec("transformers"), "torch or transformers not installed")
+class TorchSetupTest(SimpleTestCase):
+    def test_embedders_keep_the_worker_threads(self):
+        # Like embed_shard: the worker sizes the thread pool, then imports and builds an embedder
+        script = (
+            "import torch\n"
+            "from verification_tasks.embedding.embedders.torch_setup import configure_cpu_threads, select_device\n"
+            "configure_cpu_threads(2)\n"
+            "import verification_tasks.embedding.embedders.codet5p_embedder, verification_tasks.embedding.embedders.transformer_embedder, verification_tasks.embedding.embedders.qwen_embedder\n"
+            "select_device(allow_mps=False)\n"
+            "print(torch.get_num_threads())\n"
+        )
+        env = {**os.environ, "SLURM_CPUS_PER_TASK": "3", "CUDA_VISIBLE_DEVICES": ""}
+        result = subprocess.run([sys.executable, "-c", script], capture_output=True, text=True, cwd=MANAGE_PY_PATH.parent, env=env)
+        self.assertEqual(result.returncode, 0, result.stderr[-2000:])
+        self.assertEqual(result.stdout, "2\n")  # and no device diagnostics on import
+
+
+class ImportTimeTest(SimpleTestCase):
+    def import_times(self, command):
+        """Top level and all imported module names of manage.py command --help with their cumulative -X importtime."""
+        result = subprocess.run(
+            [sys.executable, "-X", "importtime", str(MANAGE_PY_PATH), command, "--help"],
+            capture_output=True, text=True, cwd=MANAGE_PY_PATH.parent,
+        )
+        self.assertEqual(result.returncode, 0, result.stderr[-2000:])
+        top_level, modules = {}, set()
+        for line in result.stderr.splitlines():
+            if not line.startswith("import time:") or "cumulative" in line:
+                continue
+            _, cumulative, name = line.split("|")
+            modules.add(name.strip())
+            if not name.startswith("  "):
+                top_level[name.strip()] = int(cumulative) / 1e6
+        return top_level, modules
+
+    def test_light_commands_skip_ml_imports(self):
+        for command in LIGHT_COMMANDS:
+            with self.subTest(command=command):
+                _, modules = self.import_times(command)
+                self.assertFalse(HEAVY_MODULES & modules, f"{command} imports {sorted(HEAVY_MODULES & modules)} at startup")
+
+    @skipUnless(IMPORT_TIME_BUDGET_SECONDS, "IMPORT_TIME_BUDGET_SECONDS not set")
+    def test_light_commands_import_within_budget(self):
+        for command in LIGHT_COMMANDS:
+            with self.subTest(command=command):
+                top_level, _ = self.import_times(command)
+                slowest = sorted(top_level.items(), key=lambda item: -item[1])[:5]
+                self.assertLess(sum(top_level.values()), IMPORT_TIME_BUDGET_SECONDS, f"{command} imports take too long, slowest: {slowest}")
+
+
+class GeminiStubHandler(BaseHTTPRequestHandler):
+    """Answers batchEmbedContents like the Gemini API, with [len(text), 1.0] as embedding."""
+
+    def do_POST(self):
+        requests = json.loads(self.rfile.read(int(self.headers["Content-Length"])))["requests"]
+        texts = [request["content"]["parts"][0]["text"] for request in requests]
+        self.server.batches.append(texts)
+        status, body = self.server.responses.pop(0) if self.server.responses else (200, None)
+        if body is None:
+            body = {"embeddings": [{"values": [float(len(text)), 1.0]} for text in texts]}
+        data = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        pass
+
+
+@skipUnless(find_spec("google.genai"), "google-genai not installed")
+class GeminiEmbedderTest(SimpleTestCase):
+    def setUp(self):
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), GeminiStubHandler)
+        self.server.batches, self.server.responses = [], []
+        Thread(target=self.server.serve_forever, daemon=True).start()
+        self.addCleanup(self.server.server_close)
+        self.addCleanup(self.server.shutdown)
+
+    def embedder(self, **kwargs):
+        from .embedding.embedders.gemini_embedder import GeminiEmbedder
+        return GeminiEmbedder(base_url=f"http://127.0.0.1:{self.server.server_port}", api_key="test", backoff_seconds=0.01, requests_per_minute=6000, **kwargs)
+
+    def error(self, code, status):
+        return code, {"error": {"code": code, "message": status, "status": status}}
+
+    def test_batches_and_retries(self):
+        self.server.responses = [self.error(429, "RESOURCE_EXHAUSTED"), self.error(503, "UNAVAILABLE")]
+        embeddings = self.embedder(max_batch_contents=2).embed_batch(["a", "bb", "ccc"])
+        self.assertEqual(embeddings, [[1.0, 1.0], [2.0, 1.0], [3.0, 1.0]])
+        self.assertEqual(len(self.server.batches), 4)
+        self.assertTrue(all(len(batch) <= 2 for batch in self.server.batches))
+
+    def test_client_errors_are_not_retried(self):
+        self.server.responses = [self.error(400, "INVALID_ARGUMENT")]
+        self.assertEqual(self.embedder().embed_batch(["a", "bb"]), [None, None])
+        self.assertEqual(len(self.server.batches), 1)
+
+    def test_large_source_is_mean_of_chunks(self):
+        embedder = self.embedder()
+        embedder.safe_max_content_bytes = 10
+        self.assertEqual(embedder.embed("12345678\n1234"), [6.0, 1.0])